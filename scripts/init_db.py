@@ -33,8 +33,8 @@ import subprocess
 import mysql.connector
 from mysql.connector import Error
 from src.cli import CLIUtility
+from src.database.db_settings import DBSettings
 import logging
-from dotenv import load_dotenv
 
 # Configure logging
 logging.basicConfig(filename='init_db.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -74,8 +74,9 @@ class InitDB:
 
             InitDB._write_env_file(db_host, db_name, db_user, db_password)
 
-            # Test database connection
-            InitDB._test_db_connection(db_host, db_name, db_user, db_password)
+            # Test the credentials just entered; exported DB_* variables would win over .env in DBSettings
+            DBSettings.reload()
+            InitDB._test_db_connection(DBSettings(db_host, db_name, db_user, db_password))
 
         except Error as e:
             CLIUtility.error(f"Error initializing database: {e}")
@@ -146,99 +147,16 @@ class InitDB:
             logging.error(f"Error writing environment file: {e}")
 
     @staticmethod
-    def _test_db_connection(db_host, db_name, db_user, db_password):
+    def _test_db_connection(settings=None):
         """
-        Tests the database connection using the provided credentials.
-        """
-        try:
-            connection = mysql.connector.connect(
-                host=db_host,
-                database=db_name,
-                user=db_user,
-                password=db_password
-            )
-
-            if connection.is_connected():
-                connection.close()
-                CLIUtility.success("Database connection test successful.")
-            else:
-                CLIUtility.error("Failed to establish database connection.")
-                logging.error("Failed to establish database connection.")
+        Tests the database connection using the shared `DBSettings` credentials.
 
-        except Error as e:
-            CLIUtility.error(f"Error connecting to database: {e}")
-            logging.error(f"Error connecting to database: {e}")
-
-    @staticmethod
-    def _generate_sql_script(script_path, db_host, db_name, db_user, db_password):
-        """
-        Generates or updates the SQL initialization script with database credentials.
-        """
-        try:
-            with open(script_path, "w") as sql_file:
-                sql_file.write(f"CREATE DATABASE IF NOT EXISTS {db_name};\n")
-                sql_file.write(f"CREATE USER IF NOT EXISTS '{db_user}'@'{db_host}' IDENTIFIED BY '{db_password}';\n")
-                sql_file.write(f"GRANT ALL PRIVILEGES ON {db_name}.* TO '{db_user}'@'{db_host}' WITH GRANT OPTION;\n")
-
-            CLIUtility.success(f"Initialization script '{script_path}' generated.")
-
-        except IOError as e:
-            CLIUtility.error(f"Error generating SQL script: {e}")
-            logging.error(f"Error generating SQL script: {e}")
-
-    @staticmethod
-    def _remove_sensitive_info_from_script(script_path):
-        """
-        Removes sensitive information (passwords) from the SQL script after execution.
-        """
-        try:
-            with open(script_path, "r+") as sql_file:
-                lines = sql_file.readlines()
-                sql_file.seek(0)
-                for line in lines:
-                    if 'IDENTIFIED BY' not in line:
-                        sql_file.write(line)
-                sql_file.truncate()
-
-            CLIUtility.success(f"Sensitive information removed from '{script_path}'.")
-
-        except IOError as e:
-            CLIUtility.error(f"Error removing sensitive information from script: {e}")
-            logging.error(f"Error removing sensitive information from script: {e}")
-
-    @staticmethod
-    def _write_env_file(db_host, db_name, db_user, db_password):
-        """
-        Writes database credentials to a .env file and sets secure permissions.
-        """
-        try:
-            env_file_path = ".env"
-            with open(env_file_path, "w") as env_file:
-                env_file.write(f"DB_HOST={db_host}\n")
-                env_file.write(f"DB_NAME={db_name}\n")
-                env_file.write(f"DB_USER={db_user}\n")
-                env_file.write(f"DB_PASSWORD={db_password}\n")
-
-            os.chmod(env_file_path, 0o650)  # Set secure permissions on .env file
-
-            CLIUtility.success(f"Environment variables written to '{env_file_path}'.")
-
-        except IOError as e:
-            CLIUtility.error(f"Error writing environment file: {e}")
-            logging.error(f"Error writing environment file: {e}")
-
-    @staticmethod
-    def _test_db_connection(db_host, db_name, db_user, db_password):
-        """
-        Tests the database connection using the provided credentials.
+        Args:
+        - settings (DBSettings): Optional. Settings to test; defaults to `DBSettings.get()`.
         """
         try:
-            connection = mysql.connector.connect(
-                host=db_host,
-                database=db_name,
-                user=db_user,
-                password=db_password
-            )
+            settings = settings or DBSettings.get()
+            connection = mysql.connector.connect(**settings.connect_kwargs())
 
             if connection.is_connected():
                 connection.close()
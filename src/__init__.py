@@ -1,4 +1,13 @@
 from .cli import CLIUtility
 from .config import Config
-from .log import logger
+from . import log
 from .app import App
+
+
+def __getattr__(name):
+    """
+    Builds the `logger` singleton on first access; see `src.log`.
+    """
+    if name == "logger":
+        return log.logger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
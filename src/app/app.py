@@ -26,7 +26,7 @@ class App:
         """Set up logging configuration."""
 
         log_format = '%(asctime)s - %(filename)s:%(lineno)d - %(levelname)s - %(message)s'
-        logging.basicConfig(level=self.log_level, format=log_format)
+        self.log.configure(log_level=self.log_level, log_format=log_format)
 
     def parse_config(self):
         """Parse configuration file and set configuration values."""
@@ -41,22 +41,13 @@ class App:
     def log_decorator(log_level):
         """Decorator function to simplify logging calls."""
 
+        level = {"error": logging.ERROR, "warning": logging.WARNING}.get(log_level, logging.INFO)
+
         def decorator(func):
             def wrapper(self, message):
                 func(self, message)
-                log_message = f"[{log_level.upper()}] {message}"
-                if log_level == "info":
-                    self.cli.info(log_message)
-                    self.log.log(log_message)
-                elif log_level == "error":
-                    self.cli.error(log_message)
-                    self.log.log(log_message)
-                elif log_level == "warning":
-                    self.cli.warning(log_message)
-                    self.log.log(log_message)
-                elif log_level == "success":
-                    self.cli.success(log_message)
-                    self.log.log(log_message)
+                getattr(self.cli, log_level)(message)
+                self.log.log("[%s] %s", level, log_level.upper(), message)
 
             return wrapper
 
@@ -1,4 +1,3 @@
-import click
 from colorama import init, Fore, Style
 
 # Initialize colorama to work on Windows as well
@@ -38,6 +37,7 @@ class CLIUtility:
         Returns:
         - str: Selected option.
         """
+        import click  # Imported here so that printing helpers do not pay for loading Click
         click.echo(f"{Fore.BLUE}{Style.BRIGHT}{prompt}{Style.RESET_ALL}")
         for i, option in enumerate(options, start=1):
             click.echo(f" {Fore.GREEN}{Style.NORMAL}{i}.{Style.RESET_ALL} {option}")
@@ -107,3 +107,36 @@ class CLIUtility:
         """
         print(f"\033[1;32m SUCCESS {' ' * 8}\u25CF \033[0m {message}")
 
+    @staticmethod
+    def progress(label, done, total=None, elapsed=None, unit="rows"):
+        """
+        Prints a single-line progress indicator that overwrites itself, with rate and ETA when known.
+
+        Call with `done == total` (or print a newline) to finish the line; this works for `total=0` too.
+
+        Args:
+            label (str): Short description of the task.
+            done (int): Units completed so far.
+            total (int, optional): Total units, if known; enables the bar, percentage and ETA.
+            elapsed (float, optional): Seconds since the task started; enables the rate and ETA.
+            unit (str, optional): Name of the unit shown with the rate (default: "rows").
+
+        Example:
+        >>> CLIUtility.progress("Loading users.csv", 5000, 20000, elapsed=2.0)
+         PROGRESS        ●  Loading users.csv  [#####...............]  25.0%  5,000/20,000  2,500 rows/s  ETA 6s
+        """
+        parts = [label]
+        if total:
+            fraction = min(1.0, done / total)
+            filled = int(fraction * 20)
+            parts.append(f"[{'#' * filled}{'.' * (20 - filled)}] {fraction * 100:5.1f}%  {done:,}/{total:,}")
+        else:
+            parts.append(f"{done:,}")
+        if elapsed:
+            rate = done / elapsed
+            parts.append(f"{rate:,.0f} {unit}/s")
+            if total and rate > 0:
+                parts.append(f"ETA {max(0, total - done) / rate:,.0f}s")
+        end = "\n" if total is not None and done >= total else ""
+        print(f"\r\033[1;35m PROGRESS {' ' * 7}\u25CF \033[0m {'  '.join(parts)}\033[K", end=end, flush=True)
+
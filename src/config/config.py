@@ -78,6 +78,30 @@ class Config:
             [Logging]
             LogLevel = DEBUG
             LogPath = /path/to/logs
+            Queue_Size = 10000
+            Overflow = drop_oldest
+            Sample_Rate = 10
+            Rotate_Bytes = 10485760
+            Rotate_Seconds = 86400
+            Backup_Count = 14
+            Compression = gzip
+            Structured = false
+            Context =
+            Reload_On_Sighup = false
+            Watch_Interval = 0
+            Rate_Limit = ERROR=20/60, WARNING=20/60
+            Sampling =
+
+            [Database]
+            Backend = mysql
+            Path = storage/database.sqlite3
+            Metrics = true
+            Slow_Query_Ms = 200
+            Migrations = scripts/migrations
+            Replicas =
+            Replica_Strategy = round_robin
+            Max_Replica_Lag = 5
+            Replica_Sticky_Seconds = 0
 
             [Features]
             EnableFeature = True
@@ -93,9 +117,48 @@ class Config:
             'LogLevel': 'DEBUG',
             # Possible log levels: DEBUG, INFO, WARNING, ERROR, CRITICAL
             'LogPath': '/path/to/logs',
+            'Queue_Size': '10000',
+            # Records buffered between callers and the background log writer
+            'Overflow': 'drop_oldest',
+            # Possible policies: block, drop_oldest, sample
+            'Sample_Rate': '10',
+            'Rotate_Bytes': '10485760',
+            'Rotate_Seconds': '86400',
+            # Rotate the log file at this size or age; 0 disables either
+            'Backup_Count': '14',
+            'Compression': 'gzip',
+            # Possible compressions: none, gzip, zstd
+            'Structured': 'false',
+            'Context': '',
+            # Structured = true writes JSON lines; Context holds static key=value fields for every line
+            'Reload_On_Sighup': 'false',
+            'Watch_Interval': '0',
+            # Re-read [Logging] on SIGHUP or when this file changes (seconds between checks; 0 disables)
+            'Rate_Limit': 'ERROR=20/60, WARNING=20/60',
+            # Per level, at most count identical messages per window of seconds (LEVEL=count/seconds)
+            'Sampling': '',
+            # Per level, probability of keeping a record (LEVEL=p), e.g. DEBUG=0.1
             # Add more logging configuration options as needed
         }
 
+        config['Database'] = {
+            'Backend': 'mysql',
+            # Possible backends: mysql, sqlite
+            'Path': 'storage/database.sqlite3',
+            # SQLite database file, used when Backend = sqlite
+            'Metrics': 'true',
+            'Slow_Query_Ms': '200',
+            # Queries at or above this many milliseconds are written to the log
+            'Migrations': 'scripts/migrations',
+            # Directory holding versioned migration files
+            'Replicas': '',
+            # Comma-separated read replica names, each defined in a [Replica:<name>] section
+            'Replica_Strategy': 'round_robin',
+            # Possible strategies: round_robin, least_latency
+            'Max_Replica_Lag': '5',
+            'Replica_Sticky_Seconds': '0',
+        }
+
         config['Features'] = {
             'EnableFeature': 'True',
             # Add more feature configuration options as needed
@@ -1,3 +1,36 @@
-from .db_debug import DBDebug
-from .db_crud import DBCrud
-from .db_connection import DBConnection
+"""
+`src.database` | Database access layer.
+
+Names are imported from their submodules on first access (PEP 562 module `__getattr__`), so importing
+the package, or `src` itself, does not load the driver, `dotenv` or `asyncio` until they are needed.
+`python -m src.database.db_bench --startup` measures the import cost.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DBDebug": ".db_debug",
+    "DBCrud": ".db_crud",
+    "DBConnection": ".db_connection",
+    "AsyncDBConnection": ".db_async",
+    "AsyncDBCrud": ".db_async",
+    "DBUnavailableError": ".db_resilience",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Imports an exported name from its submodule on first access and caches it on the package.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,297 @@
+"""
+`db_async.py` | Module providing asyncio counterparts of `DBConnection` and `DBCrud`.
+
+`AsyncDBConnection` is a static utility class owning an async-aware connection pool and a dedicated
+thread pool. `AsyncDBCrud` exposes awaitable versions of the `DBCrud` operations. The blocking driver calls
+run on the dedicated threads, one per pooled connection, so the event loop never blocks on a socket and
+as many queries as there are pooled connections can be in flight at once.
+
+Usage:
+- Optionally call `AsyncDBConnection.configure(size=50, max_overflow=50)` before first use. Pass
+  `factory` (and `ping`) to run against another backend, e.g. a SQLite-backed stand-in in tests.
+- `async with AsyncDBConnection.connection() as connection:` borrows a pooled connection.
+- `await AsyncDBCrud.fetch_all(connection, query, values)` and friends run the query off the loop.
+- `async for row in AsyncDBCrud.iter_rows(connection, query):` streams rows chunk by chunk.
+- `await AsyncDBConnection.close()` disposes the pool and thread pool.
+- `python -m src.database.db_async` runs concurrent queries against a throwaway SQLite database in
+  several consecutive event loops, as a quick check of the async layer.
+
+Example:
+>>> async def count_users():
+...     async with AsyncDBConnection.connection() as connection:
+...         return await AsyncDBCrud.fetch_one(connection, "SELECT COUNT(*) FROM users")
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from itertools import islice
+import argparse
+import asyncio
+import tempfile
+import weakref
+import time
+import os
+from ..cli.cli import CLIUtility
+from .db_backend import SQLiteBackend
+from .db_connection import DBConnection
+from .db_crud import DBCrud
+from .db_pool import DBPool
+from .db_statement_cache import StatementCache
+
+
+class AsyncDBConnection:
+    """
+    Static utility class managing an asyncio-friendly pool of database connections.
+    """
+
+    _pool = None
+    _executor = None
+    _slots = weakref.WeakKeyDictionary()
+    _options = {"factory": None, "ping": None, "size": 10, "max_overflow": 10, "timeout": 30.0, "recycle": 3600}
+
+    @staticmethod
+    def configure(factory=None, ping=None, size=10, max_overflow=10, timeout=30.0, recycle=3600):
+        """
+        Sets the pool options. Takes effect on the next use after `close()` if a pool already exists.
+
+        Args:
+        - factory (callable): Optional. Zero-argument callable returning a new blocking connection;
+          defaults to the MySQL connection factory of `DBConnection`.
+        - ping (callable): Optional. Health check `ping(connection) -> bool` run on checkout.
+        - size (int): Optional. Number of connections kept open while idle.
+        - max_overflow (int): Optional. Extra connections allowed under load.
+        - timeout (float): Optional. Seconds to wait for a free connection.
+        - recycle (float): Optional. Maximum lifetime of a pooled connection in seconds.
+        """
+        AsyncDBConnection._options = {
+            "factory": factory,
+            "ping": ping,
+            "size": size,
+            "max_overflow": max_overflow,
+            "timeout": timeout,
+            "recycle": recycle,
+        }
+
+    @staticmethod
+    def _ensure_pool():
+        """
+        Helper method creating the pool and thread pool on first use.
+        """
+        if AsyncDBConnection._pool is None:
+            options = AsyncDBConnection._options
+            capacity = options["size"] + options["max_overflow"]
+            AsyncDBConnection._pool = DBPool(
+                options["factory"] or DBConnection._open,
+                size=options["size"],
+                max_overflow=options["max_overflow"],
+                timeout=options["timeout"],
+                recycle=options["recycle"],
+                ping=options["ping"] or DBConnection.backend().is_connected,
+                on_close=StatementCache.evict
+            )
+            AsyncDBConnection._executor = ThreadPoolExecutor(
+                max_workers=capacity, thread_name_prefix="async-db"
+            )
+        return AsyncDBConnection._pool
+
+    @staticmethod
+    def _gate():
+        """
+        Helper method returning the concurrency gate of the running event loop.
+
+        asyncio primitives are bound to the loop they are first contended in, so each loop (e.g. each
+        `asyncio.run()`) gets its own semaphore over the shared pool.
+        """
+        loop = asyncio.get_running_loop()
+        slots = AsyncDBConnection._slots.get(loop)
+        if slots is None:
+            options = AsyncDBConnection._options
+            slots = AsyncDBConnection._slots[loop] = asyncio.Semaphore(options["size"] + options["max_overflow"])
+        return slots
+
+    @staticmethod
+    async def run(func, *args, **kwargs):
+        """
+        Runs a blocking database call on the dedicated thread pool.
+
+        Args:
+        - func (callable): The blocking function to run.
+        - *args, **kwargs: Arguments passed to `func`.
+
+        Returns:
+        - The return value of `func`.
+        """
+        AsyncDBConnection._ensure_pool()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(AsyncDBConnection._executor, partial(func, *args, **kwargs))
+
+    @staticmethod
+    @asynccontextmanager
+    async def connection(timeout=None):
+        """
+        Async context manager borrowing a pooled connection.
+
+        Waiting for a free connection suspends the coroutine instead of blocking a thread.
+
+        Args:
+        - timeout (float): Optional. Seconds to wait for a free connection.
+
+        Yields:
+        - connection: A blocking connection to pass to `AsyncDBCrud` methods.
+
+        Raises:
+        - asyncio.TimeoutError: If no connection became available in time.
+        """
+        pool = AsyncDBConnection._ensure_pool()
+        slots = AsyncDBConnection._gate()
+        timeout = pool.timeout if timeout is None else timeout
+        await asyncio.wait_for(slots.acquire(), timeout)
+        try:
+            connection = await AsyncDBConnection.run(pool.checkout, 0)
+            try:
+                yield connection
+            finally:
+                await AsyncDBConnection.run(pool.checkin, connection)
+        finally:
+            slots.release()
+
+    @staticmethod
+    def status():
+        """
+        Returns the counters of the underlying pool.
+
+        Returns:
+        - dict: Pool counters, see `DBPool.status()`.
+        """
+        return AsyncDBConnection._ensure_pool().status()
+
+    @staticmethod
+    async def close():
+        """
+        Closes idle pooled connections and shuts down the thread pool.
+        """
+        pool, executor = AsyncDBConnection._pool, AsyncDBConnection._executor
+        if pool is None:
+            return
+        AsyncDBConnection._pool = AsyncDBConnection._executor = None
+        AsyncDBConnection._slots = weakref.WeakKeyDictionary()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, pool.dispose)
+        executor.shutdown(wait=False)
+
+
+class AsyncDBCrud:
+    """
+    Awaitable counterparts of the `DBCrud` operations.
+    """
+
+    @staticmethod
+    async def execute_query(connection, query, values=None):
+        """
+        Executes a SQL query without blocking the event loop. See `DBCrud.execute_query`.
+
+        Returns:
+        - bool: True if the query succeeded.
+        """
+        return await AsyncDBConnection.run(DBCrud.execute_query, connection, query, values) is not None
+
+    @staticmethod
+    async def fetch_all(connection, query, values=None, shape="tuples"):
+        """
+        Fetches all records without blocking the event loop. See `DBCrud.fetch_all`.
+
+        Returns:
+        - list: List of tuples or records containing fetched rows; a dict of columns for `"columns"`.
+        """
+        return await AsyncDBConnection.run(DBCrud.fetch_all, connection, query, values, shape)
+
+    @staticmethod
+    async def fetch_one(connection, query, values=None):
+        """
+        Fetches a single record without blocking the event loop. See `DBCrud.fetch_one`.
+
+        Returns:
+        - tuple: A single fetched row.
+        """
+        return await AsyncDBConnection.run(DBCrud.fetch_one, connection, query, values)
+
+    @staticmethod
+    async def insert_many(connection, query, rows, batch_size=1000):
+        """
+        Bulk inserts records without blocking the event loop. See `DBCrud.insert_many`.
+
+        Returns:
+        - int: Number of rows inserted.
+        """
+        return await AsyncDBConnection.run(DBCrud.insert_many, connection, query, rows, batch_size, False)
+
+    @staticmethod
+    async def iter_rows(connection, query, values=None, chunk_size=1000):
+        """
+        Streams records as an async iterator. See `DBCrud.iter_rows`.
+
+        Each chunk of `chunk_size` rows is fetched on the thread pool; the underlying cursor is closed
+        when iteration ends or the async generator is closed early.
+
+        Returns:
+        - async generator: Yields fetched rows as tuples.
+        """
+        rows = DBCrud.iter_rows(connection, query, values, chunk_size)
+        try:
+            while True:
+                chunk = await AsyncDBConnection.run(lambda: list(islice(rows, chunk_size)))
+                if not chunk:
+                    return
+                for row in chunk:
+                    yield row
+        finally:
+            await AsyncDBConnection.run(rows.close)
+
+
+async def _check(tasks):
+    """
+    Runs `tasks` concurrent queries through the async layer and returns the rows they read.
+    """
+    async def read(number):
+        async with AsyncDBConnection.connection() as connection:
+            rows = await AsyncDBCrud.fetch_all(connection, "SELECT id FROM items WHERE id <= %s", (number,))
+            return len(rows)
+
+    results = await asyncio.gather(*(read(number) for number in range(1, tasks + 1)))
+    return sum(results)
+
+
+def main():
+    """
+    Command-line entry point checking the async layer against a throwaway SQLite database.
+    """
+    parser = argparse.ArgumentParser(description="Check AsyncDBConnection/AsyncDBCrud against SQLite")
+    parser.add_argument("--loops", type=int, default=3, help="Consecutive asyncio.run() calls")
+    parser.add_argument("--tasks", type=int, default=50, help="Concurrent queries per loop")
+    parser.add_argument("--size", type=int, default=4, help="Pool size (kept below --tasks to contend)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="db-async-")
+    DBConnection.use_backend(SQLiteBackend(os.path.join(directory, "check.sqlite3")))
+    with DBConnection.pooled() as connection:
+        DBCrud.execute_query(connection, "CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        DBCrud.insert_many(connection, "INSERT INTO items (id) VALUES (%s)", [(n,) for n in range(1, args.tasks + 1)])
+    AsyncDBConnection.configure(size=args.size, max_overflow=0)
+
+    expected = args.tasks * (args.tasks + 1) // 2
+    for loop in range(1, args.loops + 1):
+        started = time.perf_counter()
+        rows = asyncio.run(_check(args.tasks))
+        if rows != expected:
+            CLIUtility.error(f"Loop {loop}: read {rows} rows, expected {expected}")
+            raise SystemExit(1)
+        CLIUtility.success(f"Loop {loop}: {args.tasks} concurrent queries in {time.perf_counter() - started:.3f}s")
+    asyncio.run(AsyncDBConnection.close())
+
+
+if __name__ == "__main__":
+    main()
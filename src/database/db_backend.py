@@ -0,0 +1,329 @@
+"""
+`db_backend.py` | Module defining the database backend interface used by `DBConnection` and `DBCrud`.
+
+A backend hides driver specifics: how to connect, which exception types it raises, how placeholders
+are written, how cursors are created for streaming or prepared execution, and how a connection is
+health-checked. Two backends are provided:
+
+- `MySQLBackend`: `mysql.connector`, the default.
+- `SQLiteBackend`: the standard library `sqlite3` module against a local file, in WAL mode with tuned
+  pragmas. It needs no server, which makes it suitable for CI, load tests and embedded deployments.
+
+Usage:
+- Select the backend in `config.ini`:
+
+      [Database]
+      backend = sqlite
+      path = storage/database.sqlite3
+
+- `DBBackend.from_config(config)`: Builds the configured backend from a `Config` instance.
+- `DBConnection.backend()` returns the active backend; `DBConnection.use_backend(backend)` overrides it.
+
+Queries keep using `%s` placeholders; backends with another paramstyle translate them.
+
+Drivers are imported when a backend is instantiated, not when this module is imported.
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from functools import lru_cache
+import os
+import re
+
+
+class DBBackend:
+    """
+    Base class describing what `DBConnection` and `DBCrud` need from a database driver.
+
+    Attributes:
+        name (str): Backend name used in `config.ini`.
+        errors (tuple): Exception types raised by the driver.
+        supports_prepared (bool): Whether `cursor(prepared=True)` yields server-side prepared cursors.
+        supports_local_infile (bool): Whether `LOAD DATA LOCAL INFILE` may be attempted.
+    """
+
+    name = None
+    errors = (Exception,)
+    supports_prepared = False
+    supports_local_infile = False
+
+    def connect(self, settings, **options):
+        """
+        Opens a new connection.
+
+        Args:
+        - settings (DBSettings): Resolved credentials.
+        - **options: Optional. Extra driver-specific connection options.
+
+        Returns:
+        - connection: A DB-API connection object.
+        """
+        raise NotImplementedError
+
+    def cursor(self, connection, streaming=False, prepared=False):
+        """
+        Creates a cursor.
+
+        Args:
+        - connection: A connection returned by `connect()`.
+        - streaming (bool): Optional. Request a cursor that reads rows from the server incrementally.
+        - prepared (bool): Optional. Request a server-side prepared cursor, if supported.
+
+        Returns:
+        - cursor: A DB-API cursor object.
+        """
+        return connection.cursor()
+
+    def translate(self, query):
+        """
+        Rewrites a `%s`-style query into the driver's paramstyle.
+
+        Args:
+        - query (str): The SQL query.
+
+        Returns:
+        - str: The query to send to the driver.
+        """
+        return query
+
+    def begin(self, connection):
+        """
+        Starts a transaction for the outermost `DBCrud.transaction()` scope, if the driver needs it.
+
+        Args:
+        - connection: A connection returned by `connect()`.
+        """
+
+    def rename_tables(self, pairs):
+        """
+        Returns the statements renaming tables, e.g. to swap a rebuilt table into place.
+
+        Args:
+        - pairs (list): `(old_name, new_name)` tuples, applied in order.
+
+        Returns:
+        - list: SQL statements; run them in one transaction where the driver supports transactional DDL.
+        """
+        return [f"ALTER TABLE {old} RENAME TO {new}" for old, new in pairs]
+
+    def estimate_rows(self, table):
+        """
+        Returns the query estimating how many rows a table holds, e.g. to show progress and ETA.
+
+        Args:
+        - table (str): Backtick-quoted table name, without a schema.
+
+        Returns:
+        - tuple: `(statement, values)`; the statement returns one row with the estimate.
+        """
+        return f"SELECT COUNT(*) FROM {table}", ()
+
+    def is_connected(self, connection):
+        """
+        Checks whether a connection is still usable.
+
+        Args:
+        - connection: A connection returned by `connect()`.
+
+        Returns:
+        - bool: True if connected.
+        """
+        raise NotImplementedError
+
+    def replication_lag(self, connection):
+        """
+        Measures how far a replica is behind its primary.
+
+        Args:
+        - connection: A connection to the replica.
+
+        Returns:
+        - float: Lag in seconds, 0.0 for backends without replication, or None if the server is not
+          replicating (not a replica, or replication stopped).
+        """
+        return 0.0
+
+    def drain(self, connection):
+        """
+        Discards unread rows of a streaming result so the connection can run another query.
+
+        Args:
+        - connection: A connection returned by `connect()`.
+        """
+
+    def abort(self, connection):
+        """
+        Closes a connection without reading the rest of a pending streaming result.
+
+        Use it instead of `drain()` when a large result is abandoned; the connection cannot be reused.
+
+        Args:
+        - connection: A connection returned by `connect()`.
+        """
+        try:
+            connection.close()
+        except self.errors:
+            pass
+
+    @staticmethod
+    def from_config(config=None):
+        """
+        Builds the backend selected by the `[Database]` section of `config.ini`.
+
+        Args:
+        - config (Config): Optional. Configuration handler; `config.ini` is read when omitted.
+
+        Returns:
+        - DBBackend: The configured backend; `MySQLBackend` when nothing is configured.
+
+        Raises:
+        - ValueError: If the configured backend name is unknown.
+        """
+        if config is None:
+            from ..config import Config
+            config = Config()
+        name = config.config.get("Database", "backend", fallback="mysql").strip().lower()
+        if name == MySQLBackend.name:
+            return MySQLBackend()
+        if name == SQLiteBackend.name:
+            return SQLiteBackend(config.config.get("Database", "path", fallback=SQLiteBackend.DEFAULT_PATH))
+        raise ValueError(f"Unknown database backend '{name}'")
+
+
+class MySQLBackend(DBBackend):
+    """
+    Backend for MySQL/MariaDB through `mysql.connector`.
+    """
+
+    name = "mysql"
+    supports_prepared = True
+    supports_local_infile = True
+
+    def __init__(self):
+        """
+        Initializes the backend and binds the driver's exception types.
+        """
+        from mysql.connector import Error
+        self.errors = (Error,)
+
+    def connect(self, settings, **options):
+        from mysql.connector import connect
+        return connect(**settings.connect_kwargs(), **options)
+
+    def cursor(self, connection, streaming=False, prepared=False):
+        if prepared:
+            return connection.cursor(prepared=True)
+        if streaming:
+            return connection.cursor(buffered=False)
+        return connection.cursor()
+
+    def rename_tables(self, pairs):
+        return ["RENAME TABLE " + ", ".join(f"{old} TO {new}" for old, new in pairs)]
+
+    def estimate_rows(self, table):
+        # InnoDB's statistics estimate, instead of a full COUNT(*) scan of a large table.
+        return (
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table.strip("`"),)
+        )
+
+    def is_connected(self, connection):
+        return connection.is_connected()
+
+    def replication_lag(self, connection):
+        cursor = connection.cursor(dictionary=True)
+        try:
+            for statement, column in (("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+                                      ("SHOW SLAVE STATUS", "Seconds_Behind_Master")):
+                try:
+                    cursor.execute(statement)
+                except self.errors:
+                    continue
+                status = cursor.fetchone()
+                if status is None or status.get(column) is None:
+                    return None
+                return float(status[column])
+            return None
+        finally:
+            cursor.close()
+
+    def drain(self, connection):
+        connection.consume_results()
+
+    def abort(self, connection):
+        # shutdown() drops the socket without the QUIT round trip, which would first read the pending rows;
+        # the server stops the query when its next write fails.
+        try:
+            getattr(connection, "shutdown", connection.close)()
+        except self.errors:
+            pass
+
+
+class SQLiteBackend(DBBackend):
+    """
+    Backend for an in-process SQLite database file, tuned for throughput.
+
+    WAL mode lets readers run concurrently with a writer, `synchronous=NORMAL` only syncs at checkpoints,
+    and the page cache, mmap and temp store settings keep hot data in memory.
+    """
+
+    name = "sqlite"
+    DEFAULT_PATH = "storage/database.sqlite3"
+    PRAGMAS = (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("temp_store", "MEMORY"),
+        ("cache_size", "-65536"),
+        ("mmap_size", "268435456"),
+        ("busy_timeout", "5000"),
+        ("foreign_keys", "ON"),
+    )
+
+    _PLACEHOLDER = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`)|%s")
+
+    def __init__(self, path=DEFAULT_PATH, pragmas=None):
+        """
+        Initializes the backend.
+
+        Args:
+        - path (str): Optional. Database file path, or `:memory:`.
+        - pragmas (tuple): Optional. `(name, value)` pairs overriding `PRAGMAS`.
+        """
+        import sqlite3
+        self.path = path
+        self.pragmas = pragmas if pragmas is not None else self.PRAGMAS
+        self.errors = (sqlite3.Error,)
+
+    def connect(self, settings=None, **options):
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        import sqlite3
+        connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        for name, value in self.pragmas:
+            connection.execute(f"PRAGMA {name}={value}")
+        return connection
+
+    def translate(self, query):
+        return SQLiteBackend._translate(query)
+
+    def begin(self, connection):
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+
+    def is_connected(self, connection):
+        try:
+            connection.execute("SELECT 1")
+            return True
+        except self.errors:
+            return False
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _translate(query):
+        """
+        Helper method replacing `%s` placeholders outside of quoted literals with `?`.
+        """
+        return SQLiteBackend._PLACEHOLDER.sub(lambda match: match.group(1) or "?", query)
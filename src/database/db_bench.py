@@ -0,0 +1,368 @@
+"""
+`db_bench.py` | Module providing `DBBench`, a throughput and latency benchmark for the database layer.
+
+Where `db_debug.py` checks that CRUD operations work, this module measures how fast they are. It runs
+parameterized workloads through `DBCrud` over pooled connections:
+
+1. `point_reads`: `fetch_one` by primary key.
+2. `range_scans`: `fetch_all` over a primary key range of `scan_width` rows.
+3. `bulk_insert`: `insert_many` in batches of `batch_size` rows.
+4. `mixed`: `read_ratio` point reads, the rest single-row updates.
+
+Each workload is spread over `threads` worker threads. The report holds ops/sec and p50/p95/p99/max
+latency per workload and is saved as JSON, so two runs can be compared with `DBBench.compare()`.
+
+`DBBench.startup()` measures import time instead: each import statement runs in fresh interpreters, and
+the report lists the median milliseconds and which heavy modules (driver, `dotenv`, `asyncio`, ...) were
+loaded, so CLI start-up stays fast.
+
+Usage:
+- Against a throwaway SQLite file (no server needed):
+    python -m src.database.db_bench --backend sqlite --threads 4 --ops 20000
+- Against the backend configured in `config.ini` (e.g. a local MySQL container):
+    python -m src.database.db_bench --backend config --threads 8
+- Compare a run with a baseline, flagging throughput drops above 10%:
+    python -m src.database.db_bench --compare storage/bench/baseline.json storage/bench/latest.json
+- Measure import time, failing if `import src.database` takes over 100 ms or loads a heavy module:
+    python -m src.database.db_bench --startup --max-startup-ms 100
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import itertools
+import argparse
+import datetime
+import statistics
+import tempfile
+import random
+import json
+import time
+import sys
+import os
+from ..cli.cli import CLIUtility
+from .db_backend import DBBackend, SQLiteBackend
+from .db_connection import DBConnection
+from .db_crud import DBCrud
+
+
+class DBBench:
+    """
+    A utility class to benchmark `DBCrud` workloads and compare results between runs.
+    """
+
+    TABLE = "bench_items"
+    WORKLOADS = ("point_reads", "range_scans", "bulk_insert", "mixed")
+    STARTUP_STATEMENTS = ("import src", "import src.database", "from src.database import DBCrud")
+    HEAVY_MODULES = ("mysql.connector", "dotenv", "asyncio", "sqlite3", "click")
+
+    @staticmethod
+    def run(workloads=WORKLOADS, rows=100000, ops=10000, threads=4, scan_width=100, batch_size=1000,
+            read_ratio=0.8, seed=42):
+        """
+        Runs the selected workloads against the active backend and returns the report.
+
+        The benchmark table is recreated and seeded with `rows` rows first, and dropped at the end.
+
+        Args:
+        - workloads (tuple): Optional. Names from `DBBench.WORKLOADS` to run, in order.
+        - rows (int): Optional. Rows seeded before the read workloads.
+        - ops (int): Optional. Operations per workload, split across threads.
+        - threads (int): Optional. Number of worker threads, each with its own pooled connection.
+        - scan_width (int): Optional. Rows per range scan.
+        - batch_size (int): Optional. Rows per batch in `bulk_insert`.
+        - read_ratio (float): Optional. Share of reads in `mixed`.
+        - seed (int): Optional. Random seed, so runs issue the same key sequence.
+
+        Returns:
+        - dict: `meta` with the run parameters and `results` mapping workload name to its statistics.
+        """
+        DBConnection.pool(size=threads, max_overflow=0)
+        DBBench._setup(rows, batch_size)
+        report = {
+            "meta": {
+                "backend": DBConnection.backend().name,
+                "started": datetime.datetime.now().isoformat(timespec="seconds"),
+                "rows": rows, "ops": ops, "threads": threads, "scan_width": scan_width,
+                "batch_size": batch_size, "read_ratio": read_ratio, "seed": seed,
+            },
+            "results": {},
+        }
+        try:
+            for index, name in enumerate(workloads):
+                CLIUtility.info(f"Running {name} ({ops} ops, {threads} threads)...")
+                operation = DBBench._operation(name, rows, scan_width, batch_size, read_ratio)
+                result = DBBench._measure(operation, ops, threads, seed + index)
+                if name == "bulk_insert":
+                    result["rows_per_sec"] = result["ops_per_sec"] * batch_size
+                report["results"][name] = result
+                CLIUtility.success(
+                    f"{name}: {result['ops_per_sec']:,.0f} ops/sec, "
+                    f"p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms"
+                )
+        finally:
+            with DBConnection.pooled() as connection:
+                DBCrud.execute_query(connection, f"DROP TABLE IF EXISTS {DBBench.TABLE}")
+        return report
+
+    @staticmethod
+    def startup(statements=STARTUP_STATEMENTS, repeat=7):
+        """
+        Measures the import time of each statement in fresh interpreters.
+
+        Only the statement itself is timed, not interpreter start-up. Run from the project root.
+
+        Args:
+        - statements (tuple): Optional. Python import statements to measure.
+        - repeat (int): Optional. Interpreters started per statement; the median is reported.
+
+        Returns:
+        - dict: `meta` with the run parameters and `results` mapping each statement to `median_ms`,
+          `min_ms` and `heavy_modules`, the entries of `HEAVY_MODULES` it loaded.
+        """
+        probe = (
+            "import time\n"
+            "started = time.perf_counter()\n"
+            "{statement}\n"
+            "elapsed = (time.perf_counter() - started) * 1000\n"
+            "import sys, json\n"
+            "print(json.dumps({{'ms': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))\n"
+        )
+        report = {
+            "meta": {
+                "backend": "startup",
+                "started": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0], "repeat": repeat,
+            },
+            "results": {},
+        }
+        for statement in statements:
+            code = probe.format(statement=statement, heavy=DBBench.HEAVY_MODULES)
+            samples = []
+            for _ in range(repeat):
+                output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+                samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+            timings = [sample["ms"] for sample in samples]
+            result = {
+                "median_ms": statistics.median(timings),
+                "min_ms": min(timings),
+                "heavy_modules": samples[-1]["heavy"],
+            }
+            report["results"][statement] = result
+            heavy = ", ".join(result["heavy_modules"]) or "none"
+            CLIUtility.info(f"{statement}: {result['median_ms']:.1f} ms (heavy modules: {heavy})")
+        return report
+
+    @staticmethod
+    def save(report, path=None):
+        """
+        Writes a report to a JSON file.
+
+        Args:
+        - report (dict): A report returned by `run()`.
+        - path (str): Optional. Output path; defaults to a timestamped file in `storage/bench`.
+
+        Returns:
+        - str: The path written.
+        """
+        if path is None:
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join("storage", "bench", f"{report['meta']['backend']}-{stamp}.json")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+        CLIUtility.success(f"Benchmark report written to '{path}'.")
+        return path
+
+    @staticmethod
+    def compare(baseline_path, current_path, tolerance=0.10):
+        """
+        Compares two saved reports and prints per-workload throughput and p99 changes.
+
+        Args:
+        - baseline_path (str): Path of the reference report.
+        - current_path (str): Path of the report to check.
+        - tolerance (float): Optional. Relative throughput drop or p99 increase tolerated.
+
+        Returns:
+        - bool: True if no workload regressed beyond `tolerance`.
+        """
+        with open(baseline_path) as baseline_file, open(current_path) as current_file:
+            baseline = json.load(baseline_file)["results"]
+            current = json.load(current_file)["results"]
+
+        CLIUtility.header("Benchmark Comparison")
+        ok = True
+        for name in sorted(set(baseline) & set(current)):
+            before, after = baseline[name], current[name]
+            throughput = after["ops_per_sec"] / before["ops_per_sec"] - 1 if before["ops_per_sec"] else 0.0
+            p99 = after["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+            message = f"{name}: ops/sec {throughput:+.1%}, p99 {p99:+.1%}"
+            if throughput < -tolerance or p99 > tolerance:
+                ok = False
+                CLIUtility.error(message)
+            else:
+                CLIUtility.success(message)
+        return ok
+
+    @staticmethod
+    def _setup(rows, batch_size):
+        """
+        Helper method recreating and seeding the benchmark table.
+        """
+        with DBConnection.pooled() as connection:
+            DBCrud.execute_query(connection, f"DROP TABLE IF EXISTS {DBBench.TABLE}")
+            DBCrud.execute_query(connection, f"""
+            CREATE TABLE {DBBench.TABLE} (
+                id INT PRIMARY KEY,
+                name VARCHAR(64) NOT NULL,
+                value INT NOT NULL
+            )
+            """)
+            DBCrud.insert_many(
+                connection,
+                f"INSERT INTO {DBBench.TABLE} (id, name, value) VALUES (%s, %s, %s)",
+                ((key, f"item-{key}", key % 1000) for key in range(rows)),
+                batch_size=batch_size,
+                report=False
+            )
+
+    @staticmethod
+    def _operation(name, rows, scan_width, batch_size, read_ratio):
+        """
+        Helper method returning the callable `operation(connection, rng)` for one workload.
+        """
+        table = DBBench.TABLE
+        point_query = f"SELECT id, name, value FROM {table} WHERE id = %s"
+        range_query = f"SELECT id, name, value FROM {table} WHERE id BETWEEN %s AND %s"
+        update_query = f"UPDATE {table} SET value = value + 1 WHERE id = %s"
+        insert_query = f"INSERT INTO {table} (id, name, value) VALUES (%s, %s, %s)"
+        batch_starts = itertools.count(rows, batch_size)
+
+        def point_reads(connection, rng):
+            DBCrud.fetch_one(connection, point_query, (rng.randrange(rows),))
+
+        def range_scans(connection, rng):
+            start = rng.randrange(max(1, rows - scan_width))
+            DBCrud.fetch_all(connection, range_query, (start, start + scan_width - 1))
+
+        def bulk_insert(connection, rng):
+            start = next(batch_starts)
+            batch = [(key, f"item-{key}", key % 1000) for key in range(start, start + batch_size)]
+            DBCrud.insert_many(connection, insert_query, batch, batch_size=batch_size, report=False)
+
+        def mixed(connection, rng):
+            if rng.random() < read_ratio:
+                DBCrud.fetch_one(connection, point_query, (rng.randrange(rows),))
+            else:
+                DBCrud.execute_query(connection, update_query, (rng.randrange(rows),))
+
+        return {
+            "point_reads": point_reads,
+            "range_scans": range_scans,
+            "bulk_insert": bulk_insert,
+            "mixed": mixed,
+        }[name]
+
+    @staticmethod
+    def _measure(operation, ops, threads, seed):
+        """
+        Helper method running `ops` operations over `threads` workers and summarizing the latencies.
+
+        Returns:
+        - dict: `ops`, `seconds`, `ops_per_sec`, and `p50_ms`, `p95_ms`, `p99_ms`, `max_ms`.
+        """
+        def worker(index, count):
+            rng = random.Random(seed * 1000 + index)
+            latencies = []
+            with DBConnection.pooled() as connection:
+                for _ in range(count):
+                    started = time.perf_counter()
+                    operation(connection, rng)
+                    latencies.append(time.perf_counter() - started)
+            return latencies
+
+        shares = [ops // threads + (1 if index < ops % threads else 0) for index in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            parts = list(executor.map(worker, range(threads), shares))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for part in parts for latency in part)
+        return {
+            "ops": len(latencies),
+            "seconds": elapsed,
+            "ops_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": DBBench._percentile(latencies, 0.50) * 1000,
+            "p95_ms": DBBench._percentile(latencies, 0.95) * 1000,
+            "p99_ms": DBBench._percentile(latencies, 0.99) * 1000,
+            "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        }
+
+    @staticmethod
+    def _percentile(ordered, quantile):
+        """
+        Helper method returning the nearest-rank percentile of an ordered list.
+        """
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def main():
+    """
+    Command-line entry point for running and comparing benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the database layer")
+    parser.add_argument("--backend", choices=["sqlite", "config"], default="sqlite",
+                        help="sqlite: throwaway SQLite file; config: backend from config.ini")
+    parser.add_argument("--workloads", nargs="+", choices=DBBench.WORKLOADS, default=list(DBBench.WORKLOADS))
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--ops", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--scan-width", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--output", help="Report path (default: storage/bench/<backend>-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two saved reports instead of running")
+    parser.add_argument("--startup", action="store_true", help="Measure import time instead of queries")
+    parser.add_argument("--max-startup-ms", type=float,
+                        help="With --startup: fail if 'import src.database' is slower or loads a heavy module")
+    args = parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(0 if DBBench.compare(*args.compare) else 1)
+
+    if args.startup:
+        CLIUtility.header("Import Time Benchmark")
+        report = DBBench.startup()
+        DBBench.save(report, args.output)
+        if args.max_startup_ms is not None:
+            result = report["results"]["import src.database"]
+            if result["median_ms"] > args.max_startup_ms or result["heavy_modules"]:
+                CLIUtility.error(f"'import src.database' exceeds the {args.max_startup_ms:.0f} ms start-up budget.")
+                raise SystemExit(1)
+            CLIUtility.success(f"'import src.database' is within the {args.max_startup_ms:.0f} ms start-up budget.")
+        return
+
+    CLIUtility.header("Database Benchmark")
+    if args.backend == "sqlite":
+        directory = tempfile.mkdtemp(prefix="db-bench-")
+        DBConnection.use_backend(SQLiteBackend(os.path.join(directory, "bench.sqlite3")))
+    else:
+        DBConnection.use_backend(DBBackend.from_config())
+
+    report = DBBench.run(
+        workloads=tuple(args.workloads), rows=args.rows, ops=args.ops, threads=args.threads,
+        scan_width=args.scan_width, batch_size=args.batch_size, read_ratio=args.read_ratio
+    )
+    DBBench.save(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@
 `db_connection.py` | Module providing a static singleton utility class `DBConnection` for managing connections
 to a MySQL database using credentials stored in environment variables.
 
+The driver is reached through a `DBBackend` selected by the `[Database]` section of `config.ini`, so the same
+code can also run against an in-process SQLite file (see `db_backend.py`).
+
 This module includes methods to establish, disconnect, check connection status, and reset the connection
 to the MySQL database.
 
 Usage:
 - Ensure environment variables `DB_HOST`, `DB_NAME`, `DB_USER`, and `DB_PASSWORD` are properly set.
+  They are resolved once through `DBSettings` and re-read only when `.env` changes.
 - Use `DBConnection.get_instance()` to obtain the singleton instance of `DBConnection`.
 - Methods available:
   - `connect()`: Establishes a connection to the MySQL database.
@@ -14,6 +18,15 @@ Usage:
   - `is_connected()`: Checks if connected to the MySQL database.
   - `reset_connection()`: Resets the connection by reconnecting to the MySQL database.
   - `debug_banner()`: Displays debug information about configured database credentials.
+  - `pool()`: Returns the shared thread-safe `DBPool` of MySQL connections.
+  - `pooled()`: Context manager borrowing a connection from the shared pool.
+  - `backend()`: Returns the active `DBBackend`; `use_backend(backend)` overrides it.
+  - `reset_after_fork()`: Drops inherited connections in a child process so it opens its own.
+  - `get_connection()`: Returns a live shared connection, reconnecting with backoff if it died.
+
+Connection attempts go through a circuit breaker: after `breaker.failure_threshold` consecutive failures,
+attempts fail fast with `DBUnavailableError` for `breaker.reset_timeout` seconds, then one trial attempt is
+allowed. Reconnects wait with exponential backoff and jitter between attempts.
 
 Dependencies:
 - Python packages: mysql-connector-python, dotenv
@@ -24,9 +37,14 @@ Date: 2024 06
 
 
 from ..cli.cli import CLIUtility
-from mysql.connector import Error, connect
-from dotenv import load_dotenv
-import os
+from .db_pool import DBPool
+from .db_settings import DBSettings
+from .db_statement_cache import StatementCache
+from .db_backend import DBBackend
+from .db_resilience import CircuitBreaker, DBUnavailableError, backoff_delays
+from contextlib import contextmanager
+import threading
+import time
 
 class DBConnection:
     """
@@ -35,6 +53,17 @@ class DBConnection:
 
     _instance = None
     _connection = None
+    _pool = None
+    _backend = None
+    _lock = threading.Lock()
+    _reconnect_lock = threading.Lock()
+    _last_used = 0.0
+
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    connect_retries = 3
+    backoff_base = 0.5
+    backoff_max = 10.0
+    ping_interval = 5.0
 
     @staticmethod
     def get_instance():
@@ -47,63 +76,261 @@ class DBConnection:
             DBConnection._instance = DBConnection()
         return DBConnection._instance
 
+    @staticmethod
+    def backend():
+        """
+        Returns the active database backend, building it from `config.ini` on first use.
+
+        Returns:
+        - DBBackend: The active backend.
+        """
+        if DBConnection._backend is None:
+            with DBConnection._lock:
+                if DBConnection._backend is None:
+                    DBConnection._backend = DBBackend.from_config()
+        return DBConnection._backend
+
+    @staticmethod
+    def use_backend(backend):
+        """
+        Switches to another backend. The current connection and pool are closed first.
+
+        Args:
+        - backend (DBBackend): The backend to use from now on.
+        """
+        DBConnection.disconnect()
+        with DBConnection._lock:
+            pool = DBConnection._pool
+            DBConnection._pool = None
+            DBConnection._connection = None
+            DBConnection._backend = backend
+        if pool is not None:
+            pool.dispose()
+
+    @staticmethod
+    def reset_after_fork(backend=None):
+        """
+        Forgets the connection and pool inherited from a parent process, without closing them.
+
+        A forked child shares the parent's sockets, and closing them would end the parent's sessions. Call
+        this first in a child process (e.g. as a `ProcessPoolExecutor` initializer) so it opens its own.
+
+        Args:
+        - backend (DBBackend): Optional. Backend to use in the child; the inherited one is kept when omitted.
+        """
+        DBConnection._lock = threading.Lock()
+        DBConnection._reconnect_lock = threading.Lock()
+        DBConnection._pool = None
+        DBConnection._connection = None
+        if backend is not None:
+            DBConnection._backend = backend
+
     @staticmethod
     def debug_banner():
         """
         Displays a debug banner showing configured credentials and server details.
         """
-        load_dotenv()
-        host = os.getenv("DB_HOST")
-        database = os.getenv("DB_NAME")
-        user = os.getenv("DB_USER")
-        password = os.getenv("DB_PASSWORD")
+        settings = DBSettings.get()
+        host = settings.host
+        database = settings.database
+        user = settings.user
+        password = settings.password
 
         banner = f"""
         {'=' * 60}
         DEBUG BANNER: DATABASE CONFIG
         {'=' * 60}
-        Host:     {host:<20}
-        Database: {database:<20}
-        User:     {user:<20}
-        Password: {password:<20}
+        Backend:  {DBConnection.backend().name:<20}
+        Host:     {str(host):<20}
+        Database: {str(database):<20}
+        User:     {str(user):<20}
+        Password: {str(password):<20}
         """
         print(banner)
 
     @staticmethod
-    def connect():
+    def connect(retries=0):
         """
         Establishes a connection to the MySQL database using credentials from environment variables.
 
+        Args:
+        - retries (int): Optional. Extra attempts, with backoff, before giving up.
+
         Returns:
-        - connection: MySQL Connection object.
+        - connection: MySQL Connection object, or None if the database is unreachable.
         """
-        load_dotenv()
-        host = os.getenv("DB_HOST")
-        database = os.getenv("DB_NAME")
-        user = os.getenv("DB_USER")
-        password = os.getenv("DB_PASSWORD")
-
+        backend = DBConnection.backend()
         try:
-            CLIUtility.info("Connecting to MySQL database...")
-            DBConnection._connection = connect(
-                host=host,
-                database=database,
-                user=user,
-                password=password
-            )
-            CLIUtility.success("Connected to MySQL database")
-            return DBConnection._connection
-        except Error as e:
-            CLIUtility.error(f"Error connecting to MySQL database: {e}")
+            CLIUtility.info(f"Connecting to {backend.name} database...")
+            connection = DBConnection._open_with_retry(retries)
+            with DBConnection._lock:
+                previous, DBConnection._connection = DBConnection._connection, connection
+            if previous is not None:
+                StatementCache.evict(previous)
+            DBConnection._last_used = time.monotonic()
+            CLIUtility.success(f"Connected to {backend.name} database")
+            return connection
+        except DBUnavailableError as e:
+            CLIUtility.error(f"Error connecting to {backend.name} database: {e}")
             return None
 
+    @staticmethod
+    def get_connection(retries=None):
+        """
+        Returns the shared connection, making sure it is alive.
+
+        A connection used within the last `ping_interval` seconds is returned without a round trip;
+        otherwise it is pinged first. A dead or missing connection is replaced, retrying with exponential
+        backoff and jitter. Unlike `connect()`, failure raises instead of returning None.
+
+        Args:
+        - retries (int): Optional. Extra reconnect attempts; defaults to `DBConnection.connect_retries`.
+
+        Returns:
+        - connection: A live MySQL Connection object.
+
+        Raises:
+        - DBUnavailableError: If the circuit breaker is open or every attempt failed.
+        """
+        backend = DBConnection.backend()
+        with DBConnection._reconnect_lock:
+            connection = DBConnection._connection
+            now = time.monotonic()
+            if connection is not None:
+                if now - DBConnection._last_used < DBConnection.ping_interval or backend.is_connected(connection):
+                    DBConnection._last_used = now
+                    return connection
+                CLIUtility.warning(f"Lost {backend.name} connection, reconnecting...")
+                StatementCache.evict(connection)
+                # Close the dead connection now instead of leaving its socket to garbage collection; abort()
+                # skips the goodbye round trip a dead server would not answer.
+                try:
+                    backend.abort(connection)
+                except Exception:
+                    pass
+                with DBConnection._lock:
+                    DBConnection._connection = None
+
+            retries = DBConnection.connect_retries if retries is None else retries
+            connection = DBConnection._open_with_retry(retries)
+            with DBConnection._lock:
+                DBConnection._connection = connection
+            DBConnection._last_used = time.monotonic()
+            return connection
+
+    @staticmethod
+    def _open():
+        """
+        Opens a new MySQL connection without touching the shared singleton connection.
+
+        Used as the connection factory of the pool, so it stays quiet and lets errors propagate.
+        The attempt is refused while the circuit breaker is open, and its outcome is recorded.
+
+        Returns:
+        - connection: MySQL Connection object.
+
+        Raises:
+        - DBUnavailableError: If the circuit breaker is open.
+        """
+        breaker = DBConnection.breaker
+        if not breaker.allow():
+            raise DBUnavailableError(f"Database unavailable, next attempt in {breaker.retry_in():.1f}s")
+        try:
+            connection = DBConnection.backend().connect(DBSettings.get())
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return connection
+
+    @staticmethod
+    def _open_with_retry(retries):
+        """
+        Helper method opening a connection, retrying with exponential backoff and jitter.
+
+        Gives up immediately once the circuit breaker opens.
+
+        Args:
+        - retries (int): Extra attempts after the first one.
+
+        Returns:
+        - connection: MySQL Connection object.
+
+        Raises:
+        - DBUnavailableError: If every attempt failed or the circuit breaker is open.
+        """
+        backend = DBConnection.backend()
+        delays = backoff_delays(retries, DBConnection.backoff_base, DBConnection.backoff_max)
+        while True:
+            try:
+                return DBConnection._open()
+            except backend.errors as e:
+                delay = next(delays, None)
+                if delay is None or DBConnection.breaker.state == DBConnection.breaker.OPEN:
+                    raise DBUnavailableError(str(e)) from e
+                time.sleep(delay)
+
+    @staticmethod
+    def pool(size=5, max_overflow=10, timeout=30.0, recycle=3600):
+        """
+        Returns the shared connection pool, creating it on first use.
+
+        The sizing arguments only apply to the call that creates the pool.
+
+        Args:
+        - size (int): Optional. Number of connections kept open while idle.
+        - max_overflow (int): Optional. Extra connections allowed above `size` under load.
+        - timeout (float): Optional. Seconds to wait for a free connection on checkout.
+        - recycle (float): Optional. Maximum lifetime of a pooled connection in seconds.
+
+        Returns:
+        - DBPool: The shared pool instance.
+        """
+        backend = DBConnection.backend()
+        with DBConnection._lock:
+            if DBConnection._pool is None:
+                DBConnection._pool = DBPool(
+                    DBConnection._open,
+                    size=size,
+                    max_overflow=max_overflow,
+                    timeout=timeout,
+                    recycle=recycle,
+                    ping=backend.is_connected,
+                    ping_interval=DBConnection.ping_interval,
+                    on_close=StatementCache.evict
+                )
+            return DBConnection._pool
+
+    @staticmethod
+    @contextmanager
+    def pooled(timeout=None):
+        """
+        Context manager borrowing a connection from the shared pool.
+
+        Args:
+        - timeout (float): Optional. Seconds to wait for a free connection.
+
+        Yields:
+        - connection: MySQL Connection object, returned to the pool on exit.
+
+        Example:
+        >>> with DBConnection.pooled() as connection:
+        ...     DBCrud.fetch_all(connection, "SELECT 1")
+        """
+        with DBConnection.pool().connection(timeout) as connection:
+            yield connection
+
     @staticmethod
     def disconnect():
         """
         Disconnects from the MySQL database.
         """
-        if DBConnection._connection and DBConnection._connection.is_connected():
-            DBConnection._connection.close()
+        with DBConnection._lock:
+            connection = DBConnection._connection
+        if connection:
+            StatementCache.evict(connection)
+        if connection and DBConnection.backend().is_connected(connection):
+            connection.close()
             CLIUtility.success("Disconnected successfully")
 
     @staticmethod
@@ -114,22 +341,34 @@ class DBConnection:
         Returns:
         - bool: True if connected, False otherwise.
         """
-        return DBConnection._connection.is_connected() if DBConnection._connection else False
+        connection = DBConnection._connection
+        return DBConnection.backend().is_connected(connection) if connection else False
 
     @staticmethod
-    def reset_connection():
+    def reset_connection(reload_settings=False):
         """
         Resets the connection to the MySQL database by reconnecting.
 
+        Args:
+        - reload_settings (bool): Optional. Re-resolve credentials before reconnecting.
+
         Returns:
         - connection: Reconnected MySQL Connection object.
         """
         DBConnection.disconnect()
-        CLIUtility.info("Resetting MySQL connection...")
+        if reload_settings:
+            DBSettings.reload()
+        CLIUtility.info(f"Resetting {DBConnection.backend().name} connection...")
         return DBConnection.connect()
 
-# Example usage:
-db = DBConnection.get_instance()
-# db.connect()
-# db.reset_connection()
-# db.disconnect()
+def __getattr__(name):
+    """
+    Resolves the module-level `db` singleton on first access instead of at import time.
+
+    Example:
+    >>> from src.database.db_connection import db
+    >>> db.connect()
+    """
+    if name == "db":
+        return DBConnection.get_instance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
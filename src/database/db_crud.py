@@ -3,17 +3,29 @@
 
 This module provides methods to execute SQL queries for CRUD operations (Create, Read, Update, Delete) on
 MySQL databases. It utilizes a MySQL Connection object from `db_connection.DBConnection` for database
-interaction.
+interaction. Driver specifics (exception types, placeholders, cursor kinds) go through the active
+`DBBackend`, so the same calls also work on a SQLite connection when that backend is configured.
 
 Usage:
 - Ensure a valid MySQL database connection is established using `DBConnection.get_instance()`.
 - Use the provided methods to execute SQL queries for CRUD operations:
   - `execute_query(connection, query, values=None)`: Executes a SQL query.
-  - `fetch_all(connection, query, values=None)`: Fetches all records based on a SELECT query.
+  - `fetch_all(connection, query, values=None, shape="tuples")`: Fetches all records based on a SELECT query,
+    as tuples, `__slots__` records or per-column arrays.
   - `fetch_one(connection, query, values=None)`: Fetches a single record based on a SELECT query.
+  - `iter_rows(connection, query, values=None, chunk_size=1000)`: Streams records of a SELECT query.
+  - `iter_chunks(connection, query, values=None, chunk_size=1000, empty_chunk=False, drain=True)`: Streams `(columns, rows)` chunks of a SELECT query.
   - `insert_record(connection, query, values)`: Inserts a record into the database.
+  - `insert_many(connection, query, rows, batch_size=1000)`: Bulk inserts records in batches.
   - `update_record(connection, query, values)`: Updates a record in the database.
   - `delete_record(connection, query, values)`: Deletes a record from the database.
+  - `transaction(connection)`: Context manager grouping statements into one atomic commit.
+  - `enable_statement_cache(max_size=128)`: Reuses prepared cursors for repeated parameterized queries.
+  - `enable_result_cache(max_entries=1024, ttl=30.0, max_bytes=...)`: Caches `fetch_all`/`fetch_one` results.
+  - `metrics()`: Returns the `QueryMetrics` recording latency, rows and bytes per query fingerprint.
+
+Statements run inside `transaction()` do not commit individually; the scope commits once on success and
+rolls back on error. Nested scopes use savepoints, so an inner failure only undoes the inner block.
 
 Dependencies:
 - Python packages: mysql-connector-python
@@ -23,29 +35,49 @@ Date: 2024 06
 """
 
 
-from mysql.connector import Error
+from itertools import islice
+from contextlib import contextmanager
+from ..cli.cli import CLIUtility
 from .db_connection import DBConnection
+from .db_statement_cache import StatementCache
+from .db_result_cache import ResultCache
+from .db_resilience import DBUnavailableError
+from .db_metrics import QueryMetrics
+from .db_rows import RecordType
+import time
 
 class DBCrud:
     """
     A utility class to perform basic CRUD operations on the MySQL database.
     """
 
+    _transactions = {}
+    _statement_cache_size = 0
+    _result_cache = None
+    _pending_invalidations = {}
+    _metrics = None
+
     @staticmethod
-    def _get_cursor(connection):
+    def _get_cursor(connection, **options):
         """
         Helper method to get a cursor from the connection.
 
         Args:
         - connection: MySQL Connection object.
+        - **options: Optional. Cursor options understood by `DBBackend.cursor`, such as `streaming=True`.
 
         Returns:
         - cursor: MySQL cursor object.
+
+        Raises:
+        - DBUnavailableError: If `connection` is None, e.g. because `DBConnection.connect()` failed.
         """
+        if connection is None:
+            raise DBUnavailableError("No database connection; use DBConnection.get_connection()")
         try:
-            cursor = connection.cursor()
+            cursor = DBConnection.backend().cursor(connection, **options)
             return cursor
-        except Error as e:
+        except DBConnection.backend().errors as e:
             print(f"Error getting cursor: {e}")
             return None
 
@@ -60,13 +92,185 @@ class DBCrud:
         try:
             if cursor:
                 cursor.close()
-        except Error as e:
+        except DBConnection.backend().errors as e:
             print(f"Error closing cursor: {e}")
 
+    @staticmethod
+    def enable_statement_cache(max_size=128):
+        """
+        Enables the per-connection prepared statement cache for parameterized queries.
+
+        Once enabled, `execute_query`, `fetch_all` and `fetch_one` calls that pass `values` reuse a
+        prepared cursor keyed by the query text, so the server parses each distinct query once per
+        connection. Queries without values keep using plain cursors.
+
+        Args:
+        - max_size (int): Optional. Maximum number of prepared cursors kept per connection.
+        """
+        DBCrud._statement_cache_size = max_size
+
+    @staticmethod
+    def disable_statement_cache():
+        """
+        Disables the prepared statement cache. Already cached cursors are closed on connection reset.
+        """
+        DBCrud._statement_cache_size = 0
+
+    @staticmethod
+    def enable_result_cache(max_entries=1024, ttl=30.0, max_bytes=64 * 1024 * 1024):
+        """
+        Enables the read-through result cache for `fetch_all` and `fetch_one`.
+
+        Reads inside `transaction()` bypass the cache. Writes through `DBCrud` invalidate cached results
+        of the tables they touch; writes made by other processes are only picked up after `ttl` seconds.
+
+        Args:
+        - max_entries (int): Optional. Maximum number of cached results.
+        - ttl (float): Optional. Seconds a cached result stays valid.
+        - max_bytes (int): Optional. Approximate memory budget in bytes.
+
+        Returns:
+        - ResultCache: The active cache, whose `stats()` expose hit ratio and memory use.
+        """
+        DBCrud._result_cache = ResultCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+        return DBCrud._result_cache
+
+    @staticmethod
+    def disable_result_cache():
+        """
+        Disables and drops the result cache.
+        """
+        DBCrud._result_cache = None
+
+    @staticmethod
+    def metrics():
+        """
+        Returns the query metrics, configured from the `[Database]` section of `config.ini` on first use.
+
+        Returns:
+        - QueryMetrics: The active metrics; call `to_json()` or `to_prometheus()` to dump them.
+        """
+        if DBCrud._metrics is None:
+            DBCrud._metrics = QueryMetrics.from_config()
+        return DBCrud._metrics
+
+    @staticmethod
+    def _observe(query, started, rows=0, values=None, result=None, error=False):
+        """
+        Helper method recording one call in the query metrics.
+
+        Args:
+        - query (str): The SQL query.
+        - started (float): `time.perf_counter()` value taken before the call.
+        - rows (int): Optional. Rows returned or affected.
+        - values: Optional. Parameters sent with the query.
+        - result: Optional. Rows returned.
+        - error (bool): Optional. Whether the call failed.
+        """
+        metrics = DBCrud._metrics or DBCrud.metrics()
+        if metrics.enabled:
+            metrics.observe(query, time.perf_counter() - started, rows, values, result, error)
+
+    @staticmethod
+    def _cached_read(connection, kind, query, values):
+        """
+        Helper method to look up a read in the result cache.
+
+        Returns:
+        - tuple: `(hit, result)`; always a miss when caching is off or inside a transaction.
+        """
+        cache = DBCrud._result_cache
+        if cache is None or DBCrud.in_transaction(connection):
+            return False, None
+        return cache.get(kind, query, values)
+
+    @staticmethod
+    def _store_read(connection, kind, query, values, result):
+        """
+        Helper method to store a read result in the result cache when caching applies.
+        """
+        cache = DBCrud._result_cache
+        if cache is not None and not DBCrud.in_transaction(connection):
+            cache.put(kind, query, values, result)
+
+    @staticmethod
+    def _invalidate(connection, query):
+        """
+        Helper method to drop cached results of the tables written by `query`.
+
+        Inside a transaction the tables are invalidated again when the outermost scope ends, so results
+        re-cached by other connections before the commit do not survive it.
+
+        Args:
+        - connection: MySQL Connection object.
+        - query (str): The SQL statement that was executed.
+        """
+        cache = DBCrud._result_cache
+        if cache is None or query.lstrip()[:6].upper() == "SELECT":
+            return
+        tables = ResultCache.tables_of(query)
+        cache.invalidate_tables(tables)
+        if DBCrud.in_transaction(connection):
+            DBCrud._pending_invalidations.setdefault(id(connection), set()).update(tables)
+
+    @staticmethod
+    def _execute(connection, query, values):
+        """
+        Helper method to execute a query on a plain cursor, or on a cached prepared cursor when enabled.
+
+        Args:
+        - connection: MySQL Connection object.
+        - query (str): The SQL query to execute.
+        - values (tuple): Optional. Values to be substituted into the query.
+
+        Returns:
+        - tuple: `(cursor, cached)`; cached cursors must be released with `_release_cursor`, not closed.
+        """
+        backend = DBConnection.backend()
+        if values and DBCrud._statement_cache_size and backend.supports_prepared:
+            cache = StatementCache.for_connection(connection, DBCrud._statement_cache_size)
+            cursor, query = cache.acquire(query)
+            try:
+                cursor.execute(query, values)
+            except backend.errors:
+                cache.discard(query)
+                raise
+            return cursor, True
+
+        query = backend.translate(query)
+        cursor = DBCrud._get_cursor(connection)
+        if cursor:
+            if values:
+                cursor.execute(query, values)
+            else:
+                cursor.execute(query)
+        return cursor, False
+
+    @staticmethod
+    def _release_cursor(cursor, cached):
+        """
+        Helper method to close a plain cursor, or to drain unread rows of a cached prepared cursor.
+
+        Args:
+        - cursor: MySQL cursor object.
+        - cached (bool): Whether the cursor belongs to the statement cache.
+        """
+        if not cached:
+            DBCrud._close_cursor(cursor)
+            return
+        try:
+            if cursor.with_rows:
+                cursor.fetchall()
+        except DBConnection.backend().errors as e:
+            print(f"Error releasing cursor: {e}")
+
     @staticmethod
     def execute_query(connection, query, values=None):
         """
         Executes a SQL query on the MySQL database.
+
+        Commits immediately, unless called inside `transaction()`, where the commit is deferred to the
+        end of the scope and errors are re-raised so the scope can roll back.
         
         Args:
         - connection: MySQL Connection object.
@@ -76,25 +280,28 @@ class DBCrud:
         Returns:
         - cursor: MySQL cursor object for fetching results.
         """
-        cursor = None
+        started = time.perf_counter()
+        cursor, cached = None, False
         try:
-            cursor = DBCrud._get_cursor(connection)
+            cursor, cached = DBCrud._execute(connection, query, values)
             if cursor:
-                if values:
-                    cursor.execute(query, values)
-                else:
-                    cursor.execute(query)
-                connection.commit()
+                if not DBCrud.in_transaction(connection):
+                    connection.commit()
+                DBCrud._invalidate(connection, query)
+                DBCrud._observe(query, started, cursor.rowcount, values)
                 return cursor
-        except Error as e:
+        except DBConnection.backend().errors as e:
+            DBCrud._observe(query, started, values=values, error=True)
             print(f"Error executing query: {e}")
+            if DBCrud.in_transaction(connection):
+                raise
         finally:
-            DBCrud._close_cursor(cursor)
+            DBCrud._release_cursor(cursor, cached)
 
         return None
 
     @staticmethod
-    def fetch_all(connection, query, values=None):
+    def fetch_all(connection, query, values=None, shape="tuples"):
         """
         Fetches all records from the MySQL database based on the query.
         
@@ -102,26 +309,45 @@ class DBCrud:
         - connection: MySQL Connection object.
         - query (str): The SELECT SQL query to execute.
         - values (tuple): Optional. Values to be substituted into the query.
+        - shape (str): Optional. `"tuples"`, `"records"` for `__slots__` objects with one attribute per
+          column, or `"columns"` for one array/list per column (see `db_rows.py`).
         
         Returns:
-        - list: List of tuples containing fetched rows.
+        - list: List of tuples or records containing fetched rows; a dict of columns for `"columns"`.
+
+        Raises:
+        - ValueError: If the shape is unknown.
         """
-        cursor = None
+        if shape not in RecordType.SHAPES:
+            raise ValueError(f"Unknown result shape '{shape}'; expected one of {RecordType.SHAPES}")
+        kind = "all" if shape == "tuples" else "all:described"
+        hit, result = DBCrud._cached_read(connection, kind, query, values)
+        if hit:
+            if shape == "tuples":
+                return list(result)
+            columns, rows = result
+            return RecordType.shape(rows, columns, shape)
+
+        started = time.perf_counter()
+        cursor, cached = None, False
         try:
-            cursor = DBCrud._get_cursor(connection)
+            cursor, cached = DBCrud._execute(connection, query, values)
             if cursor:
-                if values:
-                    cursor.execute(query, values)
-                else:
-                    cursor.execute(query)
                 result = cursor.fetchall()
-                return result
-        except Error as e:
+                DBCrud._observe(query, started, len(result), values, result)
+                if shape == "tuples":
+                    DBCrud._store_read(connection, kind, query, values, list(result))
+                    return result
+                columns = tuple(column[0] for column in cursor.description or ())
+                DBCrud._store_read(connection, kind, query, values, (columns, list(result)))
+                return RecordType.shape(result, columns, shape)
+        except DBConnection.backend().errors as e:
+            DBCrud._observe(query, started, values=values, error=True)
             print(f"Error fetching all records: {e}")
         finally:
-            DBCrud._close_cursor(cursor)
+            DBCrud._release_cursor(cursor, cached)
 
-        return []
+        return {} if shape == "columns" else []
 
     @staticmethod
     def fetch_one(connection, query, values=None):
@@ -136,23 +362,128 @@ class DBCrud:
         Returns:
         - tuple: A single fetched row.
         """
-        cursor = None
+        hit, result = DBCrud._cached_read(connection, "one", query, values)
+        if hit:
+            return result
+
+        started = time.perf_counter()
+        cursor, cached = None, False
         try:
-            cursor = DBCrud._get_cursor(connection)
+            cursor, cached = DBCrud._execute(connection, query, values)
             if cursor:
-                if values:
-                    cursor.execute(query, values)
-                else:
-                    cursor.execute(query)
                 result = cursor.fetchone()
+                DBCrud._observe(query, started, int(result is not None), values, result)
+                DBCrud._store_read(connection, "one", query, values, result)
                 return result
-        except Error as e:
+        except DBConnection.backend().errors as e:
+            DBCrud._observe(query, started, values=values, error=True)
             print(f"Error fetching one record: {e}")
         finally:
-            DBCrud._close_cursor(cursor)
+            DBCrud._release_cursor(cursor, cached)
 
         return None
 
+    @staticmethod
+    def iter_rows(connection, query, values=None, chunk_size=1000):
+        """
+        Streams records from the MySQL database without materializing the whole result.
+
+        Rows are read from an unbuffered cursor with `fetchmany(chunk_size)`, so memory use is bounded
+        by `chunk_size` whatever the result size. The cursor is closed as soon as iteration ends, including
+        when the caller stops early or closes the generator; unread rows are then drained from the socket.
+        The connection cannot run other queries while the iterator is active.
+
+        Args:
+        - connection: MySQL Connection object.
+        - query (str): The SELECT SQL query to execute.
+        - values (tuple): Optional. Values to be substituted into the query.
+        - chunk_size (int): Optional. Number of rows fetched per round trip.
+
+        Returns:
+        - generator: Yields fetched rows as tuples.
+        """
+        chunks = DBCrud.iter_chunks(connection, query, values, chunk_size)
+        try:
+            for _, rows in chunks:
+                yield from rows
+        except DBConnection.backend().errors as e:
+            print(f"Error streaming records: {e}")
+        finally:
+            chunks.close()
+
+    @staticmethod
+    def iter_chunks(connection, query, values=None, chunk_size=1000, empty_chunk=False, drain=True):
+        """
+        Streams the result of a SELECT query as lists of up to `chunk_size` rows, with the column names.
+
+        Works like `iter_rows()` but hands out whole `fetchmany()` chunks, which suits consumers that
+        process rows in bulk (e.g. file writers), and raises driver errors instead of printing them, so a
+        failed read cannot be mistaken for the end of the result.
+
+        Args:
+        - connection: MySQL Connection object.
+        - query (str): The SELECT SQL query to execute.
+        - values (tuple): Optional. Values to be substituted into the query.
+        - chunk_size (int): Optional. Number of rows fetched per round trip.
+        - empty_chunk (bool): Optional. Yield one `(columns, [])` tuple for an empty result, so the
+          consumer still learns the column names.
+        - drain (bool): Optional. When closed early, read and discard the rest of the result so the connection
+          can be reused. Pass False when the caller aborts the connection instead (`DBBackend.abort`); the
+          cursor is then left to the connection.
+
+        Returns:
+        - generator: Yields `(columns, rows)` tuples; `columns` is the same tuple of names for every chunk.
+
+        Raises:
+        - DBUnavailableError: If `connection` is None or no cursor can be created.
+        """
+        cursor = None
+        exhausted = False
+        failed = False
+        started = time.perf_counter()
+        count = 0
+        translated = DBConnection.backend().translate(query)
+        try:
+            cursor = DBCrud._get_cursor(connection, streaming=True)
+            if cursor is None:
+                raise DBUnavailableError("Could not create a cursor")
+            if values:
+                cursor.execute(translated, values)
+            else:
+                cursor.execute(translated)
+            columns = tuple(column[0] for column in cursor.description or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    exhausted = True
+                    if empty_chunk and not count:
+                        yield columns, rows
+                    break
+                count += len(rows)
+                yield columns, rows
+        except DBConnection.backend().errors:
+            failed = True
+            raise
+        finally:
+            if exhausted or drain:
+                if cursor and not exhausted:
+                    DBCrud._drain(connection)
+                DBCrud._close_cursor(cursor)
+            DBCrud._observe(query, started, count, values, error=failed)
+
+    @staticmethod
+    def _drain(connection):
+        """
+        Helper method to discard unread rows of an unbuffered result so the connection can be reused.
+
+        Args:
+        - connection: MySQL Connection object.
+        """
+        try:
+            DBConnection.backend().drain(connection)
+        except DBConnection.backend().errors as e:
+            print(f"Error discarding unread rows: {e}")
+
     @staticmethod
     def insert_record(connection, query, values):
         """
@@ -165,6 +496,79 @@ class DBCrud:
         """
         DBCrud.execute_query(connection, query, values)
 
+    @staticmethod
+    def insert_many(connection, query, rows, batch_size=1000, report=True):
+        """
+        Inserts many records using batched `executemany` calls with one commit per batch.
+
+        For `INSERT ... VALUES (%s, ...)` statements mysql-connector rewrites each batch into a single
+        multi-row VALUES statement, so a batch costs one round trip and one commit instead of one per row.
+        Keep `batch_size` small enough for a batch to fit in the server's `max_allowed_packet`.
+
+        Args:
+        - connection: MySQL Connection object.
+        - query (str): The INSERT SQL query with placeholders for a single row.
+        - rows (iterable): Iterable of value tuples; consumed lazily, one batch at a time.
+        - batch_size (int): Optional. Number of rows sent and committed per batch.
+        - report (bool): Optional. Print the inserted row count and rows/sec when done.
+
+        Inside `transaction()` no per-batch commit is issued and errors are re-raised.
+
+        Returns:
+        - int: Number of rows inserted. Rows of a failed batch are rolled back and not counted.
+        """
+        total = 0
+        cursor = None
+        started = time.perf_counter()
+        in_transaction = DBCrud.in_transaction(connection)
+        statement = DBConnection.backend().translate(query)
+        try:
+            cursor = DBCrud._get_cursor(connection)
+            if cursor:
+                for batch in DBCrud._batches(rows, batch_size):
+                    cursor.executemany(statement, batch)
+                    if not in_transaction:
+                        connection.commit()
+                    total += len(batch)
+                DBCrud._invalidate(connection, query)
+                DBCrud._observe(query, started, total)
+        except DBConnection.backend().errors as e:
+            DBCrud._observe(query, started, total, error=True)
+            print(f"Error inserting records: {e}")
+            if in_transaction:
+                raise
+            try:
+                connection.rollback()
+            except DBConnection.backend().errors:
+                pass
+        finally:
+            DBCrud._close_cursor(cursor)
+
+        if report:
+            elapsed = time.perf_counter() - started
+            rate = total / elapsed if elapsed > 0 else float("inf")
+            CLIUtility.info(f"Inserted {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        return total
+
+    @staticmethod
+    def _batches(rows, batch_size):
+        """
+        Helper method to split an iterable of rows into lists of at most `batch_size` rows.
+
+        Args:
+        - rows (iterable): Iterable of value tuples.
+        - batch_size (int): Maximum number of rows per batch.
+
+        Returns:
+        - generator: Yields lists of rows.
+        """
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+
     @staticmethod
     def update_record(connection, query, values):
         """
@@ -188,3 +592,84 @@ class DBCrud:
         - values (tuple): Values to be deleted from the query.
         """
         DBCrud.execute_query(connection, query, values)
+
+    @staticmethod
+    def in_transaction(connection):
+        """
+        Checks whether the connection is inside a `transaction()` scope.
+
+        Args:
+        - connection: MySQL Connection object.
+
+        Returns:
+        - bool: True if statements on this connection are deferred to a surrounding transaction.
+        """
+        return DBCrud._transactions.get(id(connection), 0) > 0
+
+    @staticmethod
+    @contextmanager
+    def transaction(connection):
+        """
+        Context manager running the enclosed statements as one atomic unit.
+
+        The outermost scope commits once on success and rolls back if an exception escapes. Nested scopes
+        create a savepoint instead, released on success and rolled back to on error, so an inner failure
+        can be caught without discarding the outer work. `insert_record`, `update_record`,
+        `delete_record`, `execute_query` and `insert_many` join the surrounding scope.
+
+        Args:
+        - connection: MySQL Connection object.
+
+        Yields:
+        - connection: The same connection, for convenience.
+
+        Example:
+        >>> with DBCrud.transaction(connection):
+        ...     DBCrud.insert_record(connection, "INSERT INTO users (name) VALUES (%s)", ("Alice",))
+        ...     DBCrud.update_record(connection, "UPDATE stats SET users = users + 1", None)
+        """
+        key = id(connection)
+        depth = DBCrud._transactions.get(key, 0)
+        savepoint = f"sp_{depth}" if depth else None
+
+        if savepoint:
+            DBCrud._run(connection, f"SAVEPOINT {savepoint}")
+        else:
+            DBConnection.backend().begin(connection)
+        DBCrud._transactions[key] = depth + 1
+        try:
+            yield connection
+        except BaseException:
+            DBCrud._transactions[key] = depth
+            if savepoint:
+                DBCrud._run(connection, f"ROLLBACK TO SAVEPOINT {savepoint}")
+            else:
+                connection.rollback()
+            raise
+        else:
+            DBCrud._transactions[key] = depth
+            if savepoint:
+                DBCrud._run(connection, f"RELEASE SAVEPOINT {savepoint}")
+            else:
+                connection.commit()
+        finally:
+            if not depth:
+                DBCrud._transactions.pop(key, None)
+                tables = DBCrud._pending_invalidations.pop(key, None)
+                if tables and DBCrud._result_cache is not None:
+                    DBCrud._result_cache.invalidate_tables(tables)
+
+    @staticmethod
+    def _run(connection, statement):
+        """
+        Helper method to run a control statement (such as a savepoint) without committing.
+
+        Args:
+        - connection: MySQL Connection object.
+        - statement (str): The SQL statement to run.
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -19,9 +19,9 @@ Author: devinci-it
 Date: 2024 06
 """
 
-from mysql.connector import Error
 from .db_connection import DBConnection
 from .db_crud import DBCrud
+from .db_query import DBQuery
 
 class DBDebug:
     """
@@ -68,7 +68,7 @@ class DBDebug:
 
             # Create a debug table
             create_table_query = f"""
-            CREATE TABLE IF NOT EXISTS {debug_table_name} (
+            CREATE TABLE IF NOT EXISTS {DBQuery.identifier(debug_table_name)} (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name VARCHAR(255) NOT NULL,
                 email VARCHAR(255) NOT NULL
@@ -82,16 +82,15 @@ class DBDebug:
                 return
 
             # Insert records into debug table
-            insert_query = f"INSERT INTO {debug_table_name} (name, email) VALUES (%s, %s)"
             users = [("Alice", "alice@example.com"), ("Bob", "bob@example.com")]
-            for user in users:
-                DBCrud.insert_record(connection, insert_query, user)
+            insert_query, rows = DBQuery.insert_many(debug_table_name, ("name", "email"), users)
+            DBCrud.insert_many(connection, insert_query, rows)
 
             CLIUtility.info("Sample records inserted into debug table.")
 
             # Fetch all records from debug table
-            select_query = f"SELECT * FROM {debug_table_name}"
-            result = DBCrud.fetch_all(connection, select_query)
+            select_query, select_values = DBQuery.select(debug_table_name)
+            result = DBCrud.fetch_all(connection, select_query, select_values)
             if result:
                 for row in result:
                     CLIUtility.info(row)
@@ -100,8 +99,9 @@ class DBDebug:
                 return
 
             # Update record in debug table
-            update_query = f"UPDATE {debug_table_name} SET email = %s WHERE name = %s"
-            update_values = ("new_email@example.com", "Alice")
+            update_query, update_values = DBQuery.update(
+                debug_table_name, {"email": "new_email@example.com"}, where={"name": "Alice"}
+            )
             success = DBCrud.execute_query(connection, update_query, update_values)
             if success:
                 CLIUtility.info("Record updated in debug table.")
@@ -110,7 +110,7 @@ class DBDebug:
                 return
 
             # Fetch one record from debug table after update
-            result = DBCrud.fetch_one(connection, select_query + " WHERE name = %s", ("Alice",))
+            result = DBCrud.fetch_one(connection, *DBQuery.select(debug_table_name, where={"name": "Alice"}))
             if result:
                 CLIUtility.info(result)
             else:
@@ -118,8 +118,8 @@ class DBDebug:
                 return
 
             # Delete record from debug table
-            delete_query = f"DELETE FROM {debug_table_name} WHERE name = %s"
-            success = DBCrud.execute_query(connection, delete_query, ("Bob",))
+            delete_query, delete_values = DBQuery.delete(debug_table_name, where={"name": "Bob"})
+            success = DBCrud.execute_query(connection, delete_query, delete_values)
             if success:
                 CLIUtility.info("Record deleted from debug table.")
             else:
@@ -127,7 +127,7 @@ class DBDebug:
                 return
 
             # Clean up debug table
-            success = DBCrud.execute_query(connection, f"DROP TABLE IF EXISTS {debug_table_name}")
+            success = DBCrud.execute_query(connection, f"DROP TABLE IF EXISTS {DBQuery.identifier(debug_table_name)}")
             if success:
                 CLIUtility.success("Debug table cleaned up.")
             else:
@@ -136,10 +136,10 @@ class DBDebug:
 
             CLIUtility.success("DEBUGGING COMPLETED")
 
-        except Error as e:
+        except DBConnection.backend().errors as e:
             CLIUtility.error(f"Error during debugging: {e}")
         finally:
-            if connection and connection.is_connected():
+            if connection and DBConnection.is_connected():
                 DBConnection.disconnect()
                 CLIUtility.info("Database connection closed.")
 
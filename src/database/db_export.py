@@ -0,0 +1,408 @@
+"""
+`db_export.py` | Module providing `DBExporter`, a streaming exporter from query results to files.
+
+Rows are read with `DBCrud.iter_chunks` from an unbuffered (server-side) cursor and handed to the file
+writer one `fetchmany()` chunk at a time, so memory use depends on `chunk_size`, not on the table size.
+Each chunk is encoded in one call (`csv.writer.writerows`, one joined JSONL string, or packed arrays) and
+written to a 1 MiB buffered file, keeping the per-row Python work small.
+
+Formats:
+- `csv`: Header row with the column names, then one line per row.
+- `jsonl`: One JSON object per row; values JSON cannot represent (dates, decimals) are written as strings.
+- `columnar`: A compact binary file (`.dbcol`) storing each chunk as a row group of per-column arrays.
+  Integers and floats are packed as 64-bit arrays, text and bytes as a length array plus the raw data.
+  Read it back with `DBExporter.read_columnar()`.
+
+Compression: `gzip`, `bz2` and `xz` use the standard library; `zstd` needs the optional `zstandard`
+package. It is picked from the file suffix (`.gz`, `.bz2`, `.xz`, `.zst`) unless given explicitly.
+
+Output is written to `<path>.part` and renamed when complete, so a failed export never leaves a
+truncated file under the final name.
+
+Usage:
+    python -m src.database.db_export users storage/exports/users.csv.gz
+    python -m src.database.db_export "SELECT id, email FROM users WHERE id > 1000" users.jsonl
+    python -m src.database.db_export "SELECT * FROM users WHERE country = %s" fr.csv --values FR
+    python -m src.database.db_export events events.dbcol --compression zstd --chunk-size 50000
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+import argparse
+import struct
+import json
+import time
+import gzip
+import lzma
+import bz2
+import csv
+import io
+import os
+import re
+from ..cli.cli import CLIUtility
+from .db_connection import DBConnection
+from .db_crud import DBCrud
+from .db_query import DBQuery
+
+
+class DBExporter:
+    """
+    A utility class to stream query results into CSV, JSONL or columnar binary files.
+    """
+
+    FORMATS = ("csv", "jsonl", "columnar")
+    COMPRESSIONS = ("gzip", "bz2", "xz", "zstd")
+    MAGIC = b"DBCOL\x01"
+
+    _SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+    _FORMAT_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".dbcol": "columnar"}
+    _BUFFER_SIZE = 1 << 20
+    _QUERY = re.compile(r"\s*(select|with)\b", re.IGNORECASE)
+
+    @staticmethod
+    def export(source, path, values=None, fmt=None, compression=None, chunk_size=10000):
+        """
+        Exports a table or the result of a SELECT query to a file.
+
+        Args:
+        - source (str): A table name, or a SELECT query.
+        - path (str): Output file path.
+        - values (tuple): Optional. Values to be substituted into the query.
+        - fmt (str): Optional. `"csv"`, `"jsonl"` or `"columnar"`; guessed from the file suffix when omitted.
+        - compression (str): Optional. `"gzip"`, `"bz2"`, `"xz"` or `"zstd"`; guessed from the file suffix.
+        - chunk_size (int): Optional. Rows fetched and written per chunk.
+
+        Returns:
+        - int: Number of rows written.
+
+        Raises:
+        - ValueError: If `source` is neither a SELECT query nor a valid table name.
+        """
+        compression = compression or DBExporter._guess_compression(path)
+        fmt = fmt or DBExporter._guess_format(path)
+        query = source if DBExporter._QUERY.match(source) else DBQuery.select(source.strip())[0]
+        writer = {
+            "csv": DBExporter._write_csv,
+            "jsonl": DBExporter._write_jsonl,
+            "columnar": DBExporter._write_columnar,
+        }[fmt]
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial = f"{path}.part"
+        started = time.perf_counter()
+        written = 0
+
+        CLIUtility.info(f"Exporting to '{path}' ({fmt}{', ' + compression if compression else ''})...")
+        try:
+            with DBExporter._open(partial, compression) as output:
+                pool = DBConnection.pool()
+                connection = pool.checkout()
+                chunks = DBCrud.iter_chunks(connection, query, values, chunk_size, empty_chunk=True, drain=False)
+                finished = []
+
+                def read():
+                    yield from chunks
+                    finished.append(True)
+
+                try:
+                    for rows in writer(output, read()):
+                        written += rows
+                        CLIUtility.progress("Exporting", written, elapsed=time.perf_counter() - started)
+                finally:
+                    # A failed or abandoned export aborts the query instead of reading the rest of the result.
+                    if not finished:
+                        DBConnection.backend().abort(connection)
+                    chunks.close()
+                    pool.checkin(connection, discard=not finished)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        elapsed = time.perf_counter() - started
+        print()
+        CLIUtility.success(
+            f"Exported {written:,} rows to '{path}' in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)."
+        )
+        return written
+
+    @staticmethod
+    def read_columnar(path, compression=None):
+        """
+        Reads a columnar file written by `export(..., fmt="columnar")`, one row group at a time.
+
+        Args:
+        - path (str): Input file path.
+        - compression (str): Optional. Compression used; guessed from the file suffix when omitted.
+
+        Returns:
+        - generator: Yields dicts mapping each column name to the list of its values in the row group.
+
+        Raises:
+        - ValueError: If the file is not a columnar export.
+        """
+        compression = compression or DBExporter._guess_compression(path)
+        with DBExporter._open(path, compression, mode="rb") as source:
+            read = DBExporter._reader(source)
+            if read(len(DBExporter.MAGIC)) != DBExporter.MAGIC:
+                raise ValueError(f"'{path}' is not a columnar export")
+            (size,) = struct.unpack("<I", read(4))
+            columns = json.loads(read(size))["columns"]
+            while True:
+                (count,) = struct.unpack("<I", read(4))
+                if count == 0:
+                    return
+                yield {column: DBExporter._read_column(read, count) for column in columns}
+
+    @staticmethod
+    def _guess_compression(path):
+        """
+        Helper method mapping a compression suffix to a compression name, or None.
+        """
+        return DBExporter._SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+    @staticmethod
+    def _guess_format(path):
+        """
+        Helper method mapping a file suffix, ignoring any compression suffix, to a format name.
+
+        Raises:
+        - ValueError: If the suffix is not recognized.
+        """
+        base = os.path.splitext(path)[0] if DBExporter._guess_compression(path) else path
+        fmt = DBExporter._FORMAT_SUFFIXES.get(os.path.splitext(base)[1].lower())
+        if fmt is None:
+            raise ValueError(f"Cannot guess the format of '{path}'; pass fmt='csv', 'jsonl' or 'columnar'")
+        return fmt
+
+    @staticmethod
+    def _open(path, compression, mode="wb"):
+        """
+        Helper method opening a binary file, through a compressor when requested.
+
+        Raises:
+        - ValueError: If the compression name is unknown.
+        - ImportError: If `zstd` is requested without the `zstandard` package installed.
+        """
+        if compression is None:
+            return open(path, mode, buffering=DBExporter._BUFFER_SIZE)
+        if compression == "gzip":
+            return gzip.open(path, mode, compresslevel=6)
+        if compression == "bz2":
+            return bz2.open(path, mode)
+        if compression == "xz":
+            return lzma.open(path, mode)
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("zstd compression requires the 'zstandard' package") from e
+            raw = open(path, mode, buffering=DBExporter._BUFFER_SIZE)
+            if "w" in mode:
+                return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+            return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        raise ValueError(f"Unknown compression '{compression}'")
+
+    @staticmethod
+    def _write_csv(output, chunks):
+        """
+        Helper method writing chunks as CSV.
+
+        Returns:
+        - generator: Yields the number of rows written per chunk.
+        """
+        text = io.TextIOWrapper(output, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text)
+        header = False
+        try:
+            for columns, rows in chunks:
+                if not header:
+                    writer.writerow(columns)
+                    header = True
+                writer.writerows(rows)
+                yield len(rows)
+        finally:
+            text.detach()
+
+    @staticmethod
+    def _write_jsonl(output, chunks):
+        """
+        Helper method writing chunks as JSON lines.
+
+        Returns:
+        - generator: Yields the number of rows written per chunk.
+        """
+        encode = json.JSONEncoder(default=DBExporter._json_default, ensure_ascii=False).encode
+        for columns, rows in chunks:
+            if not rows:
+                continue
+            lines = "\n".join(encode(dict(zip(columns, row))) for row in rows)
+            output.write(lines.encode("utf-8"))
+            output.write(b"\n")
+            yield len(rows)
+
+    @staticmethod
+    def _json_default(value):
+        """
+        Helper method converting values JSON cannot represent.
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value).hex()
+        return str(value)
+
+    @staticmethod
+    def _write_columnar(output, chunks):
+        """
+        Helper method writing chunks as row groups of the columnar format.
+
+        Layout: magic, header length (uint32) and JSON header with the column names, then per row group the
+        row count (uint32) followed by every column, and a zero row count at the end. A column is a type code
+        (`q` int64, `d` float64, `s` UTF-8 text, `b` bytes, `n` all null), a null flag and, when set, one
+        null byte per row, then the payload length (uint64) and payload. All numbers are little-endian with
+        fixed widths, whatever the host.
+
+        Returns:
+        - generator: Yields the number of rows written per chunk.
+        """
+        output.write(DBExporter.MAGIC)
+        header = False
+        for columns, rows in chunks:
+            if not header:
+                DBExporter._write_header(output, columns)
+                header = True
+            if not rows:
+                continue
+            output.write(struct.pack("<I", len(rows)))
+            for values in zip(*rows):
+                DBExporter._write_column(output, values)
+            yield len(rows)
+        if not header:
+            DBExporter._write_header(output, ())
+        output.write(struct.pack("<I", 0))
+
+    @staticmethod
+    def _write_header(output, columns):
+        """
+        Helper method writing the columnar header.
+        """
+        header = json.dumps({"columns": list(columns)}).encode("utf-8")
+        output.write(struct.pack("<I", len(header)))
+        output.write(header)
+
+    @staticmethod
+    def _write_column(output, values):
+        """
+        Helper method encoding one column of a row group.
+        """
+        nulls = bytes(value is None for value in values)
+        has_nulls = any(nulls)
+        present = [value for value in values if value is not None] if has_nulls else values
+        kind = DBExporter._column_kind(present)
+
+        if kind in ("q", "d"):
+            filled = [0 if value is None else value for value in values] if has_nulls else values
+            payload = struct.pack(f"<{len(filled)}{kind}", *filled)
+        elif kind in ("s", "b"):
+            if kind == "s":
+                items = [b"" if value is None else str(value).encode("utf-8") for value in values]
+            else:
+                items = [b"" if value is None else bytes(value) for value in values]
+            payload = struct.pack(f"<{len(items)}I", *map(len, items)) + b"".join(items)
+        else:
+            payload = b""
+
+        output.write(kind.encode("ascii"))
+        output.write(b"\x01" if has_nulls else b"\x00")
+        if has_nulls:
+            output.write(nulls)
+        output.write(struct.pack("<Q", len(payload)))
+        output.write(payload)
+
+    @staticmethod
+    def _column_kind(values):
+        """
+        Helper method choosing the encoding of a column from its non-null values.
+        """
+        if not values:
+            return "n"
+        types = set(map(type, values))
+        if types <= {int, bool}:
+            if -(1 << 63) <= min(values) and max(values) < (1 << 63):
+                return "q"
+            return "s"
+        if types <= {int, bool, float}:
+            return "d"
+        if types <= {bytes, bytearray, memoryview}:
+            return "b"
+        return "s"
+
+    @staticmethod
+    def _reader(source):
+        """
+        Helper method returning `read(size)`, which reads exactly `size` bytes from a possibly short-reading stream.
+
+        Raises:
+        - ValueError: If the stream ends early.
+        """
+        def read(size):
+            data = source.read(size)
+            while len(data) < size:
+                more = source.read(size - len(data))
+                if not more:
+                    raise ValueError("Columnar export is truncated")
+                data += more
+            return data
+        return read
+
+    @staticmethod
+    def _read_column(read, count):
+        """
+        Helper method decoding one column of a row group into a list of values.
+        """
+        kind = read(1).decode("ascii")
+        has_nulls = read(1) == b"\x01"
+        nulls = read(count) if has_nulls else None
+        (size,) = struct.unpack("<Q", read(8))
+        payload = read(size)
+
+        if kind in ("q", "d"):
+            values = list(struct.unpack(f"<{count}{kind}", payload))
+        elif kind in ("s", "b"):
+            lengths = struct.unpack(f"<{count}I", payload[:4 * count])
+            values = []
+            offset = 4 * count
+            for length in lengths:
+                item = payload[offset:offset + length]
+                values.append(item.decode("utf-8") if kind == "s" else item)
+                offset += length
+        else:
+            values = [None] * count
+
+        if nulls:
+            values = [None if null else value for value, null in zip(values, nulls)]
+        return values
+
+
+def main():
+    """
+    Command-line entry point for exporting a table or query.
+    """
+    parser = argparse.ArgumentParser(description="Export a table or query result to a file")
+    parser.add_argument("source", help="Table name or SELECT query")
+    parser.add_argument("path", help="Output file (.csv, .jsonl, .dbcol, optionally + .gz/.bz2/.xz/.zst)")
+    parser.add_argument("--format", choices=DBExporter.FORMATS, help="Output format (default: from suffix)")
+    parser.add_argument("--compression", choices=DBExporter.COMPRESSIONS, help="Compression (default: from suffix)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--values", nargs="+", help="Values for the query's %%s placeholders, in order")
+    args = parser.parse_args()
+
+    DBExporter.export(args.source, args.path, values=tuple(args.values or ()), fmt=args.format,
+                      compression=args.compression, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
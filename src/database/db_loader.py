@@ -0,0 +1,382 @@
+"""
+`db_loader.py` | Module providing `DBLoader`, a streaming bulk loader for CSV and JSONL files.
+
+The input file is read line by line and never held in memory. Two load paths are available:
+
+1. `LOAD DATA LOCAL INFILE`: used for CSV files when the backend supports it and the server allows it.
+   The server parses the file itself, which is the fastest path by far.
+2. Batched inserts: the file is cut into batches of `batch_size` rows, and `workers` threads insert them
+   in parallel through `DBCrud.insert_many`, each on its own pooled connection. At most `2 * workers`
+   batches are buffered at any time.
+
+Progress is printed through `CLIUtility.progress`. The batched path writes a checkpoint file next to
+the input (`<file>.checkpoint.json`) recording committed batches, so a failed load resumes where it stopped.
+A batch whose commit succeeded just before a crash, but was not yet checkpointed, is inserted again on
+resume; give the table a primary or unique key to reject such duplicates.
+
+Usage:
+    python -m src.database.db_loader data/users.csv users
+    python -m src.database.db_loader data/events.jsonl events --workers 8 --batch-size 10000
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import argparse
+import json
+import time
+import csv
+import os
+from ..cli.cli import CLIUtility
+from .db_connection import DBConnection
+from .db_settings import DBSettings
+from .db_crud import DBCrud
+from .db_query import DBQuery
+
+
+class DBLoader:
+    """
+    A utility class to bulk load CSV and JSONL files into database tables.
+    """
+
+    FORMATS = ("csv", "jsonl")
+
+    @staticmethod
+    def load(path, table, columns=None, fmt=None, batch_size=5000, workers=4, local_infile=True, resume=True):
+        """
+        Loads a CSV or JSONL file into a table.
+
+        CSV files must start with a header row naming the columns. JSONL files hold one JSON object per
+        line; nested values are stored as JSON text.
+
+        Args:
+        - path (str): Input file path.
+        - table (str): Target table name.
+        - columns (list): Optional. Columns to load; defaults to the CSV header or the first JSONL object's keys.
+        - fmt (str): Optional. `"csv"` or `"jsonl"`; guessed from the file extension when omitted.
+        - batch_size (int): Optional. Rows per batch on the batched path.
+        - workers (int): Optional. Parallel insert workers on the batched path.
+        - local_infile (bool): Optional. Try `LOAD DATA LOCAL INFILE` first for CSV files.
+        - resume (bool): Optional. Continue from an existing checkpoint instead of starting over.
+
+        Returns:
+        - int: Number of rows loaded by this call.
+
+        Raises:
+        - ValueError: If the table or a column name is not a valid identifier, or a CSV row has more or
+          fewer fields than the header.
+        """
+        fmt = fmt or DBLoader._guess_format(path)
+        CLIUtility.header(f"Loading {os.path.basename(path)} into {table}")
+
+        if fmt == "csv" and local_infile and DBConnection.backend().supports_local_infile:
+            loaded = DBLoader._load_data_infile(path, table, columns)
+            if loaded is not None:
+                return loaded
+            CLIUtility.warning("LOAD DATA LOCAL INFILE unavailable, falling back to batched inserts.")
+
+        return DBLoader._load_batched(path, table, columns, fmt, batch_size, workers, resume)
+
+    @staticmethod
+    def _guess_format(path):
+        """
+        Helper method mapping a file extension to a format name.
+
+        Raises:
+        - ValueError: If the extension is not recognized.
+        """
+        extension = os.path.splitext(path)[1].lower().lstrip(".")
+        fmt = {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension)
+        if fmt is None:
+            raise ValueError(f"Cannot guess the format of '{path}'; pass fmt='csv' or fmt='jsonl'")
+        return fmt
+
+    @staticmethod
+    def _load_data_infile(path, table, columns):
+        """
+        Helper method loading a CSV file with `LOAD DATA LOCAL INFILE` on a dedicated connection.
+
+        Returns:
+        - int: Rows loaded, or None when the server or driver refuses local infile.
+
+        Raises:
+        - ValueError: If the table or a column name is not a valid identifier.
+        """
+        backend = DBConnection.backend()
+        with open(path, newline="") as csv_file:
+            header = next(csv.reader(csv_file), [])
+        if not header:
+            CLIUtility.info("Empty file, nothing to load.")
+            return 0
+        columns = columns or header
+        column_list = ", ".join(DBQuery.identifier(column) for column in columns)
+        query = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {DBQuery.identifier(table)} "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            "LINES TERMINATED BY '\\n' IGNORE 1 LINES "
+            f"({column_list})"
+        )
+
+        connection = None
+        cursor = None
+        started = time.perf_counter()
+        try:
+            connection = backend.connect(DBSettings.get(), allow_local_infile=True)
+            cursor = connection.cursor()
+            CLIUtility.info("Loading with LOAD DATA LOCAL INFILE...")
+            cursor.execute(query, (os.path.abspath(path),))
+            connection.commit()
+            loaded = cursor.rowcount
+        except backend.errors as e:
+            CLIUtility.warning(f"LOAD DATA LOCAL INFILE failed: {e}")
+            return None
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
+
+        elapsed = time.perf_counter() - started
+        CLIUtility.success(f"Loaded {loaded:,} rows in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s).")
+        return loaded
+
+    @staticmethod
+    def _load_batched(path, table, columns, fmt, batch_size, workers, resume):
+        """
+        Helper method loading a file through parallel batched inserts with a resumable checkpoint.
+
+        Returns:
+        - int: Rows inserted by this call.
+
+        Raises:
+        - RuntimeError: If a batch fails; the checkpoint is kept so the load can be resumed.
+        """
+        checkpoint_path = f"{path}.checkpoint.json"
+        checkpoint = DBLoader._read_checkpoint(checkpoint_path, path, table) if resume else None
+        done = set(checkpoint["batches"]) if checkpoint else set()
+        if done:
+            CLIUtility.info(f"Resuming from checkpoint: {len(done)} batches already loaded.")
+
+        total_bytes = os.path.getsize(path)
+        DBConnection.pool(size=workers, max_overflow=0)
+        started = time.perf_counter()
+        loaded = 0
+        pending = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            reader = DBLoader._batches(path, fmt, columns, batch_size)
+            try:
+                for index, (batch_columns, batch, position) in enumerate(reader):
+                    if index in done:
+                        continue
+                    query, rows = DBQuery.insert_many(table, batch_columns, batch)
+                    future = executor.submit(DBLoader._insert_batch, query, list(rows), batch_size)
+                    pending[future] = (index, len(batch))
+
+                    if len(pending) >= 2 * workers:
+                        loaded, failure = DBLoader._collect(pending, done, loaded, checkpoint_path, path, table)
+                        if failure:
+                            break
+                        CLIUtility.progress(f"Loading {table}", position, total_bytes,
+                                            time.perf_counter() - started, unit="bytes")
+            except BaseException:
+                # Bad input (or an interrupt): checkpoint the batches already handed to the pool before the
+                # error propagates, so a rerun does not insert them again.
+                for future in pending:
+                    future.cancel()
+                while pending:
+                    loaded, _ = DBLoader._collect(pending, done, loaded, checkpoint_path, path, table)
+                print()
+                CLIUtility.error(f"Load stopped after {loaded:,} rows; the checkpoint is kept in '{checkpoint_path}'.")
+                raise
+
+            if failure:
+                for future in pending:
+                    future.cancel()
+            while pending:
+                loaded, error = DBLoader._collect(pending, done, loaded, checkpoint_path, path, table)
+                failure = failure or error
+
+        if failure:
+            print()
+            CLIUtility.error(f"Load failed after {loaded:,} rows; rerun to resume from '{checkpoint_path}'.")
+            raise RuntimeError(f"Bulk load of '{path}' into '{table}' failed") from failure
+
+        elapsed = time.perf_counter() - started
+        CLIUtility.progress(f"Loading {table}", total_bytes, total_bytes, elapsed, unit="bytes")
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        CLIUtility.success(f"Loaded {loaded:,} rows in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s).")
+        return loaded
+
+    @staticmethod
+    def _collect(pending, done, loaded, checkpoint_path, path, table):
+        """
+        Helper method waiting for at least one batch to finish and checkpointing completed batches.
+
+        Returns:
+        - tuple: `(loaded, failure)` with the updated row count and the first exception, if any.
+        """
+        finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        failure = None
+        for future in finished:
+            index, count = pending.pop(future)
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                failure = failure or error
+                continue
+            done.add(index)
+            loaded += count
+        DBLoader._write_checkpoint(checkpoint_path, path, table, done)
+        return loaded, failure
+
+    @staticmethod
+    def _insert_batch(query, batch, batch_size):
+        """
+        Helper method inserting one batch on a pooled connection.
+
+        Raises:
+        - RuntimeError: If not every row of the batch was inserted.
+        """
+        with DBConnection.pooled() as connection:
+            inserted = DBCrud.insert_many(connection, query, batch, batch_size=batch_size, report=False)
+        if inserted != len(batch):
+            raise RuntimeError(f"Inserted {inserted} of {len(batch)} rows")
+
+    @staticmethod
+    def _batches(path, fmt, columns, batch_size):
+        """
+        Helper method streaming a file as batches of value tuples.
+
+        Returns:
+        - generator: Yields `(columns, batch, bytes_read)` tuples.
+        """
+        with open(path, "rb") as data_file:
+            position = [0]
+
+            def lines():
+                for raw in data_file:
+                    position[0] += len(raw)
+                    yield raw.decode("utf-8")
+
+            if fmt == "csv":
+                rows = csv.reader(lines())
+                header = next(rows, None)
+                if header is None:
+                    return
+                columns = columns or header
+                indexes = [header.index(column) for column in columns]
+                records = DBLoader._csv_records(rows, len(header), indexes, path)
+            else:
+                records, columns = DBLoader._json_records(lines(), columns)
+
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    yield columns, batch, position[0]
+                    batch = []
+            if batch:
+                yield columns, batch, position[0]
+
+    @staticmethod
+    def _csv_records(rows, width, indexes, path):
+        """
+        Helper method picking the selected fields of CSV rows, skipping blank lines.
+
+        Raises:
+        - ValueError: If a row does not have as many fields as the header, naming its line number.
+        """
+        for row in rows:
+            if not row:
+                continue
+            if len(row) != width:
+                raise ValueError(f"'{path}' line {rows.line_num}: {len(row)} fields, the header has {width}")
+            yield tuple(row[i] for i in indexes)
+
+    @staticmethod
+    def _json_records(lines, columns):
+        """
+        Helper method turning JSONL lines into value tuples, taking columns from the first object if needed.
+
+        Returns:
+        - tuple: `(records, columns)` where `records` is a generator of value tuples.
+        """
+        objects = (json.loads(line) for line in lines if line.strip())
+        first = next(objects, None)
+        if first is None:
+            return iter(()), columns or []
+        columns = columns or list(first)
+
+        records = (
+            tuple(DBLoader._json_value(obj.get(column)) for column in columns)
+            for obj in itertools.chain((first,), objects)
+        )
+        return records, columns
+
+    @staticmethod
+    def _json_value(value):
+        """
+        Helper method storing nested JSON values as JSON text.
+        """
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    @staticmethod
+    def _read_checkpoint(checkpoint_path, path, table):
+        """
+        Helper method reading a checkpoint, ignoring it if it belongs to another file version or table.
+        """
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        stat = os.stat(path)
+        if (checkpoint.get("table"), checkpoint.get("size"), checkpoint.get("mtime")) != (table, stat.st_size, stat.st_mtime):
+            CLIUtility.warning("Ignoring stale checkpoint for a different file or table.")
+            return None
+        return checkpoint
+
+    @staticmethod
+    def _write_checkpoint(checkpoint_path, path, table, done):
+        """
+        Helper method atomically writing the set of committed batch indexes.
+        """
+        stat = os.stat(path)
+        checkpoint = {"table": table, "size": stat.st_size, "mtime": stat.st_mtime, "batches": sorted(done)}
+        temporary = f"{checkpoint_path}.tmp"
+        with open(temporary, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temporary, checkpoint_path)
+
+
+def main():
+    """
+    Command-line entry point for bulk loading a file.
+    """
+    parser = argparse.ArgumentParser(description="Bulk load a CSV or JSONL file into a table")
+    parser.add_argument("path", help="Input .csv or .jsonl file")
+    parser.add_argument("table", help="Target table")
+    parser.add_argument("--columns", nargs="+", help="Columns to load (default: header / first object keys)")
+    parser.add_argument("--format", choices=DBLoader.FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-local-infile", action="store_true", help="Skip LOAD DATA LOCAL INFILE")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    DBLoader.load(
+        args.path, args.table, columns=args.columns, fmt=args.format, batch_size=args.batch_size,
+        workers=args.workers, local_infile=not args.no_local_infile, resume=not args.restart
+    )
+
+
+if __name__ == "__main__":
+    main()
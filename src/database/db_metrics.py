@@ -0,0 +1,249 @@
+"""
+`db_metrics.py` | Module providing `QueryMetrics`, in-process latency and volume instrumentation for `DBCrud`.
+
+Every `DBCrud.execute_query`/`fetch_all`/`fetch_one`/`insert_many` call is recorded under the query's
+fingerprint: the SQL text with literals and placeholders replaced by `?`, IN-lists collapsed and whitespace
+normalized, so `WHERE id = 1` and `WHERE id = 2` aggregate together. For each fingerprint the wall time
+goes into a log-bucketed histogram (p50/p95/p99), alongside call, error, row and byte counters. Bytes are
+estimated from the size of the values sent and the rows returned. Queries slower than the configured
+threshold are written to the application log.
+
+Usage:
+- Configure in `config.ini`:
+
+      [Database]
+      metrics = true
+      slow_query_ms = 200
+
+- `DBCrud.metrics()`: Returns the active `QueryMetrics`.
+- `metrics.snapshot()` / `metrics.to_json()`: Per-fingerprint statistics as a dict / JSON text.
+- `metrics.to_prometheus()`: The same statistics in Prometheus text exposition format.
+- `metrics.reset()`: Clears all statistics.
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from functools import lru_cache
+import threading
+import logging
+import math
+import json
+import re
+
+
+class QueryMetrics:
+    """
+    Thread-safe per-fingerprint query statistics with latency histograms and a slow-query log.
+    """
+
+    BUCKET_GROWTH = 1.08
+    BUCKET_FLOOR = 1e-6
+
+    _COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+    _LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s|\?")
+    # Anchored to IN, so `VALUES (?, ?)` row tuples keep their width and row count.
+    _IN_LISTS = re.compile(r"\b(IN\s*)\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+    _SPACES = re.compile(r"\s+")
+
+    def __init__(self, enabled=True, slow_query_ms=None):
+        """
+        Initializes empty statistics.
+
+        Args:
+        - enabled (bool): Optional. Whether `observe()` records anything.
+        - slow_query_ms (float): Optional. Log queries at or above this many milliseconds; `None` disables.
+        """
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_config(config=None):
+        """
+        Builds metrics from the `[Database]` section of `config.ini`.
+
+        Args:
+        - config (Config): Optional. Configuration handler; `config.ini` is read when omitted.
+
+        Returns:
+        - QueryMetrics: Enabled unless `metrics = false`; `slow_query_ms` sets the slow-query threshold,
+          and leaving it empty disables the slow-query log.
+        """
+        if config is None:
+            from ..config import Config
+            config = Config()
+        enabled = config.config.getboolean("Database", "metrics", fallback=True)
+        slow_query_ms = config.config.get("Database", "slow_query_ms", fallback="").strip()
+        slow_query_ms = float(slow_query_ms) if slow_query_ms else None
+        return QueryMetrics(enabled=enabled, slow_query_ms=slow_query_ms)
+
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def fingerprint(query):
+        """
+        Normalizes a query so that queries differing only in literal values share one fingerprint.
+
+        Args:
+        - query (str): The SQL query.
+
+        Returns:
+        - str: The fingerprint, e.g. `SELECT * FROM users WHERE id IN (?+) AND name = ?`.
+        """
+        text = QueryMetrics._COMMENTS.sub(" ", query)
+        text = QueryMetrics._LITERALS.sub("?", text)
+        text = QueryMetrics._IN_LISTS.sub(r"\1(?+)", text)
+        return QueryMetrics._SPACES.sub(" ", text).strip()
+
+    def observe(self, query, seconds, rows=0, values=None, result=None, error=False):
+        """
+        Records one query execution.
+
+        Args:
+        - query (str): The SQL query.
+        - seconds (float): Wall time of the call.
+        - rows (int): Optional. Rows returned or affected.
+        - values: Optional. Parameters sent with the query, counted towards bytes.
+        - result: Optional. Rows returned, counted towards bytes.
+        - error (bool): Optional. Whether the call failed.
+        """
+        if not self.enabled:
+            return
+        fingerprint = QueryMetrics.fingerprint(query)
+        size = len(query) + QueryMetrics._payload_size(values) + QueryMetrics._payload_size(result)
+        bucket = QueryMetrics._bucket(seconds)
+
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                stats = self._stats[fingerprint] = {
+                    "calls": 0, "errors": 0, "rows": 0, "bytes": 0,
+                    "total_seconds": 0.0, "max_seconds": 0.0, "buckets": {},
+                }
+            stats["calls"] += 1
+            stats["errors"] += bool(error)
+            stats["rows"] += rows if rows and rows > 0 else 0
+            stats["bytes"] += size
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+
+        if self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+            from ..log import logger
+            logger.log(
+                "Slow query (%.1f ms, %s rows): %s", logging.WARNING, seconds * 1000, rows, fingerprint,
+                duration_ms=round(seconds * 1000, 1), rows=rows, fingerprint=fingerprint
+            )
+
+    def snapshot(self):
+        """
+        Returns a copy of the statistics with percentiles computed.
+
+        Returns:
+        - dict: Maps each fingerprint to `calls`, `errors`, `rows`, `bytes`, `total_seconds`,
+          `mean_seconds`, `max_seconds`, `p50`, `p95` and `p99` (seconds).
+        """
+        with self._lock:
+            items = [(fingerprint, dict(stats, buckets=dict(stats["buckets"])))
+                     for fingerprint, stats in self._stats.items()]
+
+        snapshot = {}
+        for fingerprint, stats in items:
+            buckets = stats.pop("buckets")
+            stats["mean_seconds"] = stats["total_seconds"] / stats["calls"]
+            for name, quantile in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                stats[name] = min(QueryMetrics._percentile(buckets, stats["calls"], quantile), stats["max_seconds"])
+            snapshot[fingerprint] = stats
+        return snapshot
+
+    def to_json(self, indent=2):
+        """
+        Returns the statistics as JSON text.
+
+        Args:
+        - indent (int): Optional. JSON indentation.
+
+        Returns:
+        - str: JSON object keyed by fingerprint.
+        """
+        return json.dumps(self.snapshot(), indent=indent, sort_keys=True)
+
+    def to_prometheus(self, prefix="db_query"):
+        """
+        Returns the statistics in Prometheus text exposition format.
+
+        Args:
+        - prefix (str): Optional. Metric name prefix.
+
+        Returns:
+        - str: Summary of durations plus counters for calls, errors, rows and bytes.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_duration_seconds Query wall time.",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for fingerprint, stats in sorted(snapshot.items()):
+            label = QueryMetrics._label(fingerprint)
+            for name, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                lines.append(f'{prefix}_duration_seconds{{query="{label}",quantile="{quantile}"}} {stats[name]:.9f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{query="{label}"}} {stats["total_seconds"]:.9f}')
+            lines.append(f'{prefix}_duration_seconds_count{{query="{label}"}} {stats["calls"]}')
+
+        for counter, help_text in (("errors", "Failed queries."), ("rows", "Rows returned or affected."),
+                                   ("bytes", "Estimated bytes transferred.")):
+            lines.append(f"# HELP {prefix}_{counter}_total {help_text}")
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            for fingerprint, stats in sorted(snapshot.items()):
+                lines.append(f'{prefix}_{counter}_total{{query="{QueryMetrics._label(fingerprint)}"}} {stats[counter]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Clears all statistics.
+        """
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def _bucket(seconds):
+        """
+        Helper method mapping a duration to its log-scale histogram bucket index.
+        """
+        if seconds <= QueryMetrics.BUCKET_FLOOR:
+            return 0
+        return int(math.log(seconds / QueryMetrics.BUCKET_FLOOR, QueryMetrics.BUCKET_GROWTH)) + 1
+
+    @staticmethod
+    def _percentile(buckets, total, quantile):
+        """
+        Helper method returning the upper bound of the bucket holding the given quantile.
+        """
+        rank = quantile * total
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= rank:
+                return QueryMetrics.BUCKET_FLOOR * QueryMetrics.BUCKET_GROWTH ** bucket
+        return 0.0
+
+    @staticmethod
+    def _payload_size(payload):
+        """
+        Helper method estimating the wire size of values or rows.
+        """
+        if payload is None:
+            return 0
+        if isinstance(payload, (str, bytes, bytearray)):
+            return len(payload)
+        if isinstance(payload, (list, tuple)):
+            return sum(QueryMetrics._payload_size(item) for item in payload)
+        return 8
+
+    @staticmethod
+    def _label(fingerprint):
+        """
+        Helper method escaping a fingerprint for use as a Prometheus label value.
+        """
+        return fingerprint.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
@@ -0,0 +1,544 @@
+"""
+`db_migrate.py` | Module providing `DBMigrator`, versioned schema migrations with up/down runs.
+
+Migrations are files in the directory set by `migrations` in the `[Database]` section of `config.ini`
+(default `scripts/migrations`), named `<version>_<name>.py` or `<version>_<name>.sql`. Versions are
+numbers (`DBMigrator.create()` uses a timestamp) and run in ascending order.
+
+- Python migrations define `up(connection)` and `down(connection)` and use `DBCrud` on the connection.
+- SQL migrations hold a `-- migrate:up` section and a `-- migrate:down` section of `;`-terminated statements.
+
+Applied versions are recorded in the `schema_migrations` table with a checksum of the file, so edits to
+an applied migration are reported by `status()`. Each migration is recorded only after all of its
+statements succeed. MySQL commits DDL implicitly, so a migration failing halfway through is not rolled
+back; keep migrations small, one change each.
+
+Large tables: `DBMigrator.copy_and_swap()` rebuilds a table without a long-running `ALTER TABLE`. It
+creates the new table under a shadow name, keeps it in sync with triggers, copies existing rows in short
+primary-key range chunks (printing progress and ETA), then atomically renames the shadow into place.
+On MySQL, creating triggers may need the `TRIGGER` privilege (and `log_bin_trust_function_creators`
+when binary logging is on).
+
+Usage:
+    python -m src.database.db_migrate new add_users_table
+    python -m src.database.db_migrate status
+    python -m src.database.db_migrate migrate [--to VERSION]
+    python -m src.database.db_migrate rollback [--steps N | --to VERSION]
+
+Example migration (`scripts/migrations/20240601120000_widen_email.py`):
+
+    from src.database.db_migrate import DBMigrator
+
+    def up(connection):
+        DBMigrator.copy_and_swap(connection, "users", '''
+            CREATE TABLE {table} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                email VARCHAR(512) NOT NULL
+            )
+        ''')
+
+    def down(connection):
+        ...
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+import importlib.util
+import datetime
+import argparse
+import hashlib
+import time
+import os
+import re
+from ..cli.cli import CLIUtility
+from .db_connection import DBConnection
+from .db_crud import DBCrud
+from .db_query import DBQuery
+
+
+class MigrationError(Exception):
+    """
+    Raised when a migration cannot be loaded or one of its statements fails.
+    """
+
+
+class Migration:
+    """
+    One migration file.
+
+    Attributes:
+        version (int): Version number from the file name.
+        name (str): Descriptive name from the file name.
+        path (str): File path.
+    """
+
+    __slots__ = ("version", "name", "path")
+
+    def __init__(self, version, name, path):
+        """
+        Initializes the migration.
+
+        Args:
+        - version (int): Version number.
+        - name (str): Descriptive name.
+        - path (str): File path.
+        """
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def checksum(self):
+        """
+        Returns the SHA-256 hex digest of the file.
+        """
+        with open(self.path, "rb") as migration_file:
+            return hashlib.sha256(migration_file.read()).hexdigest()
+
+    def run(self, connection, direction):
+        """
+        Runs the `up` or `down` part of the migration.
+
+        Args:
+        - connection: Database connection.
+        - direction (str): `"up"` or `"down"`.
+
+        Raises:
+        - MigrationError: If the migration has no such part or a statement fails.
+        """
+        if self.path.endswith(".sql"):
+            statements = self._sql_sections().get(direction)
+            if statements is None:
+                raise MigrationError(f"{os.path.basename(self.path)} has no '-- migrate:{direction}' section")
+            for statement in statements:
+                DBMigrator.run(connection, statement)
+            return
+
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        function = getattr(module, direction, None)
+        if function is None:
+            raise MigrationError(f"{os.path.basename(self.path)} does not define {direction}(connection)")
+        function(connection)
+
+    def _sql_sections(self):
+        """
+        Helper method splitting a SQL migration into its `up` and `down` statement lists.
+        """
+        with open(self.path) as migration_file:
+            text = migration_file.read()
+        sections = {}
+        parts = re.split(r"^\s*--\s*migrate:(up|down)\s*$", text, flags=re.MULTILINE | re.IGNORECASE)
+        for direction, body in zip(parts[1::2], parts[2::2]):
+            statements = [statement.strip() for statement in re.split(r";\s*$", body, flags=re.MULTILINE)]
+            sections[direction.lower()] = [statement for statement in statements if statement]
+        return sections
+
+
+class DBMigrator:
+    """
+    A utility class to apply and roll back versioned schema migrations.
+    """
+
+    TABLE = "schema_migrations"
+    DEFAULT_DIRECTORY = "scripts/migrations"
+
+    _FILE = re.compile(r"^(\d+)_(\w+)\.(py|sql)$")
+
+    @staticmethod
+    def directory(config=None):
+        """
+        Returns the migrations directory configured in the `[Database]` section of `config.ini`.
+
+        Args:
+        - config (Config): Optional. Configuration handler; `config.ini` is read when omitted.
+
+        Returns:
+        - str: Directory path.
+        """
+        if config is None:
+            from ..config import Config
+            config = Config()
+        return config.config.get("Database", "migrations", fallback=DBMigrator.DEFAULT_DIRECTORY)
+
+    @staticmethod
+    def discover(directory=None):
+        """
+        Lists the migration files of a directory in version order.
+
+        Args:
+        - directory (str): Optional. Migrations directory; the configured one when omitted.
+
+        Returns:
+        - list: `Migration` objects sorted by version.
+
+        Raises:
+        - MigrationError: If two files share a version.
+        """
+        directory = directory or DBMigrator.directory()
+        if not os.path.isdir(directory):
+            return []
+        migrations = {}
+        for filename in sorted(os.listdir(directory)):
+            match = DBMigrator._FILE.match(filename)
+            if not match:
+                continue
+            version = int(match.group(1))
+            if version in migrations:
+                raise MigrationError(f"Duplicate migration version {version}: {filename}")
+            migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+        return [migrations[version] for version in sorted(migrations)]
+
+    @staticmethod
+    def applied(connection):
+        """
+        Returns the applied migrations recorded in the migrations table, creating the table if needed.
+
+        Args:
+        - connection: Database connection.
+
+        Returns:
+        - dict: Maps version to `(name, checksum, applied_at)`.
+        """
+        DBMigrator.run(connection, f"""
+        CREATE TABLE IF NOT EXISTS {DBMigrator.TABLE} (
+            version BIGINT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at VARCHAR(32) NOT NULL
+        )
+        """)
+        rows = DBCrud.fetch_all(connection, f"SELECT version, name, checksum, applied_at FROM {DBMigrator.TABLE}")
+        return {version: (name, checksum, applied_at) for version, name, checksum, applied_at in rows}
+
+    @staticmethod
+    def status(directory=None):
+        """
+        Prints every migration with its state: applied, pending, changed since applied, or missing.
+
+        Args:
+        - directory (str): Optional. Migrations directory; the configured one when omitted.
+
+        Returns:
+        - list: `(version, name, state)` tuples in version order.
+        """
+        migrations = {migration.version: migration for migration in DBMigrator.discover(directory)}
+        with DBConnection.pooled() as connection:
+            applied = DBMigrator.applied(connection)
+
+        CLIUtility.header("Migrations")
+        states = []
+        for version in sorted(set(migrations) | set(applied)):
+            migration = migrations.get(version)
+            if migration is None:
+                state = "missing"
+                name = applied[version][0]
+                CLIUtility.error(f"{version} {name}: applied, but the file is missing")
+            elif version not in applied:
+                state, name = "pending", migration.name
+                CLIUtility.warning(f"{version} {name}: pending")
+            elif applied[version][1] != migration.checksum():
+                state, name = "changed", migration.name
+                CLIUtility.error(f"{version} {name}: changed since it was applied on {applied[version][2]}")
+            else:
+                state, name = "applied", migration.name
+                CLIUtility.success(f"{version} {name}: applied on {applied[version][2]}")
+            states.append((version, name, state))
+        if not states:
+            CLIUtility.info("No migrations found.")
+        return states
+
+    @staticmethod
+    def migrate(target=None, directory=None):
+        """
+        Applies pending migrations in version order.
+
+        Args:
+        - target (int): Optional. Highest version to apply; all pending migrations when omitted.
+        - directory (str): Optional. Migrations directory; the configured one when omitted.
+
+        Returns:
+        - int: Number of migrations applied.
+
+        Raises:
+        - MigrationError: If a migration fails; earlier migrations stay applied.
+        """
+        migrations = DBMigrator.discover(directory)
+        count = 0
+        with DBConnection.pooled() as connection:
+            applied = DBMigrator.applied(connection)
+            for migration in migrations:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                DBMigrator._apply(connection, migration, "up")
+                count += 1
+        if count == 0:
+            CLIUtility.info("Schema is up to date.")
+        return count
+
+    @staticmethod
+    def rollback(steps=1, target=None, directory=None):
+        """
+        Rolls back applied migrations, newest first.
+
+        Args:
+        - steps (int): Optional. Number of migrations to roll back; ignored when `target` is given.
+        - target (int): Optional. Roll back every migration above this version.
+        - directory (str): Optional. Migrations directory; the configured one when omitted.
+
+        Returns:
+        - int: Number of migrations rolled back.
+
+        Raises:
+        - MigrationError: If a migration to roll back has no file or its `down` part fails.
+        """
+        migrations = {migration.version: migration for migration in DBMigrator.discover(directory)}
+        count = 0
+        with DBConnection.pooled() as connection:
+            versions = sorted(DBMigrator.applied(connection), reverse=True)
+            versions = [version for version in versions if version > target] if target is not None else versions[:steps]
+            for version in versions:
+                migration = migrations.get(version)
+                if migration is None:
+                    raise MigrationError(f"Cannot roll back {version}: the migration file is missing")
+                DBMigrator._apply(connection, migration, "down")
+                count += 1
+        if count == 0:
+            CLIUtility.info("Nothing to roll back.")
+        return count
+
+    @staticmethod
+    def create(name, directory=None, sql=False):
+        """
+        Creates an empty migration file with a timestamp version.
+
+        Args:
+        - name (str): Descriptive name, e.g. `add_orders_table`.
+        - directory (str): Optional. Migrations directory; the configured one when omitted.
+        - sql (bool): Optional. Create a `.sql` migration instead of a Python one.
+
+        Returns:
+        - str: Path of the new file.
+        """
+        directory = directory or DBMigrator.directory()
+        os.makedirs(directory, exist_ok=True)
+        version = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        slug = re.sub(r"\W+", "_", name).strip("_").lower()
+        path = os.path.join(directory, f"{version}_{slug}.{'sql' if sql else 'py'}")
+        if sql:
+            template = "-- migrate:up\n\n\n-- migrate:down\n\n"
+        else:
+            template = (
+                f'"""\nMigration {version}: {slug}\n"""\n\n'
+                "from src.database.db_crud import DBCrud\n\n\n"
+                "def up(connection):\n    pass\n\n\n"
+                "def down(connection):\n    pass\n"
+            )
+        with open(path, "w") as migration_file:
+            migration_file.write(template)
+        CLIUtility.success(f"Created migration '{path}'.")
+        return path
+
+    @staticmethod
+    def copy_and_swap(connection, table, create_sql, key="id", chunk_size=10000, columns=None, keep_old=False):
+        """
+        Rebuilds a table with a new definition without locking it for the whole copy.
+
+        1. Creates the new table as `_<table>_new` from `create_sql`.
+        2. Adds triggers mirroring inserts, updates and deletes on the table into the new one.
+        3. Copies existing rows in key order, `chunk_size` rows per statement, each committed on its own.
+           Chunks are found by keyset pagination (the next `chunk_size` keys after the last one copied),
+           so gaps in the key space cost nothing.
+        4. Renames `<table>` to `_<table>_old` and the new table to `<table>` in one step, drops the
+           triggers, and drops the old table unless `keep_old` is set.
+
+        Args:
+        - connection: Database connection.
+        - table (str): Table to rebuild, without a schema prefix.
+        - create_sql (str | list): `CREATE TABLE {table} (...)` statement(s); `{table}` is replaced by the
+          quoted shadow table name. Index names must not clash with the current table's.
+        - key (str): Optional. Primary key column; any type with a total order.
+        - chunk_size (int): Optional. Rows copied per statement.
+        - columns (list): Optional. Columns to copy; defaults to the columns both tables share.
+        - keep_old (bool): Optional. Keep the previous table as `_<table>_old`.
+
+        Returns:
+        - int: Number of rows in the rebuilt table.
+
+        Raises:
+        - MigrationError: If a statement fails or the key is not a column of both tables.
+        - ValueError: If a table or column name is not a valid identifier.
+        """
+        if "." in table:
+            raise ValueError(f"copy_and_swap takes a table name without a schema, got {table!r}")
+        quote = DBQuery.identifier
+        triggers = [quote(f"{table}_migrate_{action}") for action in ("ins", "upd", "del")]
+        table, shadow, old = quote(table), quote(f"_{table}_new"), quote(f"_{table}_old")
+
+        DBMigrator._drop_triggers(connection, triggers)
+        DBMigrator.run(connection, f"DROP TABLE IF EXISTS {shadow}")
+        for statement in [create_sql] if isinstance(create_sql, str) else create_sql:
+            DBMigrator.run(connection, statement.format(table=shadow))
+
+        source = DBMigrator._columns(connection, table)
+        target = DBMigrator._columns(connection, shadow)
+        columns = columns or [column for column in source if column in target]
+        if key not in columns:
+            raise MigrationError(f"Key '{key}' must be a column of both {table} and the new definition")
+
+        column_list = ", ".join(map(quote, columns))
+        key = quote(key)
+        new_values = ", ".join(f"NEW.{quote(column)}" for column in columns)
+        replace = f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values});"
+        remove = f"DELETE FROM {shadow} WHERE {key} = OLD.{key};"
+        for name, event, body in zip(triggers, ("INSERT", "UPDATE", "DELETE"), (replace, remove + " " + replace, remove)):
+            DBMigrator.run(connection, f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW BEGIN {body} END")
+
+        try:
+            DBMigrator._copy(connection, table, shadow, key, column_list, chunk_size)
+            backend = DBConnection.backend()
+            with DBCrud.transaction(connection):
+                for statement in backend.rename_tables([(table, old), (shadow, table)]):
+                    DBMigrator.run(connection, statement)
+        finally:
+            DBMigrator._drop_triggers(connection, triggers)
+
+        if not keep_old:
+            DBMigrator.run(connection, f"DROP TABLE IF EXISTS {old}")
+        count = DBCrud.fetch_one(connection, f"SELECT COUNT(*) FROM {table}")[0]
+        CLIUtility.success(f"Rebuilt {table} ({count:,} rows).")
+        return count
+
+    @staticmethod
+    def run(connection, statement, values=None):
+        """
+        Executes one statement, raising instead of returning False on failure.
+
+        Args:
+        - connection: Database connection.
+        - statement (str): SQL statement.
+        - values (tuple): Optional. Values to be substituted into the statement.
+
+        Raises:
+        - MigrationError: If the statement fails.
+        """
+        if not DBCrud.execute_query(connection, statement, values):
+            summary = " ".join(statement.split())[:120]
+            raise MigrationError(f"Statement failed: {summary}")
+
+    @staticmethod
+    def _apply(connection, migration, direction):
+        """
+        Helper method running one migration and updating the migrations table.
+        """
+        label = f"{migration.version} {migration.name}"
+        CLIUtility.info(f"{'Applying' if direction == 'up' else 'Rolling back'} {label}...")
+        started = time.perf_counter()
+        try:
+            migration.run(connection, direction)
+        except MigrationError:
+            CLIUtility.error(f"Migration {label} failed.")
+            raise
+        except Exception as e:
+            CLIUtility.error(f"Migration {label} failed.")
+            raise MigrationError(f"Migration {label} failed: {e}") from e
+
+        if direction == "up":
+            applied_at = datetime.datetime.now().isoformat(timespec="seconds")
+            DBMigrator.run(
+                connection,
+                f"INSERT INTO {DBMigrator.TABLE} (version, name, checksum, applied_at) VALUES (%s, %s, %s, %s)",
+                (migration.version, migration.name, migration.checksum(), applied_at)
+            )
+        else:
+            DBMigrator.run(connection, f"DELETE FROM {DBMigrator.TABLE} WHERE version = %s", (migration.version,))
+        CLIUtility.success(f"{label} {'applied' if direction == 'up' else 'rolled back'} in {time.perf_counter() - started:.1f}s.")
+
+    @staticmethod
+    def _columns(connection, table):
+        """
+        Helper method returning the column names of a table.
+        """
+        return list(DBCrud.fetch_all(connection, f"SELECT * FROM {table} WHERE 1 = 0", shape="columns"))
+
+    @staticmethod
+    def _drop_triggers(connection, triggers):
+        """
+        Helper method dropping the copy-and-swap triggers if they exist.
+        """
+        for name in triggers:
+            DBMigrator.run(connection, f"DROP TRIGGER IF EXISTS {name}")
+
+    @staticmethod
+    def _copy(connection, table, shadow, key, column_list, chunk_size):
+        """
+        Helper method copying rows into the shadow table in committed chunks of `chunk_size` keys, with progress.
+
+        Each chunk ends at the `chunk_size`-th key after the previous chunk (keyset pagination), found
+        with an index range read; the last chunk copies whatever remains. The ETA is based on the
+        backend's row estimate for the table.
+        """
+        first = DBCrud.fetch_one(connection, f"SELECT {key} FROM {table} ORDER BY {key} LIMIT 1")
+        if not first:
+            return
+        estimate = DBCrud.fetch_one(connection, *DBConnection.backend().estimate_rows(table))
+        estimate = int(estimate[0] or 0) if estimate else 0
+        copy = f"REPLACE INTO {shadow} ({column_list}) SELECT {column_list} FROM {table} WHERE "
+        lower, last, copied = ">=", first[0], 0
+        started = time.perf_counter()
+        while True:
+            end = DBCrud.fetch_one(
+                connection,
+                f"SELECT {key} FROM {table} WHERE {key} {lower} %s ORDER BY {key} LIMIT 1 OFFSET %s",
+                (last, chunk_size - 1)
+            )
+            if not end:
+                rest = DBCrud.fetch_one(connection, f"SELECT COUNT(*) FROM {table} WHERE {key} {lower} %s", (last,))
+                DBMigrator.run(connection, f"{copy}{key} {lower} %s", (last,))
+                copied += rest[0] if rest else 0
+                # total == done ends the progress line.
+                CLIUtility.progress(f"Copying {table}", copied, copied, elapsed=time.perf_counter() - started)
+                return
+            DBMigrator.run(connection, f"{copy}{key} {lower} %s AND {key} <= %s", (last, end[0]))
+            lower, last, copied = ">", end[0], copied + chunk_size
+            # Keep the estimate above the count so the line is only ended after the last chunk.
+            total = max(estimate, copied + 1)
+            CLIUtility.progress(f"Copying {table}", copied, total, elapsed=time.perf_counter() - started)
+
+
+def main():
+    """
+    Command-line entry point for managing migrations.
+    """
+    parser = argparse.ArgumentParser(description="Manage database schema migrations")
+    parser.add_argument("--directory", help="Migrations directory (default: from config.ini)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show applied and pending migrations")
+    migrate = commands.add_parser("migrate", help="Apply pending migrations")
+    migrate.add_argument("--to", type=int, help="Highest version to apply")
+    rollback = commands.add_parser("rollback", help="Roll back applied migrations")
+    rollback.add_argument("--steps", type=int, default=1)
+    rollback.add_argument("--to", type=int, help="Roll back every migration above this version")
+    new = commands.add_parser("new", help="Create an empty migration")
+    new.add_argument("name")
+    new.add_argument("--sql", action="store_true", help="Create a .sql migration")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "status":
+            DBMigrator.status(args.directory)
+        elif args.command == "migrate":
+            DBMigrator.migrate(args.to, args.directory)
+        elif args.command == "rollback":
+            DBMigrator.rollback(args.steps, args.to, args.directory)
+        else:
+            DBMigrator.create(args.name, args.directory, args.sql)
+    except MigrationError as e:
+        CLIUtility.error(str(e))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+`db_pool.py` | Module providing a thread-safe connection pool `DBPool` used behind `DBConnection`.
+
+The pool keeps a fixed number of warm connections and allows a bounded number of overflow connections
+under bursts. Connections are health-checked on checkout and recycled once they exceed their maximum
+lifetime, so concurrent workers reuse sockets instead of paying a TCP+auth handshake per query.
+
+Usage:
+- Obtain the shared pool with `DBConnection.pool()`, or use the `DBConnection.pooled()` context manager.
+- Methods available:
+  - `checkout(timeout=None)`: Borrows a connection, waiting up to `timeout` seconds when exhausted.
+  - `checkin(connection, discard=False)`: Returns a borrowed connection to the pool.
+  - `connection(timeout=None)`: Context manager wrapping `checkout`/`checkin`.
+  - `status()`: Returns a dict with pool counters.
+  - `dispose()`: Closes every idle connection and resets the pool.
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be checked out of the pool within the timeout.
+    """
+
+
+class DBPool:
+    """
+    Thread-safe pool of database connections with overflow, health checks and max-lifetime recycling.
+    """
+
+    def __init__(self, factory, size=5, max_overflow=10, timeout=30.0, recycle=3600, ping=None, on_close=None,
+                 ping_interval=0.0):
+        """
+        Initializes the pool. No connection is opened until the first checkout.
+
+        Args:
+        - factory (callable): Zero-argument callable returning a new connection.
+        - size (int): Number of connections kept open while idle.
+        - max_overflow (int): Extra connections allowed above `size` under load; closed on checkin.
+        - timeout (float): Default seconds to wait for a free connection before raising `PoolTimeoutError`.
+        - recycle (float): Maximum lifetime of a connection in seconds; `None` disables recycling.
+        - ping (callable): Optional. Health check `ping(connection) -> bool` run on checkout.
+        - on_close (callable): Optional. Hook `on_close(connection)` run before a connection is closed.
+        - ping_interval (float): Optional. Skip the health check for connections returned less than this
+          many seconds ago.
+        """
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self._factory = factory
+        self._ping = ping or (lambda connection: connection.is_connected())
+        self._on_close = on_close
+        self.ping_interval = ping_interval
+        self._returned = {}
+        self._idle = deque()
+        self._born = {}
+        self._total = 0
+        self._checked_out = 0
+        self._disposed_at = None
+        self._cond = threading.Condition()
+
+    def checkout(self, timeout=None):
+        """
+        Borrows a connection from the pool.
+
+        Idle connections are reused most-recently-returned first. A reused connection that fails the
+        health check or exceeded its lifetime is closed and replaced transparently.
+
+        Args:
+        - timeout (float): Optional. Seconds to wait when the pool is exhausted; defaults to `self.timeout`.
+
+        Returns:
+        - connection: A live connection that must be returned with `checkin()`.
+
+        Raises:
+        - PoolTimeoutError: If no connection became available in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        connection = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._total < self.size + self.max_overflow:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"No connection available within {timeout:.1f}s")
+                self._cond.wait(remaining)
+            self._checked_out += 1
+
+        if connection is not None and not self._is_usable(connection):
+            self._close(connection, release=False)
+            connection = None
+
+        if connection is None:
+            try:
+                connection = self._factory()
+                if connection is None:
+                    raise ConnectionError("Connection factory returned None")
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._checked_out -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._born[id(connection)] = time.monotonic()
+
+        return connection
+
+    def checkin(self, connection, discard=False):
+        """
+        Returns a connection to the pool.
+
+        Any open transaction is rolled back so the next borrower starts clean. Overflow connections,
+        expired connections and connections that fail the rollback are closed instead of kept idle.
+
+        Args:
+        - connection: A connection previously returned by `checkout()`.
+        - discard (bool): Optional. Close the connection instead of returning it to the idle set.
+        """
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._checked_out -= 1
+            keep = (not discard and not self._expired(connection) and not self._disposed(connection)
+                    and len(self._idle) < self.size)
+            if keep:
+                self._idle.append(connection)
+                self._returned[id(connection)] = time.monotonic()
+            self._cond.notify()
+
+        if not keep:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager that checks out a connection and always checks it back in.
+
+        Args:
+        - timeout (float): Optional. Seconds to wait for a free connection.
+
+        Yields:
+        - connection: A live pooled connection.
+        """
+        connection = self.checkout(timeout)
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def status(self):
+        """
+        Returns pool counters for monitoring.
+
+        Returns:
+        - dict: `size`, `max_overflow`, `open`, `idle`, `checked_out` and `overflow` counts.
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._total,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "overflow": max(0, self._total - self.size),
+            }
+
+    def dispose(self):
+        """
+        Closes all idle connections. Checked-out connections are closed when they are checked in.
+        """
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._disposed_at = time.monotonic()
+        for connection in idle:
+            self._close(connection)
+
+    def _disposed(self, connection):
+        """
+        Helper method to check whether a connection was opened before the last `dispose()`.
+        """
+        if self._disposed_at is None:
+            return False
+        born = self._born.get(id(connection))
+        return born is None or born <= self._disposed_at
+
+    def _expired(self, connection):
+        """
+        Helper method to check whether a connection outlived `recycle` seconds.
+        """
+        if self.recycle is None:
+            return False
+        born = self._born.get(id(connection))
+        return born is None or time.monotonic() - born > self.recycle
+
+    def _is_usable(self, connection):
+        """
+        Helper method combining the lifetime check and the health check.
+        """
+        if self._expired(connection):
+            return False
+        returned = self._returned.get(id(connection))
+        if returned is not None and time.monotonic() - returned < self.ping_interval:
+            return True
+        try:
+            return bool(self._ping(connection))
+        except Exception:
+            return False
+
+    def _close(self, connection, release=True):
+        """
+        Helper method to close a connection and drop it from the pool accounting.
+
+        Args:
+        - connection: The connection to close.
+        - release (bool): Optional. Free the pool slot; `False` when the slot is reused for a replacement.
+        """
+        try:
+            if self._on_close:
+                self._on_close(connection)
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._born.pop(id(connection), None)
+            self._returned.pop(id(connection), None)
+            if release:
+                self._total -= 1
+                self._cond.notify()
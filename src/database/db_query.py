@@ -0,0 +1,335 @@
+"""
+`db_query.py` | Module providing `DBQuery`, a builder for parameterized SELECT/INSERT/UPDATE/DELETE statements.
+
+Every method returns the SQL text with `%s` placeholders together with the values to pass to `DBCrud`,
+so values never end up inside the SQL. The text is canonical: the same logical query always produces
+byte-identical SQL, which is what the statement cache, the result cache and the query metrics key on.
+
+- Identifiers are validated and quoted with backticks; keywords are upper case, separated by single spaces.
+- WHERE conditions and UPDATE assignments are sorted by column; INSERT columns too, with the values
+  reordered to match. SELECT column order is kept, since it defines the result.
+- IN-lists are padded to the next power of two by repeating their last value, so lists of 5 to 8 values
+  share one statement instead of producing a new SQL text per length.
+- LIMIT and OFFSET are placeholders as well.
+- The SQL text for a given query shape is built once and then reused.
+
+WHERE conditions are a dict. A key is a column name, optionally followed by an operator
+(`"age >="`, `"name LIKE"`, `"id NOT IN"`). A list, tuple or set value means IN; `None` means IS NULL.
+
+Usage:
+>>> sql, values = DBQuery.select("users", ("id", "email"), where={"id": [3, 1, 2], "active": True}, limit=10)
+>>> sql
+'SELECT `id`, `email` FROM `users` WHERE `active` = %s AND `id` IN (%s, %s, %s, %s) LIMIT %s'
+>>> DBCrud.fetch_all(connection, sql, values)
+>>> DBCrud.execute_query(connection, *DBQuery.update("users", {"email": email}, where={"id": 7}))
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from functools import lru_cache
+import re
+
+
+class DBQuery:
+    """
+    A utility class to build canonical parameterized SQL statements.
+    """
+
+    OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "LIKE", "NOT LIKE", "IN", "NOT IN", "IS", "IS NOT")
+
+    _IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*)?$")
+    _ORDER = re.compile(r"^(\S+?)(?:\s+(ASC|DESC))?$", re.IGNORECASE)
+
+    @staticmethod
+    def select(table, columns=("*",), where=None, order_by=(), limit=None, offset=None):
+        """
+        Builds a SELECT statement.
+
+        Args:
+        - table (str): Table name.
+        - columns (tuple): Optional. Column names, or `("*",)` for all columns.
+        - where (dict): Optional. Conditions combined with AND.
+        - order_by (tuple): Optional. Column names, each optionally followed by `ASC` or `DESC`.
+        - limit (int): Optional. Maximum number of rows.
+        - offset (int): Optional. Rows to skip; requires `limit`.
+
+        Returns:
+        - tuple: `(sql, values)`.
+
+        Raises:
+        - ValueError: If an identifier or operator is invalid, or `offset` is given without `limit`.
+        """
+        if offset is not None and limit is None:
+            raise ValueError("offset requires limit")
+        if isinstance(columns, str):
+            columns = (columns,)
+        if isinstance(order_by, str):
+            order_by = (order_by,)
+        shape, values = DBQuery._conditions(where)
+        sql = DBQuery._select_sql(table, tuple(columns), shape, tuple(order_by), limit is not None, offset is not None)
+        values += [value for value in (limit, offset) if value is not None]
+        return sql, tuple(values)
+
+    @staticmethod
+    def insert(table, record):
+        """
+        Builds a single-row INSERT statement.
+
+        Args:
+        - table (str): Table name.
+        - record (dict): Maps column names to values.
+
+        Returns:
+        - tuple: `(sql, values)`.
+        """
+        columns = tuple(sorted(record))
+        return DBQuery._insert_sql(table, columns, 1), tuple(record[column] for column in columns)
+
+    @staticmethod
+    def insert_many(table, columns, rows):
+        """
+        Builds a single-row INSERT statement and the rows for `DBCrud.insert_many` (driver-side batching).
+
+        Args:
+        - table (str): Table name.
+        - columns (tuple): Column names, in the order of the values in each row.
+        - rows (iterable): Value tuples.
+
+        Returns:
+        - tuple: `(sql, rows)`; rows are reordered to match the canonical column order.
+        """
+        columns = tuple(columns)
+        order = sorted(range(len(columns)), key=columns.__getitem__)
+        sql = DBQuery._insert_sql(table, tuple(columns[index] for index in order), 1)
+        if order == list(range(len(columns))):
+            return sql, rows
+        return sql, (tuple(row[index] for index in order) for row in rows)
+
+    @staticmethod
+    def insert_values(table, columns, rows, batch_size=1000):
+        """
+        Builds multi-row `INSERT ... VALUES (...), (...)` statements of up to `batch_size` rows each.
+
+        Args:
+        - table (str): Table name.
+        - columns (tuple): Column names, in the order of the values in each row.
+        - rows (iterable): Value tuples.
+        - batch_size (int): Optional. Rows per statement; only the last statement may hold fewer.
+
+        Returns:
+        - generator: Yields `(sql, values)` with the values of all rows of the batch flattened.
+
+        Raises:
+        - ValueError: If `columns` is empty or holds an invalid identifier.
+        """
+        columns = tuple(columns)
+        if not columns:
+            raise ValueError("no columns")
+        order = sorted(range(len(columns)), key=columns.__getitem__)
+        canonical = tuple(columns[index] for index in order)
+        batch = []
+        for row in rows:
+            batch.extend(row[index] for index in order)
+            if len(batch) == batch_size * len(columns):
+                yield DBQuery._insert_sql(table, canonical, batch_size), tuple(batch)
+                batch = []
+        if batch:
+            yield DBQuery._insert_sql(table, canonical, len(batch) // len(columns)), tuple(batch)
+
+    @staticmethod
+    def update(table, changes, where, all_rows=False):
+        """
+        Builds an UPDATE statement.
+
+        Args:
+        - table (str): Table name.
+        - changes (dict): Maps column names to new values.
+        - where (dict): Conditions combined with AND.
+        - all_rows (bool): Optional. Must be True to allow an empty `where`.
+
+        Returns:
+        - tuple: `(sql, values)`.
+
+        Raises:
+        - ValueError: If `changes` is empty, or `where` is empty without `all_rows`.
+        """
+        if not changes:
+            raise ValueError("update requires at least one column to change")
+        if not where and not all_rows:
+            raise ValueError("update without conditions changes every row; pass all_rows=True")
+        columns = tuple(sorted(changes))
+        shape, values = DBQuery._conditions(where)
+        sql = DBQuery._update_sql(table, columns, shape)
+        return sql, tuple([changes[column] for column in columns] + values)
+
+    @staticmethod
+    def delete(table, where, all_rows=False):
+        """
+        Builds a DELETE statement.
+
+        Args:
+        - table (str): Table name.
+        - where (dict): Conditions combined with AND.
+        - all_rows (bool): Optional. Must be True to allow an empty `where`.
+
+        Returns:
+        - tuple: `(sql, values)`.
+
+        Raises:
+        - ValueError: If `where` is empty without `all_rows`.
+        """
+        if not where and not all_rows:
+            raise ValueError("delete without conditions removes every row; pass all_rows=True")
+        shape, values = DBQuery._conditions(where)
+        return DBQuery._delete_sql(table, shape), tuple(values)
+
+    @staticmethod
+    def where(conditions):
+        """
+        Builds a WHERE clause on its own, for statements the other builders do not cover.
+
+        Args:
+        - conditions (dict): Conditions combined with AND.
+
+        Returns:
+        - tuple: `(sql, values)`; `sql` starts with `" WHERE "`, or is empty when there are no conditions.
+        """
+        shape, values = DBQuery._conditions(conditions)
+        return DBQuery._where_sql(shape), tuple(values)
+
+    @staticmethod
+    def identifier(name):
+        """
+        Validates and quotes an identifier, e.g. `users` or `app.users`.
+
+        Args:
+        - name (str): Table or column name.
+
+        Returns:
+        - str: The backtick-quoted identifier.
+
+        Raises:
+        - ValueError: If the name is not a plain identifier.
+        """
+        # Checked before the cached call, which would raise TypeError for an unhashable name.
+        if not isinstance(name, str):
+            raise ValueError(f"Invalid SQL identifier: {name!r}")
+        return DBQuery._quote(name)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _quote(name):
+        """
+        Helper method validating and quoting an identifier string.
+        """
+        if not DBQuery._IDENTIFIER.match(name):
+            raise ValueError(f"Invalid SQL identifier: {name!r}")
+        return ".".join(f"`{part}`" for part in name.split("."))
+
+    @staticmethod
+    def _conditions(where):
+        """
+        Helper method normalizing a WHERE dict.
+
+        Returns:
+        - tuple: `(shape, values)`; `shape` is a sorted tuple of `(column, operator, count)` describing the SQL,
+          `values` the matching parameter list.
+        """
+        if not where:
+            return (), []
+        terms = []
+        for key, value in where.items():
+            column, _, operator = key.strip().partition(" ")
+            operator = " ".join(operator.upper().split()) or "="
+            if operator not in DBQuery.OPERATORS:
+                raise ValueError(f"Unsupported operator {operator!r} in condition {key!r}")
+
+            if operator in ("IN", "NOT IN") and not isinstance(value, (list, tuple, set, frozenset)):
+                value = [value]
+            if isinstance(value, (list, tuple, set, frozenset)):
+                if operator not in ("=", "IN", "!=", "NOT IN"):
+                    raise ValueError(f"Operator {operator!r} cannot take a list in condition {key!r}")
+                operator = "IN" if operator in ("=", "IN") else "NOT IN"
+                items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else list(value)
+                size = 1 << max(0, len(items) - 1).bit_length() if items else 0
+                terms.append((column, operator, size, tuple(items + items[-1:] * (size - len(items)))))
+            elif value is None:
+                operator = "IS NOT" if operator in ("!=", "IS NOT") else "IS"
+                terms.append((column, operator, 0, ()))
+            else:
+                terms.append((column, operator, 1, (value,)))
+
+        terms.sort(key=lambda term: (term[0], term[1]))
+        return tuple(term[:3] for term in terms), [value for term in terms for value in term[3]]
+
+    @staticmethod
+    def _where_sql(shape):
+        """
+        Helper method rendering a normalized condition shape.
+        """
+        if not shape:
+            return ""
+        parts = []
+        for column, operator, count in shape:
+            name = DBQuery.identifier(column)
+            if operator in ("IN", "NOT IN"):
+                if count == 0:
+                    parts.append("1 = 0" if operator == "IN" else "1 = 1")
+                else:
+                    parts.append(f"{name} {operator} ({', '.join(['%s'] * count)})")
+            elif operator in ("IS", "IS NOT"):
+                parts.append(f"{name} {operator} NULL")
+            else:
+                parts.append(f"{name} {operator} %s")
+        return " WHERE " + " AND ".join(parts)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _select_sql(table, columns, shape, order_by, limit, offset):
+        """
+        Helper method rendering a SELECT statement for a query shape.
+        """
+        column_list = ", ".join("*" if column == "*" else DBQuery.identifier(column) for column in columns)
+        sql = f"SELECT {column_list} FROM {DBQuery.identifier(table)}{DBQuery._where_sql(shape)}"
+        if order_by:
+            terms = []
+            for term in order_by:
+                match = DBQuery._ORDER.match(term.strip())
+                if not match:
+                    raise ValueError(f"Invalid ORDER BY term: {term!r}")
+                direction = " DESC" if (match.group(2) or "").upper() == "DESC" else ""
+                terms.append(DBQuery.identifier(match.group(1)) + direction)
+            sql += " ORDER BY " + ", ".join(terms)
+        if limit:
+            sql += " LIMIT %s"
+        if offset:
+            sql += " OFFSET %s"
+        return sql
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _insert_sql(table, columns, rows):
+        """
+        Helper method rendering an INSERT statement with `rows` rows of placeholders.
+        """
+        column_list = ", ".join(DBQuery.identifier(column) for column in columns)
+        row = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        return f"INSERT INTO {DBQuery.identifier(table)} ({column_list}) VALUES {', '.join([row] * rows)}"
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _update_sql(table, columns, shape):
+        """
+        Helper method rendering an UPDATE statement for a query shape.
+        """
+        assignments = ", ".join(f"{DBQuery.identifier(column)} = %s" for column in columns)
+        return f"UPDATE {DBQuery.identifier(table)} SET {assignments}{DBQuery._where_sql(shape)}"
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _delete_sql(table, shape):
+        """
+        Helper method rendering a DELETE statement for a query shape.
+        """
+        return f"DELETE FROM {DBQuery.identifier(table)}{DBQuery._where_sql(shape)}"
@@ -0,0 +1,112 @@
+"""
+`db_resilience.py` | Module providing failure-handling helpers for `DBConnection`.
+
+- `CircuitBreaker`: Stops connection attempts for a cool-down period after repeated failures, so callers
+  fail fast while the database is down instead of piling up on connect timeouts.
+- `backoff_delays(retries, base, cap)`: Exponential backoff with full jitter between reconnect attempts,
+  so recovering workers do not reconnect in lockstep.
+- `DBUnavailableError`: Raised when no usable connection can be provided.
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+import threading
+import random
+import time
+
+
+class DBUnavailableError(Exception):
+    """
+    Raised when the database cannot be reached, or the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with closed, open and half-open states.
+
+    The breaker opens after `failure_threshold` consecutive failures. While open, `allow()` returns False
+    until `reset_timeout` seconds have passed; then a single trial call is allowed (half-open). A success
+    closes the breaker, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Initializes a closed breaker.
+
+        Args:
+        - failure_threshold (int): Optional. Consecutive failures that open the breaker.
+        - reset_timeout (float): Optional. Seconds to stay open before allowing a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Checks whether a call may be attempted now.
+
+        Returns:
+        - bool: False while the breaker is open, or while a half-open trial call is in progress.
+        """
+        with self._lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return True
+            if self.state == CircuitBreaker.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = CircuitBreaker.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Records a successful call and closes the breaker.
+        """
+        with self._lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """
+        Records a failed call, opening the breaker at the threshold or after a failed trial call.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+
+    def retry_in(self):
+        """
+        Returns the seconds left until the breaker allows a trial call.
+
+        Returns:
+        - float: 0.0 unless the breaker is open.
+        """
+        with self._lock:
+            if self.state != CircuitBreaker.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+def backoff_delays(retries, base=0.5, cap=30.0):
+    """
+    Yields `retries` sleep durations using exponential backoff with full jitter.
+
+    Args:
+    - retries (int): Number of delays to yield.
+    - base (float): Optional. Upper bound of the first delay in seconds.
+    - cap (float): Optional. Maximum upper bound of any delay in seconds.
+
+    Returns:
+    - generator: Yields delays in seconds, each uniform in `[0, min(cap, base * 2 ** attempt)]`.
+    """
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,210 @@
+"""
+`db_result_cache.py` | Module providing `ResultCache`, an optional read-through cache for `DBCrud` reads.
+
+Results of `DBCrud.fetch_all`/`fetch_one` are cached under `(query, values)` with LRU eviction, a
+time-to-live and a memory budget in bytes. Writes issued through `DBCrud` invalidate every cached entry
+whose query touches one of the written tables.
+
+Usage:
+- Enable with `DBCrud.enable_result_cache(max_entries=1024, ttl=30.0, max_bytes=64 * 1024 * 1024)`.
+- Methods available:
+  - `get(kind, query, values)`: Returns `(hit, result)`.
+  - `put(kind, query, values, result)`: Stores a result.
+  - `invalidate_tables(tables)`: Drops entries reading from any of `tables`.
+  - `clear()`: Drops every entry.
+  - `stats()`: Returns hit ratio, entry count and memory use for tuning.
+  - `ResultCache.tables_of(query)`: Returns the set of table names a query references.
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from collections import OrderedDict
+import threading
+import time
+import sys
+import re
+
+
+class ResultCache:
+    """
+    Thread-safe LRU+TTL cache of query results with a byte budget and table-based invalidation.
+    """
+
+    _TABLE_PATTERN = re.compile(
+        r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?)\s+([`\"\w.]+)",
+        re.IGNORECASE
+    )
+
+    def __init__(self, max_entries=1024, ttl=30.0, max_bytes=64 * 1024 * 1024):
+        """
+        Initializes an empty cache.
+
+        Args:
+        - max_entries (int): Optional. Maximum number of cached results.
+        - ttl (float): Optional. Seconds a result stays valid; `None` disables expiry.
+        - max_bytes (int): Optional. Approximate memory budget for cached results.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, query, values=None):
+        """
+        Looks up a cached result.
+
+        Args:
+        - kind (str): Result shape, such as `"all"` or `"one"`.
+        - query (str): The SELECT SQL query.
+        - values (tuple): Optional. Query parameters.
+
+        Returns:
+        - tuple: `(hit, result)`; `result` is `None` on a miss.
+        """
+        key = self._key(kind, query, values)
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            result, expires, _, _ = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, result
+
+    def put(self, kind, query, values, result):
+        """
+        Stores a result, evicting least recently used entries to respect the entry and byte limits.
+
+        Results larger than the whole budget, or with unhashable values, are not cached.
+
+        Args:
+        - kind (str): Result shape, such as `"all"` or `"one"`.
+        - query (str): The SELECT SQL query.
+        - values (tuple): Query parameters.
+        - result: The fetched result.
+        """
+        key = self._key(kind, query, values)
+        if key is None:
+            return
+        size = self._sizeof(result)
+        if size > self.max_bytes:
+            return
+        tables = ResultCache.tables_of(query)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, expires, size, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tables(self, tables):
+        """
+        Drops every entry whose query references one of `tables`.
+
+        Args:
+        - tables (iterable): Lowercase table names, as returned by `tables_of()`.
+        """
+        with self._lock:
+            for table in tables:
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """
+        Drops every entry. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns counters for tuning the cache size and TTL.
+
+        Returns:
+        - dict: `entries`, `bytes`, `max_bytes`, `hits`, `misses`, `hit_ratio`, `evictions`
+          and `invalidations`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def tables_of(query):
+        """
+        Extracts the lowercase, unquoted table names referenced by a SQL query.
+
+        Args:
+        - query (str): The SQL query.
+
+        Returns:
+        - frozenset: Table names; schema-qualified names are reduced to the table part.
+        """
+        names = ResultCache._TABLE_PATTERN.findall(query)
+        return frozenset(name.strip('`"').split(".")[-1].strip('`"').lower() for name in names)
+
+    def _remove(self, key):
+        """
+        Helper method to drop one entry and its table index references. Caller holds the lock.
+        """
+        _, _, size, tables = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    @staticmethod
+    def _key(kind, query, values):
+        """
+        Helper method building a hashable cache key, or `None` when values are unhashable.
+        """
+        key = (kind, query, tuple(values) if isinstance(values, list) else values)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @staticmethod
+    def _sizeof(result):
+        """
+        Helper method estimating the memory held by a result of rows and scalar values.
+        """
+        size = sys.getsizeof(result)
+        if isinstance(result, (list, tuple)):
+            for item in result:
+                size += ResultCache._sizeof(item)
+        return size
@@ -0,0 +1,421 @@
+"""
+`db_router.py` | Module providing `DBRouter`, read/write routing between the primary and read replicas.
+
+Writes always go to the primary (`DBConnection.pooled()`). Reads go to a read replica, chosen per call:
+
+- `round_robin`: Replicas take turns.
+- `least_latency`: The replica with the lowest moving average of recent read times.
+
+A replica is skipped when its replication lag exceeds `max_lag` seconds, when its lag cannot be measured
+(replication stopped, server unreachable), or while its circuit breaker is open. Lag is re-measured at
+most every `lag_check_interval` seconds. When no replica qualifies, reads fall back to the primary.
+
+Reads inside `DBRouter.transaction()` use the transaction's own primary connection, so they see its
+uncommitted writes. With `sticky_seconds` set, a thread's reads also stay on the primary for that long
+after each write, covering the replication delay.
+
+Usage:
+- Configure in `config.ini`; replicas share the primary's backend and default to its credentials:
+
+      [Database]
+      replicas = reader1, reader2
+      replica_strategy = round_robin
+      max_replica_lag = 5
+      replica_sticky_seconds = 0
+
+      [Replica:reader1]
+      host = 10.0.0.11
+      ; Optional: port, database, user, and password_env (environment variable holding the password)
+
+- Route calls:
+
+      rows = DBRouter.fetch_all("SELECT id, email FROM users WHERE active = %s", (True,))
+      DBRouter.execute_query("UPDATE users SET active = %s WHERE id = %s", (False, 7))
+      with DBRouter.transaction() as connection:
+          DBCrud.execute_query(connection, "INSERT INTO orders (user_id) VALUES (%s)", (7,))
+          DBRouter.fetch_one("SELECT COUNT(*) FROM orders WHERE user_id = %s", (7,))  # sees the insert
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+import os
+from .db_connection import DBConnection
+from .db_settings import DBSettings
+from .db_pool import DBPool
+from .db_statement_cache import StatementCache
+from .db_resilience import CircuitBreaker, DBUnavailableError
+from .db_crud import DBCrud
+
+
+class DBReplica:
+    """
+    One named read replica with its own connection pool, circuit breaker, lag and latency readings.
+
+    Attributes:
+        name (str): Replica name from the configuration.
+        lag (float): Last measured replication lag in seconds, or None if unknown.
+        latency (float): Moving average of read times in seconds.
+    """
+
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(self, name, overrides=None, backend=None, pool_size=5, max_overflow=5):
+        """
+        Initializes the replica; no connection is opened until it is first used.
+
+        Args:
+        - name (str): Replica name.
+        - overrides (dict): Optional. `host`, `port`, `database`, `user` and `password_env` replacing the
+          primary's settings.
+        - backend (DBBackend): Optional. Backend instance for this replica, e.g. an `SQLiteBackend` on
+          another file; defaults to the primary's backend.
+        - pool_size (int): Optional. Idle connections kept for this replica.
+        - max_overflow (int): Optional. Extra connections allowed under load.
+        """
+        self.name = name
+        self.overrides = dict(overrides or {})
+        self.backend = backend
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0)
+        self.lag = None
+        self.latency = 0.0
+        self._lag_checked = 0.0
+        self._lag_lock = threading.Lock()
+        self._pool = DBPool(
+            self._open,
+            size=pool_size,
+            max_overflow=max_overflow,
+            ping=lambda connection: self._backend().is_connected(connection),
+            ping_interval=DBConnection.ping_interval,
+            on_close=StatementCache.evict
+        )
+
+    @property
+    def pool(self):
+        """
+        Returns the replica's connection pool.
+        """
+        return self._pool
+
+    def check_lag(self, interval):
+        """
+        Returns the replication lag, measuring it again if the last reading is older than `interval`.
+
+        Args:
+        - interval (float): Maximum age of a reading in seconds.
+
+        Returns:
+        - float: Lag in seconds, or None if unknown or unreachable.
+        """
+        if time.monotonic() - self._lag_checked < interval or not self._lag_lock.acquire(blocking=False):
+            return self.lag
+        try:
+            with self._pool.connection(timeout=1.0) as connection:
+                self.lag = self._backend().replication_lag(connection)
+        except Exception:
+            self.lag = None
+        finally:
+            self._lag_checked = time.monotonic()
+            self._lag_lock.release()
+        return self.lag
+
+    def observe(self, seconds):
+        """
+        Folds one read time into the moving average used by `least_latency`.
+
+        Args:
+        - seconds (float): Duration of the read.
+        """
+        self.latency += DBReplica.LATENCY_WEIGHT * (seconds - self.latency)
+
+    def status(self):
+        """
+        Returns the replica's readings for monitoring.
+
+        Returns:
+        - dict: `name`, `lag`, `latency_ms`, `breaker` state and `pool` counters.
+        """
+        return {
+            "name": self.name,
+            "lag": self.lag,
+            "latency_ms": self.latency * 1000,
+            "breaker": self.breaker.state,
+            "pool": self._pool.status(),
+        }
+
+    def _backend(self):
+        """
+        Helper method returning the replica's backend.
+        """
+        return self.backend or DBConnection.backend()
+
+    def _open(self):
+        """
+        Helper method opening a connection to the replica through its circuit breaker.
+
+        Raises:
+        - DBUnavailableError: If the breaker is open.
+        """
+        if not self.breaker.allow():
+            raise DBUnavailableError(f"Replica '{self.name}' unavailable, next attempt in {self.breaker.retry_in():.1f}s")
+        primary = DBSettings.get()
+        password_env = self.overrides.get("password_env")
+        settings = DBSettings(
+            self.overrides.get("host", primary.host),
+            self.overrides.get("database", primary.database),
+            self.overrides.get("user", primary.user),
+            os.environ.get(password_env) if password_env else primary.password,
+        )
+        options = {"port": int(self.overrides["port"])} if "port" in self.overrides else {}
+        try:
+            connection = self._backend().connect(settings, **options)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return connection
+
+
+class DBRouter:
+    """
+    Static utility class routing reads to replicas and writes to the primary.
+    """
+
+    STRATEGIES = ("round_robin", "least_latency")
+
+    strategy = "round_robin"
+    max_lag = 5.0
+    lag_check_interval = 2.0
+    sticky_seconds = 0.0
+
+    _replicas = None
+    _counter = itertools.count()
+    _local = threading.local()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def configure(replicas, strategy="round_robin", max_lag=5.0, sticky_seconds=0.0):
+        """
+        Replaces the replica set and routing settings.
+
+        Args:
+        - replicas (list): `DBReplica` instances; an empty list sends all reads to the primary.
+        - strategy (str): Optional. `"round_robin"` or `"least_latency"`.
+        - max_lag (float): Optional. Replicas lagging more than this many seconds are skipped.
+        - sticky_seconds (float): Optional. Seconds a thread keeps reading from the primary after a write.
+
+        Raises:
+        - ValueError: If the strategy is unknown.
+        """
+        if strategy not in DBRouter.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy '{strategy}'; expected one of {DBRouter.STRATEGIES}")
+        with DBRouter._lock:
+            previous = DBRouter._replicas or []
+            DBRouter._replicas = list(replicas)
+            DBRouter.strategy = strategy
+            DBRouter.max_lag = max_lag
+            DBRouter.sticky_seconds = sticky_seconds
+        for replica in previous:
+            replica.pool.dispose()
+
+    @staticmethod
+    def from_config(config=None):
+        """
+        Configures the router from the `[Database]` and `[Replica:<name>]` sections of `config.ini`.
+
+        Args:
+        - config (Config): Optional. Configuration handler; `config.ini` is read when omitted.
+
+        Raises:
+        - ValueError: If a listed replica has no section, or the strategy is unknown.
+        """
+        if config is None:
+            from ..config import Config
+            config = Config()
+        parser = config.config
+        names = [name.strip() for name in parser.get("Database", "replicas", fallback="").split(",") if name.strip()]
+        replicas = []
+        for name in names:
+            section = f"Replica:{name}"
+            if not parser.has_section(section):
+                raise ValueError(f"Replica '{name}' is listed in [Database] replicas but has no [{section}] section")
+            overrides = dict(parser.items(section))
+            backend = None
+            if "path" in overrides:
+                from .db_backend import SQLiteBackend
+                backend = SQLiteBackend(overrides.pop("path"))
+            replicas.append(DBReplica(name, overrides, backend))
+        DBRouter.configure(
+            replicas,
+            strategy=parser.get("Database", "replica_strategy", fallback="round_robin").strip().lower(),
+            max_lag=parser.getfloat("Database", "max_replica_lag", fallback=5.0),
+            sticky_seconds=parser.getfloat("Database", "replica_sticky_seconds", fallback=0.0),
+        )
+
+    @staticmethod
+    def replicas():
+        """
+        Returns the configured replicas, reading `config.ini` on first use.
+
+        Returns:
+        - list: `DBReplica` instances.
+        """
+        if DBRouter._replicas is None:
+            DBRouter.from_config()
+        return DBRouter._replicas
+
+    @staticmethod
+    @contextmanager
+    def read():
+        """
+        Context manager borrowing a connection for reads: a qualifying replica, else the primary.
+
+        Yields:
+        - connection: A replica or primary connection, returned on exit.
+        """
+        pinned = getattr(DBRouter._local, "pinned", None)
+        if pinned is not None:
+            yield pinned
+            return
+
+        replica = None
+        if time.monotonic() >= getattr(DBRouter._local, "sticky_until", 0.0):
+            replica = DBRouter._choose()
+        connection = None
+        if replica is not None:
+            try:
+                connection = replica.pool.checkout()
+            except Exception:
+                replica.lag = None
+                connection = None
+
+        if connection is None:
+            with DBConnection.pooled() as connection:
+                yield connection
+            return
+
+        started = time.perf_counter()
+        try:
+            yield connection
+        finally:
+            replica.pool.checkin(connection)
+            replica.observe(time.perf_counter() - started)
+
+    @staticmethod
+    @contextmanager
+    def write():
+        """
+        Context manager borrowing a primary connection for writes.
+
+        Yields:
+        - connection: A primary connection, or the current transaction's connection.
+        """
+        pinned = getattr(DBRouter._local, "pinned", None)
+        if pinned is not None:
+            yield pinned
+            return
+        try:
+            with DBConnection.pooled() as connection:
+                yield connection
+        finally:
+            DBRouter._stick()
+
+    @staticmethod
+    @contextmanager
+    def transaction():
+        """
+        Context manager running a transaction on the primary; routed reads and writes inside it use the same
+        connection, so they see its uncommitted changes. Nested calls become savepoints.
+
+        Yields:
+        - connection: The primary connection holding the transaction.
+        """
+        pinned = getattr(DBRouter._local, "pinned", None)
+        if pinned is not None:
+            with DBCrud.transaction(pinned):
+                yield pinned
+            return
+        try:
+            with DBConnection.pooled() as connection, DBCrud.transaction(connection):
+                DBRouter._local.pinned = connection
+                try:
+                    yield connection
+                finally:
+                    DBRouter._local.pinned = None
+        finally:
+            DBRouter._stick()
+
+    @staticmethod
+    def fetch_all(query, values=None, shape="tuples"):
+        """
+        Routed `DBCrud.fetch_all`.
+        """
+        with DBRouter.read() as connection:
+            return DBCrud.fetch_all(connection, query, values, shape)
+
+    @staticmethod
+    def fetch_one(query, values=None):
+        """
+        Routed `DBCrud.fetch_one`.
+        """
+        with DBRouter.read() as connection:
+            return DBCrud.fetch_one(connection, query, values)
+
+    @staticmethod
+    def execute_query(query, values=None):
+        """
+        `DBCrud.execute_query` on the primary.
+        """
+        with DBRouter.write() as connection:
+            return DBCrud.execute_query(connection, query, values)
+
+    @staticmethod
+    def insert_many(query, rows, batch_size=1000, report=True):
+        """
+        `DBCrud.insert_many` on the primary.
+        """
+        with DBRouter.write() as connection:
+            return DBCrud.insert_many(connection, query, rows, batch_size, report)
+
+    @staticmethod
+    def status():
+        """
+        Returns routing settings and per-replica readings for monitoring.
+
+        Returns:
+        - dict: `strategy`, `max_lag` and `replicas`, a list of `DBReplica.status()` dicts.
+        """
+        return {
+            "strategy": DBRouter.strategy,
+            "max_lag": DBRouter.max_lag,
+            "replicas": [replica.status() for replica in DBRouter.replicas()],
+        }
+
+    @staticmethod
+    def _choose():
+        """
+        Helper method picking a replica whose lag is known and within `max_lag`, or None.
+        """
+        candidates = [
+            replica for replica in DBRouter.replicas()
+            if replica.breaker.retry_in() == 0.0
+            and (lag := replica.check_lag(DBRouter.lag_check_interval)) is not None
+            and lag <= DBRouter.max_lag
+        ]
+        if not candidates:
+            return None
+        if DBRouter.strategy == "least_latency":
+            return min(candidates, key=lambda replica: replica.latency)
+        return candidates[next(DBRouter._counter) % len(candidates)]
+
+    @staticmethod
+    def _stick():
+        """
+        Helper method keeping the current thread's reads on the primary for `sticky_seconds`.
+        """
+        if DBRouter.sticky_seconds > 0:
+            DBRouter._local.sticky_until = time.monotonic() + DBRouter.sticky_seconds
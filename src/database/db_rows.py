@@ -0,0 +1,167 @@
+"""
+`db_rows.py` | Module providing compact row representations for `DBCrud.fetch_all`.
+
+By default `fetch_all` returns a list of tuples. Two other shapes are available through its `shape` argument:
+
+- `"records"`: Each row is an instance of a generated `__slots__` class with one attribute per column,
+  so fields are read by name (`row.email`) at attribute speed and without a per-row `__dict__`. Classes
+  are generated once per column list and reused (`RecordType.for_columns`).
+- `"columns"`: A dict mapping each column name to all of its values. Integer and float columns without
+  NULLs are packed into `array('q')`/`array('d')` (8 bytes per value); other columns are lists.
+
+Records also behave like the tuples they replace: they unpack, index by position and compare equal
+to tuples with the same values.
+
+Usage:
+>>> rows = DBCrud.fetch_all(connection, "SELECT id, email FROM users", shape="records")
+>>> rows[0].email
+>>> totals = DBCrud.fetch_all(connection, "SELECT amount FROM orders", shape="columns")
+>>> sum(totals["amount"])
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from functools import lru_cache
+from itertools import starmap
+from array import array
+import keyword
+import re
+
+
+class RecordType:
+    """
+    A utility class generating and applying `__slots__` record classes.
+    """
+
+    SHAPES = ("tuples", "records", "columns")
+
+    # ASCII only: `\w` would keep characters such as `²` that are not valid in identifiers, and non-ASCII
+    # letters that `exec` would NFKC-normalize to a name other than the slot's.
+    _INVALID = re.compile(r"[^0-9A-Za-z_]")
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def for_columns(columns):
+        """
+        Returns the record class for a column list, generating it on first use.
+
+        Column names that are not valid identifiers are rewritten (`COUNT(*)` becomes `COUNT___`, and any
+        non-ASCII character becomes `_` too), keywords, `self` and names starting with a digit or underscore
+        get an `f_` prefix, anything still not an identifier becomes `column_<N>`, and duplicates get a
+        numeric suffix.
+
+        Args:
+        - columns (tuple): Column names, as in `cursor.description`.
+
+        Returns:
+        - type: A class whose instances hold one row; its `_fields` attribute lists the attribute names.
+        """
+        fields = RecordType._fields(columns)
+        arguments = ", ".join(fields)
+        body = "".join(f"\n    self.{field} = {field}" for field in fields) or "\n    pass"
+        namespace = {}
+        exec(f"def __init__(self, {arguments}):{body}", namespace)
+
+        return type("Record", (RecordType._Base,), {
+            "__slots__": fields,
+            "__init__": namespace["__init__"],
+            "_fields": fields,
+        })
+
+    @staticmethod
+    def shape(rows, columns, shape):
+        """
+        Converts fetched tuples into the requested shape.
+
+        Args:
+        - rows (list): Fetched rows as tuples.
+        - columns (tuple): Column names.
+        - shape (str): `"tuples"`, `"records"` or `"columns"`.
+
+        Returns:
+        - list | dict: The rows in the requested shape.
+
+        Raises:
+        - ValueError: If the shape is unknown.
+        """
+        if shape == "tuples":
+            return rows
+        if shape == "records":
+            return list(starmap(RecordType.for_columns(tuple(columns)), rows))
+        if shape == "columns":
+            values = zip(*rows) if rows else ((),) * len(columns)
+            return {column: RecordType._pack(column_values) for column, column_values in zip(columns, values)}
+        raise ValueError(f"Unknown result shape '{shape}'; expected one of {RecordType.SHAPES}")
+
+    @staticmethod
+    def _fields(columns):
+        """
+        Helper method turning column names into unique attribute names.
+        """
+        fields = []
+        for index, column in enumerate(columns, 1):
+            field = RecordType._INVALID.sub("_", str(column)) or "column"
+            if field[0].isdigit() or keyword.iskeyword(field) or field.startswith("_") or field == "self":
+                field = f"f_{field}"
+            if not field.isidentifier() or keyword.iskeyword(field):
+                field = f"column_{index}"
+            candidate, suffix = field, 1
+            while candidate in fields:
+                suffix += 1
+                candidate = f"{field}_{suffix}"
+            fields.append(candidate)
+        return tuple(fields)
+
+    @staticmethod
+    def _pack(values):
+        """
+        Helper method packing an integer or float column into an array, leaving other columns as lists.
+        """
+        types = set(map(type, values))
+        try:
+            if types == {int}:
+                return array("q", values)
+            if types and types <= {int, float}:
+                return array("d", values)
+        except OverflowError:
+            pass
+        return list(values)
+
+    class _Base:
+        """
+        Base class of generated records, providing tuple-like behaviour.
+        """
+
+        __slots__ = ()
+        _fields = ()
+
+        def __iter__(self):
+            for field in self._fields:
+                yield getattr(self, field)
+
+        def __len__(self):
+            return len(self._fields)
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return tuple(self)[index]
+            return getattr(self, self._fields[index])
+
+        def __eq__(self, other):
+            if isinstance(other, (RecordType._Base, tuple)):
+                return tuple(self) == tuple(other)
+            return NotImplemented
+
+        def __hash__(self):
+            return hash(tuple(self))
+
+        def __repr__(self):
+            values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+            return f"Record({values})"
+
+        def _asdict(self):
+            """
+            Returns the record as a dict of field name to value.
+            """
+            return {field: getattr(self, field) for field in self._fields}
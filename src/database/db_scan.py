@@ -0,0 +1,260 @@
+"""
+`db_scan.py` | Module providing `DBScan`, parallel full-table scans split by primary key range.
+
+A single `SELECT` over a large table runs on one connection, one server thread and one client core.
+`DBScan` splits the table into `shards` contiguous key ranges of equal width (`MIN(key)` to `MAX(key)`)
+and reads every range on its own pooled connection at the same time:
+
+- `DBScan.scan()`: Threads stream each shard with `DBCrud.iter_chunks` and hand chunks to the caller
+  through bounded queues, as they arrive or in key order. Memory stays bounded by `queue_size` chunks
+  per shard. Stopping early aborts the unfinished shards' connections (`DBBackend.abort`) instead of
+  reading their remaining rows, and drops them from the pool.
+- `DBScan.map()`: Runs a function over each shard's chunks in a thread or process pool and returns the
+  per-shard results, or merges them with a `combine` function. Processes use every client core for
+  CPU-heavy work; each opens its own connection.
+
+Table, column and key names are validated identifiers, and `where` is a dict of conditions in the
+`DBQuery` format, so no caller text is spliced into the SQL.
+
+Shards are equal in key width, not in row count, so keys should be integers spread fairly evenly.
+Make the shared pool at least `shards` connections large (see `DBConnection.pool()`), or shards wait
+for each other.
+
+Usage:
+>>> for chunk in DBScan.scan("events", columns=("id", "kind"), where={"kind": "click"}, shards=8):
+...     handle(chunk)
+>>> DBScan.map("events", count_rows, combine=operator.add, shards=8, processes=True)
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import reduce
+import threading
+import queue
+from .db_connection import DBConnection
+from .db_crud import DBCrud
+from .db_query import DBQuery
+
+
+class DBScan:
+    """
+    A utility class to scan tables in parallel, one primary key range per connection.
+    """
+
+    _DONE = object()
+
+    @staticmethod
+    def ranges(table, key="id", shards=4, where=None):
+        """
+        Splits the key space of a table into contiguous half-open ranges.
+
+        Args:
+        - table (str): Table name.
+        - key (str): Optional. Integer primary key column.
+        - shards (int): Optional. Number of ranges wanted.
+        - where (dict): Optional. Conditions restricting the rows considered, as in `DBQuery`.
+
+        Returns:
+        - list: `(low, high)` tuples covering `low <= key < high`; empty if no rows match.
+
+        Raises:
+        - ValueError: If a name is not a valid identifier, or the key is not an integer column.
+        """
+        column = DBQuery.identifier(key)
+        condition, values = DBQuery.where(where)
+        query = f"SELECT MIN({column}), MAX({column}) FROM {DBQuery.identifier(table)}{condition}"
+        with DBConnection.pooled() as connection:
+            bounds = DBCrud.fetch_one(connection, query, values)
+        if not bounds or bounds[0] is None:
+            return []
+        low, high = bounds
+        if not isinstance(low, int) or not isinstance(high, int):
+            raise ValueError(f"Key '{key}' of '{table}' must be an integer column to be sharded")
+
+        width = max(1, -(-(high - low + 1) // shards))
+        return [(start, min(start + width, high + 1)) for start in range(low, high + 1, width)]
+
+    @staticmethod
+    def scan(table, columns=("*",), key="id", shards=4, where=None, chunk_size=10000, ordered=False, queue_size=4):
+        """
+        Scans a table on `shards` connections in parallel and yields chunks of rows.
+
+        Args:
+        - table (str): Table name.
+        - columns (tuple): Optional. Column names to select, or `("*",)`; a comma-separated string also works.
+        - key (str): Optional. Integer primary key column used to split the table.
+        - shards (int): Optional. Number of parallel range scans.
+        - where (dict): Optional. Conditions applied to every shard, as in `DBQuery`.
+        - chunk_size (int): Optional. Rows fetched per round trip and per yielded chunk.
+        - ordered (bool): Optional. Yield chunks in key order instead of as they arrive.
+        - queue_size (int): Optional. Chunks each shard may read ahead of the caller.
+
+        Returns:
+        - generator: Yields lists of rows. Closing it early stops the remaining shard reads.
+
+        Raises:
+        - Exception: The first error raised by a shard, re-raised in the caller.
+        """
+        plan = DBScan._plan(table, columns, key, shards, where, ordered)
+        if not plan:
+            return
+        stop = threading.Event()
+        queues = [queue.Queue(queue_size) for _ in plan] if ordered else [queue.Queue(queue_size * len(plan))]
+
+        with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="db-scan") as executor:
+            for index, (query, shard_values) in enumerate(plan):
+                target = queues[index if ordered else 0]
+                executor.submit(DBScan._produce, query, shard_values, chunk_size, target, stop)
+            try:
+                if ordered:
+                    for target in queues:
+                        yield from DBScan._consume(target, 1)
+                else:
+                    yield from DBScan._consume(queues[0], len(plan))
+            finally:
+                stop.set()
+
+    @staticmethod
+    def map(table, func, combine=None, columns=("*",), key="id", shards=4, where=None, chunk_size=10000,
+            processes=False):
+        """
+        Applies `func` to every shard in parallel and returns or merges the results.
+
+        Args:
+        - table (str): Table name.
+        - func (callable): `func(chunks)` receives an iterator over the shard's row chunks and returns a
+          result. With `processes=True` it must be picklable, i.e. defined at module level.
+        - combine (callable): Optional. `combine(a, b)` merging two shard results; the merged value is returned.
+        - columns (tuple): Optional. Column names to select, or `("*",)`; a comma-separated string also works.
+        - key (str): Optional. Integer primary key column used to split the table.
+        - shards (int): Optional. Number of parallel range scans.
+        - where (dict): Optional. Conditions applied to every shard, as in `DBQuery`.
+        - chunk_size (int): Optional. Rows fetched per round trip.
+        - processes (bool): Optional. Run shards in worker processes instead of threads.
+
+        Returns:
+        - list: Per-shard results in key order, or the merged result when `combine` is given
+          (None if the table is empty).
+        """
+        plan = DBScan._plan(table, columns, key, shards, where, ordered=False)
+        if not plan:
+            return None if combine else []
+
+        if processes:
+            executor = ProcessPoolExecutor(
+                max_workers=len(plan), initializer=DBConnection.reset_after_fork, initargs=(DBConnection.backend(),)
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="db-scan")
+        with executor:
+            futures = [executor.submit(_map_shard, func, query, shard_values, chunk_size)
+                       for query, shard_values in plan]
+            results = [future.result() for future in futures]
+
+        return reduce(combine, results) if combine else results
+
+    @staticmethod
+    def _plan(table, columns, key, shards, where, ordered):
+        """
+        Helper method building the `(query, values)` pair of every shard.
+        """
+        if isinstance(columns, str):
+            columns = tuple(column.strip() for column in columns.split(","))
+        where = dict(where or {})
+        bounds = (f"{key} >=", f"{key} <")
+        if any(bound in where for bound in bounds):
+            raise ValueError(f"'where' must not bound the shard key '{key}'; DBScan sets those ranges")
+        order_by = (key,) if ordered else ()
+        return [
+            DBQuery.select(table, columns, where={**where, bounds[0]: low, bounds[1]: high}, order_by=order_by)
+            for low, high in DBScan.ranges(table, key, shards, where)
+        ]
+
+    @staticmethod
+    @contextmanager
+    def _shard(query, values, chunk_size):
+        """
+        Helper method reading one shard on a pooled connection.
+
+        Yields:
+        - generator: The shard's row chunks. If they are not read to the end (early stop or error), the
+          connection is aborted instead of drained and dropped from the pool.
+        """
+        pool = DBConnection.pool()
+        connection = pool.checkout()
+        chunks = DBCrud.iter_chunks(connection, query, values, chunk_size, drain=False)
+        finished = []
+
+        def rows():
+            for _, chunk in chunks:
+                yield chunk
+            finished.append(True)
+
+        try:
+            yield rows()
+        finally:
+            if not finished:
+                DBConnection.backend().abort(connection)
+            chunks.close()
+            pool.checkin(connection, discard=not finished)
+
+    @staticmethod
+    def _produce(query, values, chunk_size, target, stop):
+        """
+        Helper method reading one shard into a queue.
+
+        Puts lists of rows, then `_DONE`; an exception is put instead of `_DONE` if the read fails.
+        """
+        try:
+            with DBScan._shard(query, values, chunk_size) as chunks:
+                for rows in chunks:
+                    if not DBScan._put(target, rows, stop):
+                        return
+        except Exception as e:
+            DBScan._put(target, e, stop)
+            return
+        DBScan._put(target, DBScan._DONE, stop)
+
+    @staticmethod
+    def _put(target, item, stop):
+        """
+        Helper method putting an item into a bounded queue unless the scan is stopped.
+
+        Returns:
+        - bool: False if the scan was stopped before the item could be queued.
+        """
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _consume(source, producers):
+        """
+        Helper method yielding chunks from a queue until `producers` shards have finished.
+        """
+        finished = 0
+        while finished < producers:
+            item = source.get()
+            if item is DBScan._DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+
+def _map_shard(func, query, values, chunk_size):
+    """
+    Runs `func` over the chunks of one shard on a pooled connection.
+
+    Defined at module level so process pools can pickle it.
+    """
+    with DBScan._shard(query, values, chunk_size) as chunks:
+        return func(chunks)
@@ -0,0 +1,124 @@
+"""
+`db_settings.py` | Module providing `DBSettings`, the parse-once source of database credentials.
+
+Credentials are resolved from the `.env` file and the process environment a single time and cached.
+The cache is invalidated when the `.env` file's modification time changes, or explicitly with `reload()`,
+so reconnect storms no longer re-read and re-parse `.env` on every connect.
+
+Usage:
+- `DBSettings.get()`: Returns the cached `DBSettings` snapshot, re-resolving it if `.env` changed.
+- `DBSettings.reload()`: Forces the settings to be resolved again.
+- `settings.connect_kwargs()`: Keyword arguments for `mysql.connector.connect`.
+
+Environment variables take precedence over `.env` values, matching `load_dotenv()` defaults.
+
+Dependencies:
+- Python packages: dotenv
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+import threading
+import os
+
+
+class DBSettings:
+    """
+    Immutable snapshot of database credentials with a process-wide, mtime-invalidated cache.
+    """
+
+    KEYS = ("DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD")
+
+    _cached = None
+    _env_path = None
+    _env_mtime = None
+    _lock = threading.Lock()
+
+    __slots__ = ("host", "database", "user", "password")
+
+    def __init__(self, host, database, user, password):
+        """
+        Initializes a settings snapshot.
+
+        Args:
+        - host (str): Database host.
+        - database (str): Database name.
+        - user (str): Database user.
+        - password (str): Database password.
+        """
+        self.host = host
+        self.database = database
+        self.user = user
+        self.password = password
+
+    def connect_kwargs(self):
+        """
+        Returns the credentials as keyword arguments for a driver `connect()` call.
+
+        Returns:
+        - dict: `host`, `database`, `user` and `password`.
+        """
+        return {
+            "host": self.host,
+            "database": self.database,
+            "user": self.user,
+            "password": self.password,
+        }
+
+    @staticmethod
+    def get():
+        """
+        Returns the cached settings, resolving them first if needed.
+
+        A single `stat()` of the `.env` file decides whether the cache is still valid.
+
+        Returns:
+        - DBSettings: The current settings snapshot.
+        """
+        with DBSettings._lock:
+            if DBSettings._cached is None or DBSettings._mtime(DBSettings._env_path) != DBSettings._env_mtime:
+                DBSettings._resolve()
+            return DBSettings._cached
+
+    @staticmethod
+    def reload(env_path=None):
+        """
+        Discards the cache and resolves the settings again.
+
+        Args:
+        - env_path (str): Optional. Explicit path of the `.env` file; searched for when omitted.
+
+        Returns:
+        - DBSettings: The freshly resolved settings snapshot.
+        """
+        with DBSettings._lock:
+            DBSettings._env_path = env_path
+            DBSettings._resolve()
+            return DBSettings._cached
+
+    @staticmethod
+    def _resolve():
+        """
+        Helper method to parse `.env` and the environment into a new snapshot. Caller holds the lock.
+        """
+        from dotenv import dotenv_values, find_dotenv
+        if not DBSettings._env_path:
+            DBSettings._env_path = find_dotenv(usecwd=True) or None
+        path = DBSettings._env_path
+        file_values = dotenv_values(path) if path else {}
+        values = [os.environ.get(key, file_values.get(key)) for key in DBSettings.KEYS]
+        DBSettings._env_mtime = DBSettings._mtime(path)
+        DBSettings._cached = DBSettings(*values)
+
+    @staticmethod
+    def _mtime(path):
+        """
+        Helper method returning the modification time of `path`, or `None` if it does not exist.
+        """
+        if not path:
+            return None
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
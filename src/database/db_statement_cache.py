@@ -0,0 +1,167 @@
+"""
+`db_statement_cache.py` | Module providing `StatementCache`, a per-connection LRU of prepared cursors.
+
+Each connection gets its own bounded cache of prepared cursors keyed by SQL text. Re-executing a cached
+query reuses the server-side prepared statement, so hot parameterized queries skip SQL parsing.
+Caches are evicted (and their cursors closed) when the connection is disconnected, reset or dropped
+by the pool.
+
+Usage:
+- Enable caching for `DBCrud` with `DBCrud.enable_statement_cache(max_size=128)`.
+- Methods available:
+  - `StatementCache.for_connection(connection, max_size)`: Returns the cache bound to a connection.
+  - `StatementCache.evict(connection)`: Closes and drops the cache bound to a connection.
+  - `StatementCache.stats()`: Returns hit/miss/eviction counters summed over all connections.
+  - `cache.acquire(query)`: Returns `(cursor, query)` for the cached prepared cursor of `query`.
+
+Dependencies:
+- Python packages: mysql-connector-python
+
+Author: devinci-it
+Date: 2024 06
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class StatementCache:
+    """
+    Bounded LRU of prepared cursors for a single connection, plus the registry of all such caches.
+    """
+
+    _caches = {}
+    _retired = {"hits": 0, "misses": 0, "evictions": 0}
+    _lock = threading.Lock()
+
+    def __init__(self, connection, max_size=128):
+        """
+        Initializes an empty cache for `connection`.
+
+        Args:
+        - connection: MySQL Connection object the cursors belong to.
+        - max_size (int): Optional. Maximum number of prepared cursors kept open.
+        """
+        self.connection = connection
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cursors = OrderedDict()
+
+    def acquire(self, query):
+        """
+        Returns the prepared cursor for `query`, preparing a new one on a miss.
+
+        The returned query string is the exact object the cursor was prepared with; mysql-connector
+        only skips re-preparing when it is passed back unchanged.
+
+        Args:
+        - query (str): The SQL query text.
+
+        Returns:
+        - tuple: `(cursor, query)` to be executed as `cursor.execute(query, values)`.
+        """
+        entry = self._cursors.get(query)
+        if entry is not None:
+            self._cursors.move_to_end(query)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = (self.connection.cursor(prepared=True), query)
+        self._cursors[query] = entry
+        if len(self._cursors) > self.max_size:
+            _, (cursor, _) = self._cursors.popitem(last=False)
+            self.evictions += 1
+            StatementCache._close(cursor)
+        return entry
+
+    def discard(self, query):
+        """
+        Drops and closes the cursor for `query`, for example after it raised an error.
+
+        Args:
+        - query (str): The SQL query text.
+        """
+        entry = self._cursors.pop(query, None)
+        if entry is not None:
+            StatementCache._close(entry[0])
+
+    def clear(self):
+        """
+        Closes every cached cursor.
+        """
+        while self._cursors:
+            _, (cursor, _) = self._cursors.popitem()
+            StatementCache._close(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def for_connection(connection, max_size=128):
+        """
+        Returns the cache bound to `connection`, creating it on first use.
+
+        Args:
+        - connection: MySQL Connection object.
+        - max_size (int): Optional. Size of a newly created cache.
+
+        Returns:
+        - StatementCache: The connection's cache.
+        """
+        key = id(connection)
+        with StatementCache._lock:
+            cache = StatementCache._caches.get(key)
+            if cache is None or cache.connection is not connection:
+                cache = StatementCache(connection, max_size)
+                StatementCache._caches[key] = cache
+            return cache
+
+    @staticmethod
+    def evict(connection):
+        """
+        Closes and forgets the cache bound to `connection`. Safe to call for uncached connections.
+
+        Args:
+        - connection: MySQL Connection object.
+        """
+        with StatementCache._lock:
+            cache = StatementCache._caches.get(id(connection))
+            if cache is None or cache.connection is not connection:
+                return
+            del StatementCache._caches[id(connection)]
+            for counter in StatementCache._retired:
+                StatementCache._retired[counter] += getattr(cache, counter)
+        cache.clear()
+
+    @staticmethod
+    def stats():
+        """
+        Returns counters summed over all live and evicted caches.
+
+        Returns:
+        - dict: `connections`, `cursors`, `hits`, `misses`, `evictions` and `hit_ratio`.
+        """
+        with StatementCache._lock:
+            caches = list(StatementCache._caches.values())
+            totals = dict(StatementCache._retired)
+        for cache in caches:
+            for counter in totals:
+                totals[counter] += getattr(cache, counter)
+        lookups = totals["hits"] + totals["misses"]
+        totals["connections"] = len(caches)
+        totals["cursors"] = sum(len(cache) for cache in caches)
+        totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+    @staticmethod
+    def _close(cursor):
+        """
+        Helper method to close a cursor, ignoring errors from already-dead connections.
+        """
+        try:
+            cursor.close()
+        except Exception:
+            pass
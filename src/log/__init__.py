@@ -1 +1,31 @@
-from .log import logger
+"""
+`src.log` | Application logging.
+
+`logger`, the `Logger` singleton, is built on first access (PEP 562 module `__getattr__`), so importing
+the package, or `src` itself, does not read `config.ini`, open the log file or start the writer threads.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "logger": ".log",
+    "Logger": ".log",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Imports an exported name from its submodule on first access and caches it on the package.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,5 +1,19 @@
 import logging
+import logging.handlers
+import threading
+import shutil
+import atexit
+import queue
+import time
+import gzip
+import json
+import copy
+import signal
+import random
+import sys
 import os
+import re
+from ..config import Config
 
 class Singleton(type):
     """
@@ -9,58 +23,854 @@ class Singleton(type):
     the application lifecycle.
     """
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         """
         Call method to retrieve the singleton instance.
 
-        If an instance of the class does not exist, it creates and stores it.
+        If an instance of the class does not exist, it creates and stores it; the first call may come from
+        any thread, so creation is locked.
         """
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with Singleton._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue, with a policy for records that arrive while the queue is full.
+
+    Policies:
+        block: Wait for the writer thread to make room; no record is lost.
+        drop_oldest: Discard the oldest queued record to make room for the new one.
+        sample: Once the queue is three quarters full, keep only 1 in `sample_rate` records below
+            WARNING; records that still find the queue full are discarded.
+
+    Discarded records are counted, and a WARNING reporting the count is queued as soon as there is room again.
+    """
+
+    POLICIES = ("block", "drop_oldest", "sample")
+
+    def __init__(self, queue, policy="block", sample_rate=10):
+        """
+        Initialize the handler.
+
+        Args:
+            queue (queue.Queue): Bounded queue read by the writer thread.
+            policy (str, optional): Overflow policy, one of `POLICIES` (default: "block").
+            sample_rate (int, optional): Keep 1 in this many records when sampling (default: 10).
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown log overflow policy '{policy}'; expected one of {self.POLICIES}")
+        super().__init__(queue)
+        self.policy = policy
+        self.sample_rate = max(1, int(sample_rate))
+        self.high_water = max(1, queue.maxsize * 3 // 4) if queue.maxsize > 0 else None
+        self.dropped = 0
+        self._unreported = 0
+        self._sampled = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        """
+        Prepare a record for the queue on the caller's thread.
+
+        Only merges the message arguments, so later changes to them cannot alter the record; the
+        traceback is kept apart in `exc_text`, and formatting is left to the writer thread.
+
+        Args:
+            record (logging.LogRecord): The record accepted by the logger.
+
+        Returns:
+            logging.LogRecord: A copy safe to hand to another thread.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def set_policy(self, policy, sample_rate=10):
+        """
+        Change the overflow policy of a running handler.
+
+        Args:
+            policy (str): Overflow policy, one of `POLICIES`.
+            sample_rate (int, optional): Keep 1 in this many records when sampling (default: 10).
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown log overflow policy '{policy}'; expected one of {self.POLICIES}")
+        self.sample_rate = max(1, int(sample_rate))
+        self.policy = policy
+
+    def enqueue(self, record):
+        """
+        Queue a record according to the overflow policy.
+
+        Args:
+            record (logging.LogRecord): The prepared record.
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        if self._unreported and (self.high_water is None or self.queue.qsize() < self.high_water):
+            self._report()
+
+        if self.policy == "sample" and record.levelno < logging.WARNING and self.high_water is not None \
+                and self.queue.qsize() >= self.high_water:
+            with self._lock:
+                self._sampled += 1
+                keep = self._sampled % self.sample_rate == 0
+            if not keep:
+                self._drop()
+                return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy != "drop_oldest":
+                self._drop()
+                return
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+        except queue.Empty:
+            pass
+        self._drop()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+    def _drop(self):
+        """
+        Count a discarded record.
+        """
+        with self._lock:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _report(self):
+        """
+        Queue a WARNING with the number of records discarded since the last report.
+        """
+        with self._lock:
+            count, self._unreported = self._unreported, 0
+        if not count:
+            return
+        notice = logging.makeLogRecord({
+            "name": "log",
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Log queue full: {count} record(s) dropped ({self.policy} policy).",
+        })
+        try:
+            self.queue.put_nowait(notice)
+        except queue.Full:
+            with self._lock:
+                self._unreported += count
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener whose stop sentinel waits for room in a bounded queue instead of failing when it is full.
+
+    Its handlers can be replaced while it runs (`swap`): a record is written either entirely by the old
+    handlers or entirely by the new ones, and records still in the queue go to the new ones.
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False):
+        """
+        Initialize the listener.
+
+        Args:
+            queue (queue.Queue): Queue read by the writer thread.
+            *handlers (logging.Handler): Handlers writing the records.
+            respect_handler_level (bool, optional): Skip handlers whose level is above the record's.
+        """
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self._swap_lock = threading.Lock()
+
+    def handle(self, record):
+        """
+        Write a record with the current handlers.
+
+        Args:
+            record (logging.LogRecord): The dequeued record.
+        """
+        with self._swap_lock:
+            super().handle(record)
+
+    def swap(self, *handlers):
+        """
+        Replace the handlers between two records.
+
+        Args:
+            *handlers (logging.Handler): The new handlers.
+
+        Returns:
+            tuple: The previous handlers, for the caller to close.
+        """
+        with self._swap_lock:
+            previous, self.handlers = self.handlers, handlers
+        return previous
+
+    def enqueue_sentinel(self):
+        """
+        Queue the sentinel that stops the writer thread once everything before it is written.
+        """
+        self.queue.put(self._sentinel)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Filter limiting how often the same message is logged, with optional random sampling per level.
+
+    Records with the same level, logger and message template (`record.msg`, before its args are merged)
+    share a key, so nothing is formatted on the caller's thread. Per level:
+
+    - `limits` maps a level to `(count, seconds)`: at most `count` records per key are let through in
+      each `seconds` window; the rest are suppressed.
+    - `sampling` maps a level to a probability: each record is kept with that probability.
+
+    Suppressed records are counted per key; records dropped by sampling alone are counted per level and
+    logger. When a window ends, one record at the original level reports "Suppressed N similar messages
+    in the last S s: <template>". Windows are checked by a background thread (`start()`/`stop()`) and at
+    `flush()`. At most `max_keys` windows are tracked; records with a new key beyond that pass unlimited.
+    Levels missing from both dicts pass untouched.
+    """
+
+    def __init__(self, limits=None, sampling=None, max_keys=10000):
+        """
+        Initialize the filter.
+
+        Args:
+            limits (dict, optional): Level number to `(count, seconds)`.
+            sampling (dict, optional): Level number to the probability of keeping a record.
+            max_keys (int, optional): Maximum number of windows tracked at once (default: 10000).
+        """
+        super().__init__()
+        self.limits = dict(limits or {})
+        self.sampling = dict(sampling or {})
+        self.max_keys = max_keys
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._sweeping = None
+
+    def filter(self, record):
+        """
+        Decide whether a record is logged.
+
+        Args:
+            record (logging.LogRecord): The record accepted by the logger.
+
+        Returns:
+            bool: True to log the record.
+        """
+        if getattr(record, "suppressed", None) is not None:
+            return True
+        limit = self.limits.get(record.levelno)
+        probability = self.sampling.get(record.levelno)
+        if limit is None and probability is None:
+            return True
+
+        keep = probability is None or random.random() < probability
+        if limit is None:
+            if keep:
+                return True
+            key = (record.levelno, record.name, None)
+        else:
+            key = (record.levelno, record.name, record.msg if isinstance(record.msg, str) else str(record.msg))
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                if len(self._windows) >= self.max_keys:
+                    return keep
+                window = self._windows[key] = [time.monotonic(), 0, 0]
+            if keep:
+                window[1] += 1
+                keep = window[1] <= limit[0]
+            if not keep:
+                window[2] += 1
+        return keep
+
+    def start(self, interval=1.0):
+        """
+        Check for ended windows every `interval` seconds on a daemon thread, so summaries are logged
+        even when no further records of the limited level arrive.
+
+        Args:
+            interval (float, optional): Seconds between checks (default: 1.0).
+        """
+        self.stop()
+        stop = self._sweeping = threading.Event()
+
+        def sweep():
+            while not stop.wait(interval):
+                self.flush(time.monotonic())
+
+        threading.Thread(target=sweep, name="log-rate-limit", daemon=True).start()
+
+    def stop(self):
+        """
+        Stop the background check started by `start()`.
+        """
+        if self._sweeping is not None:
+            self._sweeping.set()
+            self._sweeping = None
+
+    def flush(self, now=None):
+        """
+        Report the suppressed counts of every window that has ended, or of all windows at shutdown.
+
+        Args:
+            now (float, optional): Current `time.monotonic()`; when omitted, all windows are ended.
+        """
+        closing = now is None
+        now = time.monotonic() if closing else now
+        ended = []
+        with self._lock:
+            for key, (started, _, suppressed) in list(self._windows.items()):
+                limit = self.limits.get(key[0])
+                seconds = limit[1] if limit else 60.0
+                if closing or now - started >= seconds:
+                    del self._windows[key]
+                    if suppressed:
+                        ended.append((key, now - started, suppressed))
+        for (level, name, message), elapsed, suppressed in ended:
+            if message is None:
+                msg, args = "Sampled out %d messages in the last %.0f s", (suppressed, elapsed)
+            else:
+                msg = "Suppressed %d similar messages in the last %.0f s: %s"
+                args = (suppressed, elapsed, message[:200])
+            summary = logging.makeLogRecord({
+                "name": name,
+                "levelno": level,
+                "levelname": logging.getLevelName(level),
+                "msg": msg,
+                "args": args,
+                "suppressed": suppressed,
+                "context": {"suppressed": suppressed},
+            })
+            logging.getLogger(name).handle(summary)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formatter for the plain text log, appending the record's context fields as `key=value` pairs.
+    """
+
+    def format(self, record):
+        """
+        Format a record as text.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The formatted line.
+        """
+        line = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            line += " | " + " ".join(f"{key}={value!r}" for key, value in context.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter writing each record as one JSON object per line.
+
+    Every line holds `timestamp` (UTC, ISO 8601), `level`, `logger`, `module`, `line` and `message`,
+    then the record's context fields, then the static context given to the formatter. The static
+    context is serialized once, when the formatter is created, and appended as text to every line.
+    """
+
+    def __init__(self, context=None):
+        """
+        Initialize the formatter.
+
+        Args:
+            context (dict, optional): Fields added to every line, e.g. service name and environment.
+        """
+        super().__init__()
+        self.context = dict(context or {})
+        self._static = json.dumps(self.context, default=str)[1:-1]
+
+    def format(self, record):
+        """
+        Format a record as a JSON line.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON object, without a trailing newline.
+        """
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        context = getattr(record, "context", None)
+        if context:
+            for key, value in context.items():
+                entry.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        return f"{line[:-1]}, {self._static}}}" if self._static else line
+
+
+class RotatingLogHandler(logging.handlers.BaseRotatingHandler):
+    """
+    File handler rotating by size and by age, keeping the newest `backup_count` rotated files.
+
+    The current file is renamed to `<file>.<YYYYmmdd-HHMMSSffffff>` and a new one is started. The start
+    time of the current file is kept in `<file>.started`, so its age survives restarts. Rotated
+    files are compressed to `.gz` (gzip) or `.zst` (zstd, needs the optional `zstandard` package) and
+    old ones deleted on a background thread, so writing continues while they are compressed.
+    """
+
+    COMPRESSIONS = ("none", "gzip", "zstd")
+
+    _SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+    def __init__(self, filename, max_bytes=0, interval=0, backup_count=7, compression="gzip"):
+        """
+        Initialize the handler.
+
+        Args:
+            filename (str): Path of the current log file.
+            max_bytes (int, optional): Rotate once the file reaches this size; 0 disables (default: 0).
+            interval (int, optional): Rotate once the file is this many seconds old; 0 disables (default: 0).
+            backup_count (int, optional): Rotated files to keep; 0 keeps all (default: 7).
+            compression (str, optional): One of `COMPRESSIONS` (default: "gzip").
+
+        Raises:
+            ValueError: If the compression is unknown.
+            ImportError: If zstd is requested without the `zstandard` package installed.
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown log compression '{compression}'; expected one of {self.COMPRESSIONS}")
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as e:
+                raise ImportError("zstd log compression requires the 'zstandard' package") from e
+        super().__init__(filename, "a", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compression = compression
+        self._started_path = f"{self.baseFilename}.started"
+        self.rollover_at = self._segment_start() + interval
+        self._rotated = re.compile(re.escape(os.path.basename(self.baseFilename)) + r"\.\d{8}-\d{12}(\.gz|\.zst)?$")
+        self._pending = queue.Queue()
+        self._worker = None
+
+    def shouldRollover(self, record):
+        """
+        Check whether the file has reached its size or age limit.
+
+        Args:
+            record (logging.LogRecord): The record about to be written.
+
+        Returns:
+            bool: True if the file should be rotated first.
+        """
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        """
+        Rename the current file, start a new one and queue the old one for compression and retention.
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1e6) % 1000000:06d}"
+            rotated = f"{self.baseFilename}.{stamp}"
+            os.rename(self.baseFilename, rotated)
+            self._submit(rotated)
+        self.rollover_at = now + self.interval
+        self._mark_start(now)
+        self.stream = self._open()
+
+    def close(self):
+        """
+        Close the file and wait for queued compressions to finish.
+        """
+        worker = self._worker
+        if worker is not None:
+            self._pending.put(None)
+            worker.join()
+            self._worker = None
+        super().close()
+
+    def _segment_start(self):
+        """
+        Read when the current file was started from `<file>.started`, recording now if it is missing.
+
+        The file's mtime is its last write, so it cannot tell the age of a file a restarted process appends to.
+        """
+        try:
+            with open(self._started_path) as marker:
+                return float(marker.read())
+        except (OSError, ValueError):
+            started = time.time()
+            self._mark_start(started)
+            return started
+
+    def _mark_start(self, started):
+        """
+        Record the start time of the current file in `<file>.started`.
+        """
+        try:
+            with open(self._started_path, "w") as marker:
+                marker.write(repr(started))
+        except OSError as e:
+            sys.stderr.write(f"Could not record the log start time in {self._started_path}: {e}\n")
+
+    def _submit(self, path):
+        """
+        Hand a rotated file to the background thread, starting it on first use.
+        """
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="log-compress", daemon=True)
+            self._worker.start()
+        self._pending.put(path)
+
+    def _work(self):
+        """
+        Background thread compressing rotated files and deleting the ones beyond `backup_count`.
+        """
+        while True:
+            path = self._pending.get()
+            if path is None:
+                return
+            try:
+                if self.compression != "none" and os.path.exists(path):
+                    self._compress(path)
+                self._prune()
+            except OSError as e:
+                sys.stderr.write(f"Log rotation of {path} failed: {e}\n")
+
+    def _compress(self, path):
+        """
+        Compress a rotated file next to itself and remove the original.
+        """
+        target = path + self._SUFFIXES[self.compression]
+        with open(path, "rb") as source, open(target + ".part", "wb") as raw:
+            if self.compression == "zstd":
+                import zstandard
+                with zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False) as sink:
+                    shutil.copyfileobj(source, sink, 1 << 20)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as sink:
+                    shutil.copyfileobj(source, sink, 1 << 20)
+        shutil.copystat(path, target + ".part")
+        os.replace(target + ".part", target)
+        os.remove(path)
+
+    def _prune(self):
+        """
+        Delete the oldest rotated files so that at most `backup_count` remain.
+        """
+        if not self.backup_count:
+            return
+        directory = os.path.dirname(self.baseFilename)
+        rotated = sorted(name for name in os.listdir(directory) if self._rotated.match(name))
+        for name in rotated[:-self.backup_count]:
+            os.remove(os.path.join(directory, name))
+
+
 class Logger(metaclass=Singleton):
     """
     Singleton Logger class for centralized logging.
 
+    Callers never write to the log file themselves: the root logger gets a `BoundedQueueHandler`
+    that puts records into a bounded queue, and a background thread (`BoundedQueueListener`) writes
+    them to the file. The queue is drained and the file flushed at interpreter exit.
+
+    The file is rotated by size and age through `RotatingLogHandler`, configured in the `[Logging]`
+    section of config.ini.
+
+    Reconfiguring (`set_*`, `configure`, `reload`) swaps a new file handler into the running writer
+    thread without losing queued records. `reload` re-reads config.ini; it runs on SIGHUP with
+    `[Logging] reload_on_sighup = true` and whenever the file changes with `[Logging] watch_interval` > 0.
+
+    A forked child process (e.g. a `ProcessPoolExecutor` worker) does not inherit the writer thread, so
+    after a fork the child writes to the file directly instead of through the queue.
+
     Attributes:
+        config_file (str): Configuration file whose `[Logging]` section is applied (default: 'config.ini').
         log_file (str): Name of the log file.
-        log_directory (str): Directory where log files are stored.
-        log_level (int): Logging level (default: logging.INFO).
+        log_directory (str): Directory where log files are stored (`[Logging] logpath`).
+        log_level (int): Logging level (default: logging.INFO; `[Logging] loglevel`).
         log_format (str): Format for log messages (default: '%(asctime)s - %(levelname)s - %(message)s').
+        queue_size (int): Records buffered between callers and the writer thread (`[Logging] queue_size`).
+        overflow (str): What to do when the buffer is full: block, drop_oldest or sample (`[Logging] overflow`).
+        sample_rate (int): Records kept per sampled record under the sample policy (`[Logging] sample_rate`).
+        rotate_bytes (int): Rotate the file at this size, 0 to disable (`[Logging] rotate_bytes`).
+        rotate_seconds (int): Rotate the file at this age, 0 to disable (`[Logging] rotate_seconds`).
+        backup_count (int): Rotated files to keep, 0 for all (`[Logging] backup_count`).
+        compression (str): Compression of rotated files: none, gzip or zstd (`[Logging] compression`).
+        structured (bool): Write JSON lines through `JsonFormatter` instead of text (`[Logging] structured`).
+        context (dict): Static fields added to every JSON line (`[Logging] context`, as `key=value, ...`).
+        rate_limits (dict): Level to `(count, seconds)` per message, see `RateLimitFilter`
+            (`[Logging] rate_limit`, as `LEVEL=count/seconds, ...`).
+        sampling (dict): Level to the probability of keeping a record (`[Logging] sampling`, as `LEVEL=p, ...`).
     """
 
-    def __init__(self):
+    SETTINGS = (
+        'log_file', 'log_directory', 'log_level', 'log_format', 'queue_size', 'overflow', 'sample_rate',
+        'rotate_bytes', 'rotate_seconds', 'backup_count', 'compression', 'structured', 'context',
+        'rate_limits', 'sampling',
+    )
+
+    def __init__(self, config_file='config.ini'):
         """
-        Initialize the logger with default attributes.
+        Initialize the logger with default attributes, overridden by the `[Logging]` section of config.ini.
+
+        Args:
+            config_file (str, optional): Path to the configuration file (default: 'config.ini').
         """
+        self.config_file = config_file
         self.log_file = 'app.log'
         self.log_directory = 'storage/logs'
         self.log_level = logging.INFO
         self.log_format = '%(asctime)s - %(levelname)s - %(message)s'
+        self.queue_size = 10000
+        self.overflow = 'drop_oldest'
+        self.sample_rate = 10
+        self.rotate_bytes = 10485760
+        self.rotate_seconds = 86400
+        self.backup_count = 14
+        self.compression = 'gzip'
+        self.structured = False
+        self.context = {}
+        self.rate_limits = {}
+        self.sampling = {}
+        self._handler = None
+        self._limiter = RateLimitFilter()
+        self._listener = None
+        self._lock = threading.Lock()
+        self._watching = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        config = self._load_settings()
         self.configure_logging()
+        if config.getboolean('Logging', 'reload_on_sighup', fallback=False):
+            self.reload_on_signal()
+        watch_interval = config.getfloat('Logging', 'watch_interval', fallback=0)
+        if watch_interval > 0:
+            self.watch_config(watch_interval)
 
     def configure_logging(self):
         """
         Configure logging settings based on current attributes.
+
+        The first call starts the queue pipeline. Later calls build a new file handler from the current
+        attributes and swap it into the running writer thread, then close the old one; queued records
+        are written by the new handler, so none are lost. The queue size is fixed once started.
+        """
+        with self._lock:
+            file_handler = self._file_handler()
+
+            if self._listener is None:
+                previous = ()
+                if self._handler is not None:
+                    # The direct file handler of a forked child (see `_after_fork`) gives way to a pipeline.
+                    logging.getLogger().removeHandler(self._handler)
+                    previous = (self._handler,)
+                records = queue.Queue(self.queue_size)
+                self._handler = BoundedQueueHandler(records, self.overflow, self.sample_rate)
+                self._handler.addFilter(self._limiter)
+                self._limiter.start()
+                self._listener = BoundedQueueListener(records, file_handler, respect_handler_level=True)
+                self._listener.start()
+                logging.getLogger().addHandler(self._handler)
+                atexit.register(self.shutdown)
+            else:
+                self._handler.set_policy(self.overflow, self.sample_rate)
+                previous = self._listener.swap(file_handler)
+            self._limiter.limits = dict(self.rate_limits)
+            self._limiter.sampling = dict(self.sampling)
+            logging.getLogger().setLevel(self.log_level)
+
+        for handler in previous:
+            handler.close()
+
+    def _file_handler(self):
+        """
+        Build the file handler for the current attributes, creating the log directory if needed.
+
+        Returns:
+            RotatingLogHandler: The handler, with the text or JSON formatter.
         """
         if not os.path.exists(self.log_directory):
             os.makedirs(self.log_directory)
-
         log_path = os.path.join(self.log_directory, self.log_file)
+        file_handler = RotatingLogHandler(
+            log_path, self.rotate_bytes, self.rotate_seconds, self.backup_count, self.compression
+        )
+        file_handler.setFormatter(JsonFormatter(self.context) if self.structured else TextFormatter(self.log_format))
+        return file_handler
+
+    def _after_fork(self):
+        """
+        Write directly to the log file in a forked child.
+
+        The child inherits the queue handler but not the writer thread, so records would pile up in a
+        queue nobody reads, and block callers under the `block` overflow policy. Locks that another
+        thread held during the fork, and the background threads, are replaced as well.
+        """
+        self._lock = threading.Lock()
+        self._watching = None
+        self._limiter._lock = threading.Lock()
+        self._limiter._sweeping = None
+        if self._handler is None:
+            return
+        logging.getLogger().removeHandler(self._handler)
+        self._listener = None
+        self._handler = self._file_handler()
+        self._handler.addFilter(self._limiter)
+        self._limiter.start()
+        logging.getLogger().addHandler(self._handler)
+
+    def configure(self, **attributes):
+        """
+        Set several attributes at once and reconfigure logging a single time.
+
+        Args:
+            **attributes: Attribute names and values, e.g. `log_level=logging.DEBUG, structured=True`.
+
+        Raises:
+            AttributeError: If a name is not one of `SETTINGS`.
+        """
+        unknown = set(attributes) - set(self.SETTINGS)
+        if unknown:
+            raise AttributeError(f"Logger has no setting(s) {sorted(unknown)}; expected some of {self.SETTINGS}")
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        self.configure_logging()
+
+    def reload(self):
+        """
+        Re-read the `[Logging]` section of config.ini and reconfigure logging without stopping it.
+        """
+        self._load_settings()
+        self.configure_logging()
+        self.log("Logging configuration reloaded from %s.", logging.INFO, self.config_file)
+
+    def reload_on_signal(self, signum=None):
+        """
+        Reload the configuration whenever the process receives a signal (SIGHUP by default).
+
+        Python only installs signal handlers from the main thread; from another thread, or on platforms
+        without SIGHUP (Windows), a warning is logged instead. The reload runs on a separate thread, so
+        the signal never interrupts a reconfiguration in progress.
 
-        logging.basicConfig(filename=log_path, level=self.log_level, format=self.log_format)
+        Args:
+            signum (int, optional): Signal number (default: signal.SIGHUP).
+
+        Returns:
+            bool: True if the handler was installed.
+        """
+        signum = signum or getattr(signal, "SIGHUP", None)
+        if signum is None:
+            logging.getLogger(__name__).warning("Reload on signal skipped: this platform has no SIGHUP")
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            logging.getLogger(__name__).warning(
+                "Reload on signal skipped: signal handlers can only be installed from the main thread"
+            )
+            return False
+        signal.signal(signum, lambda *_: threading.Thread(target=self.reload, name="log-reload", daemon=True).start())
+        return True
+
+    def watch_config(self, interval=2.0):
+        """
+        Reload the configuration whenever config.ini changes, checking its modification time periodically.
+
+        Args:
+            interval (float, optional): Seconds between checks (default: 2.0).
+        """
+        if self._watching is not None:
+            self._watching.set()
+        stop = self._watching = threading.Event()
+
+        def watch():
+            seen = self._config_mtime()
+            while not stop.wait(interval):
+                mtime = self._config_mtime()
+                if mtime != seen:
+                    seen = mtime
+                    self.reload()
+
+        threading.Thread(target=watch, name="log-config-watch", daemon=True).start()
+
+    def flush(self):
+        """
+        Wait until every queued record has been written, then flush the log file.
+        """
+        if self._listener is None:
+            return
+        self._listener.queue.join()
+        for handler in self._listener.handlers:
+            handler.flush()
+
+    def shutdown(self):
+        """
+        Detach from the root logger, write the remaining queued records and close the log file.
+        """
+        with self._lock:
+            if self._watching is not None:
+                self._watching.set()
+                self._watching = None
+            if self._handler is None:
+                return
+            self._limiter.stop()
+            self._limiter.flush()
+            logging.getLogger().removeHandler(self._handler)
+            if self._listener is None:
+                self._handler.close()
+            else:
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+            self._handler = None
+            self._listener = None
+        atexit.unregister(self.shutdown)
 
     def set_log_file(self, file_name):
         """
         Set the log file and reconfigure logging.
 
         Args:
-            file_name (str): Name of the log file.
+            file_name (str): Name of the log file, or a path, which also sets the log directory.
         """
-        self.log_file = file_name
+        directory, self.log_file = os.path.split(file_name)
+        if directory:
+            self.log_directory = directory
         self.configure_logging()
 
     def set_log_directory(self, directory):
@@ -95,9 +905,9 @@ class Logger(metaclass=Singleton):
 
     def clear_logs(self):
         """
-        Clear all log files in the log directory.
+        Clear all log files in the log directory, rotated ones included.
         """
-        log_files = [f for f in os.listdir(self.log_directory) if f.endswith('.log')]
+        log_files = [f for f in os.listdir(self.log_directory) if f.endswith('.log') or '.log.' in f]
         for log_file in log_files:
             os.remove(os.path.join(self.log_directory, log_file))
 
@@ -107,17 +917,106 @@ class Logger(metaclass=Singleton):
         """
         gitignore_path = os.path.join(self.log_directory, '.gitignore')
         with open(gitignore_path, 'w') as f:
-            f.write("*.log\n")
+            f.write("*.log\n*.log.*\n")
 
-    def log(self, message, level=logging.INFO):
+    def log(self, message, level=logging.INFO, *args, **context):
         """
         Log a message with the specified log level.
 
+        The message is only formatted once a handler accepts the record, so pass values as `args`
+        (`logger.log("Loaded %d rows", logging.DEBUG, count)`) rather than pre-formatting them.
+
         Args:
-            message (str): The message to log.
+            message (str): The message to log, optionally with %-style placeholders.
             level (int, optional): The log level (default: logging.INFO).
+            *args: Values for the placeholders in `message`.
+            **context: Fields written alongside the message (as JSON fields in structured mode).
+        """
+        logging.log(level, message, *args, extra={"context": context} if context else None, stacklevel=2)
+
+    def is_enabled(self, level):
         """
-        logging.log(level, message)
+        Check whether a message of the given level would be logged.
 
-# Singleton instance of Logger
-logger = Logger()
+        Args:
+            level (int): The log level.
+
+        Returns:
+            bool: True if records of this level reach the handlers.
+        """
+        return logging.getLogger().isEnabledFor(level)
+
+    def _load_settings(self):
+        """
+        Read the `[Logging]` section of config.ini into the attributes; missing keys keep their values.
+
+        Returns:
+            ConfigParser: The parsed configuration.
+        """
+        config = Config(self.config_file).config
+        level = config.get('Logging', 'loglevel', fallback='').strip()
+        if level:
+            self.log_level = self._parse_level(level)
+        self.log_directory = config.get('Logging', 'logpath', fallback=self.log_directory)
+        self.log_format = config.get('Logging', 'format', raw=True, fallback=self.log_format)
+        self.queue_size = config.getint('Logging', 'queue_size', fallback=self.queue_size)
+        self.overflow = config.get('Logging', 'overflow', fallback=self.overflow)
+        self.sample_rate = config.getint('Logging', 'sample_rate', fallback=self.sample_rate)
+        self.rotate_bytes = config.getint('Logging', 'rotate_bytes', fallback=self.rotate_bytes)
+        self.rotate_seconds = config.getint('Logging', 'rotate_seconds', fallback=self.rotate_seconds)
+        self.backup_count = config.getint('Logging', 'backup_count', fallback=self.backup_count)
+        self.compression = config.get('Logging', 'compression', fallback=self.compression)
+        self.structured = config.getboolean('Logging', 'structured', fallback=self.structured)
+        if config.has_option('Logging', 'context'):
+            self.context = self._parse_context(config.get('Logging', 'context'))
+        if config.has_option('Logging', 'rate_limit'):
+            self.rate_limits = {
+                self._parse_level(level): tuple(float(part) for part in limit.split('/', 1))
+                for level, limit in self._parse_context(config.get('Logging', 'rate_limit')).items()
+            }
+        if config.has_option('Logging', 'sampling'):
+            self.sampling = {
+                self._parse_level(level): float(probability)
+                for level, probability in self._parse_context(config.get('Logging', 'sampling')).items()
+            }
+        return config
+
+    def _config_mtime(self):
+        """
+        Modification time of config.ini, or None if it does not exist.
+        """
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _parse_level(value):
+        """
+        Parse a level given as a number or a name (`20`, `INFO`).
+        """
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+        level = logging.getLevelName(value.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level '{value}'")
+        return level
+
+    @staticmethod
+    def _parse_context(value):
+        """
+        Parse `key=value, key=value` into a dict.
+        """
+        pairs = (item.partition('=') for item in value.split(',') if item.strip())
+        return {key.strip(): item.strip() for key, _, item in pairs}
+
+
+
+def __getattr__(name):
+    """
+    Builds the `logger` singleton on first access, so importing this module has no side effects.
+    """
+    if name == "logger":
+        return Logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")